@@ -0,0 +1,215 @@
+"""
+Batch spec extraction through the Message Batches API.
+
+Instead of one synchronous messages.create() round trip per page, a batch
+run collects every fetched page, submits the uncached ones as a single
+batch, polls until the batch has ended and maps each result back to the
+URLs it came from. Batches trade latency for throughput and lower cost per
+page, which suits overnight full-catalog crawls.
+
+Requests go through the usage tracker like synchronous calls: the batch's
+estimated cost (prompt tokens plus max_tokens, at the batch price) is checked
+against the budget before submitting, pages the budget refuses are not sent,
+and each result's usage is recorded in llm_usage and the token metrics.
+
+The batch service sits behind a small backend interface so tests (and
+offline runs) can use FakeBatchBackend instead of the real API.
+"""
+
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import search_boats
+from extraction_cache import get_extraction_cache
+from llm_usage import PURPOSE_EXTRACT, BudgetExceededError, call_cost, get_usage_tracker
+from metrics import get_metrics
+from spec_sections import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Message Batches limits: 100,000 requests per batch; custom_id is [a-zA-Z0-9_-]{1,64}
+MAX_BATCH_REQUESTS = 100000
+MAX_TOKENS = 1024
+
+
+class BatchBackend(ABC):
+    """Interface for a message batch service."""
+
+    @abstractmethod
+    def submit(self, requests: List[Dict]) -> str:
+        """Submits batch requests ({'custom_id', 'params'}) and returns the batch id."""
+
+    @abstractmethod
+    def is_done(self, batch_id: str) -> bool:
+        """True once the batch has finished processing."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterable[Tuple[str, Optional[str], Any]]:
+        """
+        Yields (custom_id, reply text, usage) for each request; reply text and usage
+        are None for failed requests. usage has input_tokens and output_tokens.
+        """
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Backend for the Anthropic Message Batches API."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, requests: List[Dict]) -> str:
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    def is_done(self, batch_id: str) -> bool:
+        return self.client.messages.batches.retrieve(batch_id).processing_status == "ended"
+
+    def results(self, batch_id: str) -> Iterable[Tuple[str, Optional[str], Any]]:
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                yield entry.custom_id, message.content[0].text, message.usage
+            else:
+                logger.warning(f"   Batch request {entry.custom_id} {entry.result.type}")
+                yield entry.custom_id, None, None
+
+
+class FakeBatchBackend(BatchBackend):
+    """
+    In-process stand-in for the batch service.
+    `responder` maps a request's params to reply text (or None to simulate an error);
+    batches report done after `polls_until_done` status checks. Usage is estimated
+    from the prompt and reply length.
+    """
+
+    def __init__(self, responder: Callable[[Dict], Optional[str]], polls_until_done: int = 1):
+        self.responder = responder
+        self.polls_until_done = polls_until_done
+        self.batches: Dict[str, List[Dict]] = {}
+        self._polls: Dict[str, int] = {}
+
+    def submit(self, requests: List[Dict]) -> str:
+        batch_id = f"fake_batch_{len(self.batches) + 1}"
+        self.batches[batch_id] = list(requests)
+        self._polls[batch_id] = 0
+        return batch_id
+
+    def is_done(self, batch_id: str) -> bool:
+        self._polls[batch_id] += 1
+        return self._polls[batch_id] >= self.polls_until_done
+
+    def results(self, batch_id: str) -> Iterable[Tuple[str, Optional[str], Any]]:
+        for request in self.batches[batch_id]:
+            reply = self.responder(request['params'])
+            if reply is None:
+                yield request['custom_id'], None, None
+                continue
+            prompt = request['params']['messages'][0]['content']
+            usage = SimpleNamespace(input_tokens=len(prompt) // CHARS_PER_TOKEN,
+                                    output_tokens=len(reply) // CHARS_PER_TOKEN)
+            yield request['custom_id'], reply, usage
+
+
+def _custom_id(text: str) -> str:
+    return "page-" + hashlib.sha256(text.encode('utf-8')).hexdigest()[:40]
+
+
+def run_batch_extraction(pages: List[Tuple[str, str]], backend: BatchBackend, poll_interval: float = 30.0,
+                         timeout: float = 24 * 3600,
+                         makes: Optional[Dict[str, str]] = None) -> Dict[str, List[Dict]]:
+    """
+    Extracts specs for (url, page text) pairs with one batch request per distinct text.
+    Cached extractions are reused without being submitted, and pages the budget refuses
+    get no boats. Returns a dict mapping each url to its extracted boats; URLs whose
+    request failed are left out so the caller can retry them. makes maps urls to the
+    manufacturer their usage is recorded against.
+    """
+    model = search_boats.EXTRACTION_MODEL
+    version = search_boats.EXTRACTION_PROMPT_VERSION
+    cache = get_extraction_cache()
+    tracker = get_usage_tracker()
+    metrics = get_metrics()
+    makes = makes or {}
+
+    results: Dict[str, List[Dict]] = {}
+    urls_by_id: Dict[str, List[str]] = {}
+    text_by_id: Dict[str, str] = {}
+    for url, content in pages:
+        text = content[:search_boats.EXTRACTION_TEXT_LIMIT]
+        cached = cache.get(version, model, text) if cache else None
+        if cached is not None:
+            results[url] = cached
+            continue
+        custom_id = _custom_id(text)
+        urls_by_id.setdefault(custom_id, []).append(url)
+        text_by_id[custom_id] = text
+
+    requests = []
+    pending_usd = 0.0
+    refused = 0
+    for custom_id, text in text_by_id.items():
+        prompt = search_boats.build_extraction_prompt(text)
+        if tracker:
+            # Upper bound: every reply uses all of max_tokens
+            estimate = call_cost(model, len(prompt) // CHARS_PER_TOKEN, MAX_TOKENS, batch=True)
+            try:
+                tracker.check(PURPOSE_EXTRACT, urls_by_id[custom_id][0], pending_usd + estimate)
+            except BudgetExceededError:
+                refused += 1
+                for url in urls_by_id[custom_id]:
+                    results[url] = []
+                continue
+            pending_usd += estimate
+        requests.append({
+            'custom_id': custom_id,
+            'params': {
+                'model': model,
+                'max_tokens': MAX_TOKENS,
+                'messages': [{'role': 'user', 'content': prompt}],
+            },
+        })
+    if refused:
+        logger.warning(f"💰 Budget: {refused} pages not submitted (estimated batch cost ${pending_usd:.4f})")
+    if not requests:
+        return results
+
+    batch_ids = []
+    for start in range(0, len(requests), MAX_BATCH_REQUESTS):
+        chunk = requests[start:start + MAX_BATCH_REQUESTS]
+        batch_ids.append(backend.submit(chunk))
+        metrics.inc('llm_requests_total', len(chunk), model=model)
+        logger.info(f"📦 Submitted batch {batch_ids[-1]} with {len(chunk)} pages")
+
+    deadline = time.monotonic() + timeout
+    failed = 0
+    for batch_id in batch_ids:
+        while not backend.is_done(batch_id):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {timeout}s")
+            time.sleep(poll_interval)
+
+        for custom_id, reply, usage in backend.results(batch_id):
+            urls = urls_by_id.get(custom_id, [])
+            if reply is None:
+                failed += 1
+                continue
+            if urls:
+                search_boats.record_message_usage(usage, model, PURPOSE_EXTRACT, make=makes.get(urls[0]),
+                                                  url=urls[0], batch=True)
+            boats: List[Dict] = []
+            try:
+                boats = search_boats.parse_extraction_response(reply)
+                if cache:
+                    cache.put(version, model, text_by_id[custom_id], boats)
+            except ValueError as e:
+                logger.warning(f"   JSON parse error in {custom_id}: {e}")
+            for url in urls:
+                results[url] = boats
+
+    if failed:
+        logger.warning(f"📦 {failed} batch requests failed")
+    return results
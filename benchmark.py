@@ -0,0 +1,328 @@
+"""
+Offline crawl benchmark.
+
+Replays a recorded corpus of Brave search responses, HTML pages and Claude
+replies through local stand-ins and times a main()-equivalent crawl:
+
+    python benchmark.py --mode pipeline --http-latency 0.05 --llm-latency 0.4
+
+FixtureAdapter is a requests transport adapter mounted on the shared
+HttpClient session, so searches and page fetches go through the real HTTP
+client, streaming text extraction and spec selection; FakeClaudeClient
+stands in for anthropic.Anthropic. Both sleep for the configured latency
+before answering. The report gives pages/sec, p50/p95 latency per stage, the
+database write rate and the tracemalloc peak.
+
+The corpus is JSON (see benchmark_fixtures/corpus.json):
+
+    manufacturers  list of makes to crawl
+    queries        make -> generated queries
+    search         query -> Brave result list
+    pages          URL -> HTML
+    extractions    [{"match": text, "reply": Claude reply}], first match in the prompt wins
+
+--synthetic N replaces it with a generated corpus of N manufacturers for
+scaling runs.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import search_boats
+from http_client import HttpClientConfig, configure_http_client
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_fixtures", "corpus.json")
+BRAVE_ENDPOINT = "https://api.search.brave.com/res/v1/web/search"
+
+# search_boats functions timed as pipeline stages
+STAGES = {
+    'queries': 'manufacturer_queries',
+    'search': 'run_search',
+    'fetch': 'fetch_webpage',
+    'extract': 'extract_page_boats',
+    'llm': 'create_message',
+    'persist': 'persist_boats',
+}
+
+
+def load_corpus(path: str = DEFAULT_CORPUS) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def synthetic_corpus(manufacturers: int = 10, results_per_query: int = 3, seed: int = 0) -> Dict:
+    """
+    Generates a corpus of spec sheets (answered by the rule-based fast path) and
+    review pages (answered by Claude), with one forum page shared by every make.
+    """
+    rng = random.Random(seed)
+    corpus = {'manufacturers': [], 'queries': {}, 'search': {}, 'pages': {}, 'extractions': []}
+    shared = "https://forum.example.com/threads/13-footers"
+    corpus['pages'][shared] = "<html><head><title>13 footers</title></head><body>" + \
+        "<p>Which 13 ft boat should I buy?</p>" * 40 + "</body></html>"
+    for m in range(manufacturers):
+        make = f"Synthetic Marine {m}"
+        slug = f"synthetic{m}"
+        queries = [f"{make} boats 13-14 feet specifications", f"{make} 13 foot specs", f"{make} reviews"]
+        corpus['manufacturers'].append(make)
+        corpus['queries'][make] = queries
+        results = [{'url': shared, 'title': "13 footers", 'description': "forum"}]
+        for i in range(results_per_query):
+            url = f"https://www.{slug}.com/models/{i}"
+            model = f"S{m}-{130 + i}"
+            length = f"13' {rng.randint(0, 11)}\""
+            hp = rng.choice([25, 40, 50, 60])
+            if i % 2 == 0:
+                html = (f"<html><head><title>{make} {model} Specs</title></head><body><nav>menu</nav>"
+                        f"<h1>{model}</h1><table><tr><td>LOA</td><td>{length}</td></tr>"
+                        f"<tr><td>Max HP</td><td>{hp}</td></tr></table>" + "<p>Dealer text.</p>" * 30 +
+                        "</body></html>")
+            else:
+                marker = f"review-{m}-{i}"
+                html = (f"<html><head><title>{make} {model} review</title></head><body>"
+                        f"<p>{marker}: we tested the {model}, {length} long, fine with {hp} horses.</p>" +
+                        "<p>Handling notes and photos.</p>" * 30 + "</body></html>")
+                reply = [{'make': make, 'model': model, 'length_ft': 13.5, 'max_hp': hp}]
+                corpus['extractions'].append({'match': marker, 'reply': json.dumps(reply)})
+            corpus['pages'][url] = html
+            results.append({'url': url, 'title': f"{make} {model}", 'description': "specs"})
+        corpus['search'][queries[0]] = results
+    return corpus
+
+
+class FixtureAdapter(HTTPAdapter):
+    """Transport adapter that answers Brave searches and page fetches from the corpus."""
+
+    def __init__(self, corpus: Dict, latency: float = 0.0):
+        super().__init__()
+        self.corpus = corpus
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if request.url.startswith(BRAVE_ENDPOINT):
+            query = parse_qs(urlsplit(request.url).query).get('q', [''])[0]
+            results = self.corpus['search'].get(query, [])
+            return self._response(request, 200, json.dumps({'web': {'results': results}}).encode('utf-8'),
+                                  'application/json')
+        html = self.corpus['pages'].get(request.url)
+        if html is None:
+            return self._response(request, 404, b'not found', 'text/plain')
+        return self._response(request, 200, html.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def _response(self, request, status: int, body: bytes, content_type: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({'Content-Type': content_type, 'Content-Length': str(len(body))})
+        response.raw = io.BytesIO(body)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+class FakeClaudeClient:
+    """Stands in for anthropic.Anthropic: answers messages.create() from the corpus."""
+
+    def __init__(self, corpus: Dict, latency: float = 0.0):
+        self.corpus = corpus
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _reply(self, prompt: str) -> str:
+        if "search queries" in prompt:
+            for make, queries in self.corpus['queries'].items():
+                if make in prompt:
+                    return json.dumps(queries)
+        for extraction in self.corpus['extractions']:
+            if extraction['match'] in prompt:
+                return extraction['reply']
+        return "[]"
+
+    def _create(self, model: str, max_tokens: int, messages: List[Dict]):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[0]['content']
+        text = self._reply(prompt)
+        usage = SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class BenchmarkReport:
+    """Throughput, latency and memory figures for one benchmark run."""
+    mode: str
+    manufacturers: int
+    pages: int
+    wall_seconds: float
+    pages_per_second: float
+    new_boats: int
+    updated_boats: int
+    db_writes_per_second: float
+    peak_memory_mb: float
+    http_requests: int
+    llm_calls: int
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+    def format(self) -> str:
+        lines = [
+            f"Benchmark ({self.mode}): {self.manufacturers} manufacturers, {self.pages} pages "
+            f"in {self.wall_seconds:.2f}s",
+            f"  Pages/sec: {self.pages_per_second:.2f}",
+            f"  DB writes: {self.new_boats} new, {self.updated_boats} updated "
+            f"({self.db_writes_per_second:.1f} writes/sec of persist time)",
+            f"  Peak memory: {self.peak_memory_mb:.1f} MB",
+            f"  HTTP requests: {self.http_requests}, Claude calls: {self.llm_calls}",
+            f"  {'stage':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}",
+        ]
+        for name, stage in self.stages.items():
+            lines.append(f"  {name:<10}{stage['count']:>7}{stage['p50'] * 1000:>10.1f}{stage['p95'] * 1000:>10.1f}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def _timed_stages() -> Iterator[Dict[str, List[float]]]:
+    """Wraps the search_boats stage functions to record each call's duration."""
+    timings: Dict[str, List[float]] = {name: [] for name in STAGES}
+    originals = {attr: getattr(search_boats, attr) for attr in STAGES.values()}
+
+    def timed(name: str, fn: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[name].append(time.perf_counter() - start)
+        return wrapper
+
+    for name, attr in STAGES.items():
+        setattr(search_boats, attr, timed(name, originals[attr]))
+    try:
+        yield timings
+    finally:
+        for attr, fn in originals.items():
+            setattr(search_boats, attr, fn)
+
+
+def run_benchmark(corpus: Dict, mode: str = 'sequential', http_latency: float = 0.0, llm_latency: float = 0.0,
+                  workdir: Optional[str] = None, pipeline_config=None) -> BenchmarkReport:
+    """
+    Crawls the corpus manufacturers offline in the given mode ('sequential' or 'pipeline')
+    against a fresh database and returns the measurements.
+    """
+    manufacturers = corpus['manufacturers']
+    adapter = FixtureAdapter(corpus, http_latency)
+    fake_client = FakeClaudeClient(corpus, llm_latency)
+    saved = {name: getattr(search_boats, name) for name in ('DB_FILE', 'client', 'BRAVE_API_KEY')}
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmpdir:
+        http = configure_http_client(HttpClientConfig(max_retries=0))
+        http.session.mount('http://', adapter)
+        http.session.mount('https://', adapter)
+        search_boats.DB_FILE = os.path.join(tmpdir, 'boats.db')
+        search_boats.client = fake_client
+        search_boats.BRAVE_API_KEY = 'benchmark'
+        try:
+            search_boats.init_database()
+            with _timed_stages() as timings:
+                tracemalloc.start()
+                start = time.perf_counter()
+                if mode == 'pipeline':
+                    from pipeline import PipelineConfig, run_pipeline
+
+                    stats = run_pipeline(manufacturers, pipeline_config or PipelineConfig())
+                    new_boats, updated_boats = stats.new_boats, stats.updated_boats
+                else:
+                    new_boats, updated_boats = search_boats.crawl_sequential(manufacturers)
+                wall = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            search_boats.get_repository().close()
+        finally:
+            for name, value in saved.items():
+                setattr(search_boats, name, value)
+            configure_http_client(HttpClientConfig())
+
+    pages = len(timings['fetch'])
+    persist_seconds = sum(timings['persist'])
+    return BenchmarkReport(
+        mode=mode,
+        manufacturers=len(manufacturers),
+        pages=pages,
+        wall_seconds=wall,
+        pages_per_second=pages / wall if wall else 0.0,
+        new_boats=new_boats,
+        updated_boats=updated_boats,
+        db_writes_per_second=(new_boats + updated_boats) / persist_seconds if persist_seconds else 0.0,
+        peak_memory_mb=peak / (1024 * 1024),
+        http_requests=adapter.requests,
+        llm_calls=fake_client.calls,
+        stages={name: {'count': len(values), 'p50': percentile(values, 50), 'p95': percentile(values, 95)}
+                for name, values in timings.items()},
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline PowerboatList crawl benchmark")
+    parser.add_argument('--mode', choices=['sequential', 'pipeline'], default='sequential')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='recorded corpus JSON file')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='use a generated corpus with this many manufacturers instead of --corpus')
+    parser.add_argument('--http-latency', type=float, default=0.05, help='seconds added to every HTTP request')
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='seconds added to every Claude call')
+    parser.add_argument('--json', dest='json_path', help='also write the report to this JSON file')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> BenchmarkReport:
+    args = parse_args(argv)
+    corpus = synthetic_corpus(args.synthetic) if args.synthetic else load_corpus(args.corpus)
+    report = run_benchmark(corpus, args.mode, args.http_latency, args.llm_latency)
+    print(report.format())
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report.as_dict(), f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
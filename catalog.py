@@ -0,0 +1,234 @@
+"""
+Columnar boat catalog.
+
+filter_boats(), is_duplicate_boat() and merge_boat_data() work on lists of
+dicts, parsing length_ft/max_hp and normalizing model names again on every
+call. BoatCatalog loads the boats once into a pandas DataFrame with the
+numeric columns coerced to floats (unparseable values become NaN) and the
+comparison keys (lowercased make, normalized model name) precomputed, so:
+
+- filter() and select() build one boolean mask from FilterCriteria, so
+  re-filtering the whole catalog for new bounds is a handful of array
+  comparisons instead of a Python loop over every row.
+- dedupe() groups by make and only compares boats whose lengths fall within
+  the tolerance window (found with a sorted-array search), confirming each
+  candidate with the same model-name test as is_duplicate_boat().
+- merge() folds a batch of new records into the catalog with a join on
+  make and normalized model, applying merge_boat_data()'s rules column-wise.
+
+pandas is an optional dependency (pip install powerboatlist[catalog]); the
+crawler itself does not need it.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from dedupe_index import models_match
+
+COLUMNS = ['id', 'make', 'model', 'length_ft', 'max_hp', 'dry_weight_lbs', 'beam_inches', 'source_url',
+           'updated_at']
+NUMERIC_COLUMNS = ['length_ft', 'max_hp', 'dry_weight_lbs', 'beam_inches']
+INTEGER_COLUMNS = ['id', 'max_hp', 'dry_weight_lbs', 'beam_inches']
+OPTIONAL_SPEC_COLUMNS = ['dry_weight_lbs', 'beam_inches']
+
+# Widening of the sorted-length search window; candidates are re-checked exactly
+_WINDOW_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class FilterCriteria:
+    """
+    Inclusive bounds on the numeric columns; None leaves a bound open.
+    A row with a missing or unparseable value fails every bound on that column.
+    """
+    min_length: Optional[float] = None
+    max_length: Optional[float] = None
+    min_hp: Optional[float] = None
+    max_hp: Optional[float] = None
+    min_weight: Optional[float] = None
+    max_weight: Optional[float] = None
+    min_beam: Optional[float] = None
+    max_beam: Optional[float] = None
+
+    @classmethod
+    def target(cls) -> 'FilterCriteria':
+        """The configured target window filter_boats() uses (see search_boats.search_criteria)."""
+        from search_boats import search_criteria
+
+        return cls(*search_criteria())
+
+    def bounds(self) -> Dict[str, tuple]:
+        """column -> (low, high) for every column with at least one bound."""
+        pairs = {
+            'length_ft': (self.min_length, self.max_length),
+            'max_hp': (self.min_hp, self.max_hp),
+            'dry_weight_lbs': (self.min_weight, self.max_weight),
+            'beam_inches': (self.min_beam, self.max_beam),
+        }
+        return {column: pair for column, pair in pairs.items() if pair != (None, None)}
+
+
+def _model_norm(models: pd.Series) -> pd.Series:
+    """normalize_model_name() over a whole column."""
+    return (models.str.lower().str.strip()
+            .str.replace(r'^\d+\s*', '', regex=True)
+            .str.replace(r'\s+', ' ', regex=True))
+
+
+class BoatCatalog:
+    """
+    Immutable table of boats with vectorized filtering, dedupe and merge.
+    Every operation returns a new catalog; row order is preserved.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.copy()
+        for column in COLUMNS:
+            if column not in frame:
+                frame[column] = None
+        for column in NUMERIC_COLUMNS:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(float)
+        frame['make'] = frame['make'].fillna('').astype(str)
+        frame['model'] = frame['model'].fillna('').astype(str)
+        frame['make_key'] = frame['make'].str.lower()
+        frame['model_norm'] = _model_norm(frame['model'])
+        self._frame = frame.reset_index(drop=True)
+
+    @classmethod
+    def from_records(cls, boats: Iterable[Dict]) -> 'BoatCatalog':
+        boats = list(boats)
+        return cls(pd.DataFrame.from_records(boats) if boats else pd.DataFrame(columns=COLUMNS))
+
+    @classmethod
+    def from_db(cls, db_file: str) -> 'BoatCatalog':
+        """Loads every boat from a boats database."""
+        conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            frame = pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM boats ORDER BY id", conn)
+        finally:
+            conn.close()
+        return cls(frame)
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The boats as a DataFrame (without the internal key columns)."""
+        return self._frame[[column for column in self._frame.columns if column not in ('make_key', 'model_norm')]]
+
+    def _take(self, mask) -> 'BoatCatalog':
+        return BoatCatalog(self._frame[mask])
+
+    def mask(self, criteria: Optional[FilterCriteria] = None) -> np.ndarray:
+        """Boolean array of the rows within every bound of criteria (by default, the target window)."""
+        criteria = criteria or FilterCriteria.target()
+        mask = np.ones(len(self._frame), dtype=bool)
+        for column, (low, high) in criteria.bounds().items():
+            values = self._frame[column].to_numpy()
+            # NaN compares False, so missing values fail any bound on their column
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+
+    def filter(self, criteria: Optional[FilterCriteria] = None, **bounds) -> 'BoatCatalog':
+        """
+        Rows within the criteria (by default, the target window); keyword bounds
+        (min_length=..., max_hp=...) override its fields.
+        """
+        criteria = criteria or FilterCriteria.target()
+        if bounds:
+            criteria = FilterCriteria(**{**criteria.__dict__, **bounds})
+        return self._take(self.mask(criteria))
+
+    def unique(self) -> 'BoatCatalog':
+        """Drops repeated make/model pairs (case-insensitive), keeping the first."""
+        keys = (self._frame['make'] + '-' + self._frame['model']).str.lower()
+        return self._take(~keys.duplicated().to_numpy())
+
+    def select(self, criteria: Optional[FilterCriteria] = None, **bounds) -> 'BoatCatalog':
+        """
+        Vectorized filter_boats(): rows within the criteria (which must constrain length
+        and HP, as the target window does), without repeated make/model pairs.
+        """
+        return self.filter(criteria, **bounds).unique()
+
+    def duplicate_mask(self, length_tolerance: float = 0.5) -> np.ndarray:
+        """
+        True for each row that is_duplicate_boat() would reject against the rows kept
+        before it: same make, lengths within the tolerance, and one normalized model
+        name equal to or containing the other.
+        """
+        frame = self._frame
+        duplicate = np.zeros(len(frame), dtype=bool)
+        lengths = frame['length_ft'].fillna(0.0).to_numpy()
+        norms = frame['model_norm'].to_numpy()
+        for _, positions in frame.groupby('make_key', sort=False).indices.items():
+            if len(positions) < 2:
+                continue
+            group_lengths = lengths[positions]
+            order = np.argsort(group_lengths, kind='stable')
+            sorted_lengths = group_lengths[order]
+            low = np.searchsorted(sorted_lengths, group_lengths - length_tolerance - _WINDOW_EPSILON, 'left')
+            high = np.searchsorted(sorted_lengths, group_lengths + length_tolerance + _WINDOW_EPSILON, 'right')
+            windows = high - low
+            for i in np.nonzero(windows > 1)[0]:
+                row = positions[i]
+                for j in order[low[i]:high[i]]:
+                    other = positions[j]
+                    if other >= row or duplicate[other]:
+                        continue  # only boats kept earlier count
+                    if (not abs(lengths[row] - lengths[other]) > length_tolerance and
+                            models_match(norms[row], norms[other])):
+                        duplicate[row] = True
+                        break
+        return duplicate
+
+    def dedupe(self, length_tolerance: float = 0.5) -> 'BoatCatalog':
+        """Drops fuzzy duplicates (see duplicate_mask), keeping the first of each."""
+        return self._take(~self.duplicate_mask(length_tolerance))
+
+    def merge(self, new: 'BoatCatalog') -> 'BoatCatalog':
+        """
+        Folds new boats into the catalog with merge_boat_data()'s rules: a boat matching an
+        existing one on make and normalized model takes the longer model name and fills in
+        missing weight and beam; unmatched boats are appended. Fuzzy matches across
+        different normalized names are left to dedupe().
+        """
+        base = self._frame
+        incoming = new._frame.drop_duplicates(['make_key', 'model_norm'], keep='first')
+        joined = base.merge(incoming, on=['make_key', 'model_norm'], how='left', suffixes=('', '_new'),
+                            indicator=True)
+        matched = (joined['_merge'] == 'both').to_numpy()
+
+        longer = matched & (joined['model_new'].fillna('').str.len() > joined['model'].str.len()).to_numpy()
+        joined.loc[longer, 'model'] = joined.loc[longer, 'model_new']
+        for column in OPTIONAL_SPEC_COLUMNS:
+            # merge_boat_data() treats 0 like a missing value on both sides
+            current, incoming_value = joined[column], joined[f'{column}_new']
+            fill = (current.isna() | (current == 0)) & incoming_value.notna() & (incoming_value != 0)
+            joined.loc[fill, column] = incoming_value[fill]
+
+        merged = joined[base.columns]
+        seen = pd.MultiIndex.from_frame(base[['make_key', 'model_norm']])
+        added = ~pd.MultiIndex.from_frame(new._frame[['make_key', 'model_norm']]).isin(seen)
+        additions = new._frame[added].drop_duplicates(['make_key', 'model_norm'], keep='first')
+        return BoatCatalog(pd.concat([merged, additions], ignore_index=True))
+
+    def to_records(self) -> List[Dict]:
+        """The boats as dicts, with missing values as None and whole-number columns as int."""
+        records = []
+        for record in self.frame.to_dict('records'):
+            for key, value in record.items():
+                if isinstance(value, float) and np.isnan(value):
+                    record[key] = None
+                elif key in INTEGER_COLUMNS and value is not None:
+                    record[key] = int(value)
+            records.append(record)
+        return records
@@ -0,0 +1,283 @@
+"""
+Crawl frontier: cross-query URL deduplication and fetch scheduling.
+
+Different queries and manufacturers keep returning the same review and
+forum pages, often with tracking parameters attached. Search results are
+added to a CrawlFrontier instead of being fetched straight away. The
+frontier canonicalizes each URL, keeps one SQLite row per page and records
+its fetch status. Pages are drained in priority order (after every search
+has run, or in the pipeline as searches add them): the manufacturer's own
+site first, then spec aggregators, then other sites, then forums. A page
+is handed out at most once per run, and pages fetched by an earlier run
+are skipped until revisit_seconds has passed.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from page_cache import normalize_url
+
+logger = logging.getLogger(__name__)
+
+FRONTIER_FILENAME = "frontier.db"
+DEFAULT_REVISIT_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Scheduling priorities, lowest first
+PRIORITY_MANUFACTURER = 0
+PRIORITY_AGGREGATOR = 1
+PRIORITY_OTHER = 2
+PRIORITY_FORUM = 3
+
+# Sites that publish spec sheets for many manufacturers
+SPEC_AGGREGATOR_DOMAINS = frozenset([
+    "boattest.com", "boats.com", "boattrader.com", "yachtworld.com", "iboats.com",
+    "jdpower.com", "nadaguides.com", "boatus.com", "discoverboating.com", "boatingmag.com",
+    "pontoon-boat.com", "smallboatsmonthly.com",
+])
+FORUM_DOMAINS = frozenset([
+    "thehulltruth.com", "reddit.com", "bassboatcentral.com", "tinboats.net",
+    "continuouswave.com", "classicwhaler.com", "wbfforum.com",
+])
+_FORUM_PATH = re.compile(r"(?:^|[/.])(?:forums?|threads?|community|boards?|showthread)(?:[/.]|$)", re.I)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset(["gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid", "_ga", "ref_src"])
+TRACKING_PREFIXES = ("utm_",)
+
+# Frontier row statuses
+STATUS_PENDING = 'pending'
+STATUS_FETCHING = 'fetching'
+STATUS_FETCHED = 'fetched'
+STATUS_FAILED = 'failed'
+
+
+def default_frontier_path(db_file: str) -> str:
+    """Returns the frontier path that sits next to the given boats database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), FRONTIER_FILENAME)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for deduplication.
+    Applies normalize_url() and removes tracking parameters (utm_*, gclid, fbclid...),
+    so the result is still a fetchable URL.
+    """
+    parts = urlsplit(normalize_url(url))
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def _domain_matches(host: str, domains) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def url_priority(url: str, make: str) -> int:
+    """Scheduling priority of a URL found while searching for make (lower is fetched first)."""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    compact_make = re.sub(r'[^a-z0-9]', '', make.lower())
+    if compact_make and compact_make in re.sub(r'[^a-z0-9]', '', host):
+        return PRIORITY_MANUFACTURER
+    if _domain_matches(host, FORUM_DOMAINS) or _FORUM_PATH.search(host) or _FORUM_PATH.search(parts.path):
+        return PRIORITY_FORUM
+    if _domain_matches(host, SPEC_AGGREGATOR_DOMAINS):
+        return PRIORITY_AGGREGATOR
+    return PRIORITY_OTHER
+
+
+@dataclass
+class FrontierEntry:
+    """A page waiting to be fetched, with the search result that found it."""
+    url: str
+    make: str
+    title: str
+    description: str
+    priority: int
+    query: str = ''  # the search that found the page
+
+    def as_result(self) -> Dict:
+        """The entry in search_web() result format."""
+        return {'url': self.url, 'title': self.title, 'description': self.description}
+
+
+class CrawlFrontier:
+    """
+    SQLite-backed set of discovered pages and their fetch status.
+    Safe to share between threads; each call takes the connection lock.
+    Use ":memory:" for a frontier that only dedupes within one run.
+    """
+
+    def __init__(self, db_path: str = ':memory:', revisit_seconds: float = DEFAULT_REVISIT_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, run_id: Optional[str] = None):
+        self.db_path = db_path
+        self.revisit_seconds = revisit_seconds
+        self.max_attempts = max_attempts
+        # Passing an earlier run's id continues that run: its pending pages are drained again
+        self.run_id = run_id or f"{time.time():.6f}"
+        self.added = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                make TEXT NOT NULL,
+                title TEXT,
+                description TEXT,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                discovered_at REAL NOT NULL,
+                fetched_at REAL,
+                error TEXT,
+                query TEXT
+            )
+        ''')
+        # Frontier files from before the query column was added
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(frontier)')}
+        if 'query' not in columns:
+            self._conn.execute('ALTER TABLE frontier ADD COLUMN query TEXT')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_queue ON frontier(run_id, status, priority)')
+        # Pages claimed by a run that never finished go back on the queue
+        self._conn.execute('UPDATE frontier SET status = ? WHERE status = ?', (STATUS_PENDING, STATUS_FETCHING))
+        self._conn.commit()
+
+    def add(self, url: str, make: str, title: str = '', description: str = '', retry: bool = False,
+            query: str = '') -> bool:
+        """
+        Schedules a search result for fetching.
+        Returns False if the page is already scheduled this run, was fetched recently
+        or has failed too often. With retry=True a page this run already fetched or
+        failed is scheduled again (used when resuming an interrupted run).
+        """
+        if not url:
+            return False
+        canonical = canonicalize_url(url)
+        priority = url_priority(canonical, make)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, run_id, attempts, fetched_at, priority FROM frontier WHERE url = ?',
+                (canonical,)).fetchone()
+            if row is None:
+                self._conn.execute('''
+                    INSERT INTO frontier
+                        (url, make, title, description, priority, status, run_id, discovered_at, query)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (canonical, make, title, description, priority, STATUS_PENDING, self.run_id, now, query))
+                self._conn.commit()
+                self.added += 1
+                return True
+
+            status, run_id, attempts, fetched_at, old_priority = row
+            if run_id == self.run_id and retry and status in (STATUS_FETCHED, STATUS_FAILED):
+                self._conn.execute('UPDATE frontier SET status = ? WHERE url = ?', (STATUS_PENDING, canonical))
+                self._conn.commit()
+                self.added += 1
+                return True
+            if run_id == self.run_id:
+                if priority < old_priority and status == STATUS_PENDING:
+                    # Found again via a better match (e.g. the manufacturer's own search)
+                    self._conn.execute('UPDATE frontier SET make = ?, priority = ?, query = ? WHERE url = ?',
+                                       (make, priority, query, canonical))
+                    self._conn.commit()
+                self.duplicates += 1
+                return False
+            recent = fetched_at is not None and now - fetched_at < self.revisit_seconds
+            if (status == STATUS_FETCHED and recent) or (status == STATUS_FAILED and attempts >= self.max_attempts):
+                self.skipped += 1
+                return False
+
+            self._conn.execute('''
+                UPDATE frontier SET make = ?, title = ?, description = ?, priority = ?, status = ?, run_id = ?,
+                    query = ?
+                WHERE url = ?
+            ''', (make, title, description, priority, STATUS_PENDING, self.run_id, query, canonical))
+            self._conn.commit()
+            self.added += 1
+            return True
+
+    def pop(self) -> Optional[FrontierEntry]:
+        """Claims the highest-priority pending page of this run, or returns None when drained."""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT url, make, title, description, priority, query FROM frontier
+                WHERE run_id = ? AND status = ?
+                ORDER BY priority, discovered_at LIMIT 1
+            ''', (self.run_id, STATUS_PENDING)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE frontier SET status = ? WHERE url = ?', (STATUS_FETCHING, row[0]))
+            self._conn.commit()
+        return FrontierEntry(row[0], row[1], row[2] or '', row[3] or '', row[4], row[5] or '')
+
+    def drain(self) -> Iterator[FrontierEntry]:
+        """Yields pending pages in priority order until none are left."""
+        while True:
+            entry = self.pop()
+            if entry is None:
+                return
+            yield entry
+
+    def mark_fetched(self, url: str):
+        """Records a successful fetch."""
+        self._finish(url, STATUS_FETCHED, None)
+
+    def mark_failed(self, url: str, error: str = ''):
+        """Records a failed fetch; the page is retried by later runs up to max_attempts times."""
+        self._finish(url, STATUS_FAILED, error)
+
+    def _finish(self, url: str, status: str, error: Optional[str]):
+        # attempts counts consecutive failures: a successful fetch starts it over
+        with self._lock:
+            self._conn.execute('''
+                UPDATE frontier SET status = ?, error = ?, fetched_at = ?,
+                    attempts = CASE WHEN ? = ? THEN attempts + 1 ELSE 0 END
+                WHERE url = ?
+            ''', (status, error, time.time(), status, STATUS_FAILED, url))
+            self._conn.commit()
+
+    def pending_count(self) -> int:
+        """Number of pages still waiting to be fetched this run."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM frontier WHERE run_id = ? AND status = ?',
+                                      (self.run_id, STATUS_PENDING)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_frontier: Optional[CrawlFrontier] = None
+
+
+def get_frontier() -> Optional[CrawlFrontier]:
+    """Returns the configured persistent frontier, or None if only per-run dedupe is wanted."""
+    return _frontier
+
+
+def configure_frontier(frontier: Optional[CrawlFrontier]) -> Optional[CrawlFrontier]:
+    """Sets (or with None, removes) the frontier shared by the crawl modes."""
+    global _frontier
+    if _frontier is not None and _frontier is not frontier:
+        _frontier.close()
+    _frontier = frontier
+    return _frontier
+
+
+def new_run_frontier() -> CrawlFrontier:
+    """Returns the configured frontier, or a fresh in-memory one for this run."""
+    return _frontier if _frontier is not None else CrawlFrontier(':memory:')
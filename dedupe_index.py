@@ -0,0 +1,127 @@
+"""
+Index structures for fuzzy duplicate detection.
+
+Two boats of the same make are duplicates when their lengths are within a
+tolerance and one normalized model name equals or contains the other. A
+linear scan checks every boat of the make; the helpers here turn both sides
+of the containment test into index lookups instead, both in memory
+(DuplicateIndex, behind is_duplicate_boat()) and on the boats table
+(BoatRepository.find_duplicate()):
+
+- "existing in new": every candidate is one of the new name's substrings,
+  so it is an exact lookup on the normalized model name.
+- "new in existing": a candidate must contain every trigram of the new name,
+  so it is an intersection of trigram posting lists.
+
+Both give a candidate set that is then confirmed with the original
+substring test, so results match the linear scan exactly.
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+TRIGRAM_SIZE = 3
+
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def normalize_model_name(model: str) -> str:
+    """
+    Normalizes a model name for duplicate comparison.
+    Removes leading numbers (like '130' in '130 Super Sport') and extra whitespace.
+    """
+    model = model.lower().strip()
+    # Remove leading numbers followed by space (e.g., "130 super sport" -> "super sport")
+    model = re.sub(r'^\d+\s*', '', model)
+    # Remove common suffixes/prefixes that might vary
+    model = re.sub(r'\s+', ' ', model)  # Normalize whitespace
+    return model
+
+
+def sql_lower(text: str) -> str:
+    """Lowercases ASCII letters only, matching SQLite's built-in LOWER()."""
+    return text.translate(_ASCII_LOWER)
+
+
+def models_match(new_norm: str, existing_norm: str) -> bool:
+    """The duplicate model test: equal, or one normalized name contains the other."""
+    return (new_norm == existing_norm or
+            new_norm in existing_norm or
+            existing_norm in new_norm)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Returns the set of 3-character substrings of text (empty for shorter text)."""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def substrings(text: str) -> Set[str]:
+    """Returns every substring of text, including the empty string."""
+    result = {''}
+    for start in range(len(text)):
+        for end in range(start + 1, len(text) + 1):
+            result.add(text[start:end])
+    return result
+
+
+class DuplicateIndex:
+    """
+    In-memory replacement for repeated is_duplicate_boat() scans.
+    add() boats as they are accepted and call is_duplicate() for each new one;
+    the answer is the same as a linear scan over the added boats.
+    """
+
+    def __init__(self, length_tolerance: float = 0.5, boats: Iterable[Dict] = ()):
+        self.length_tolerance = length_tolerance
+        # make -> model_norm -> lengths of boats with that name
+        self._lengths: Dict[str, Dict[str, List[float]]] = {}
+        # make -> trigram -> model_norms containing it
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+        for boat in boats:
+            self.add(boat)
+
+    def __len__(self) -> int:
+        return sum(len(lengths) for models in self._lengths.values() for lengths in models.values())
+
+    def add(self, boat: Dict):
+        make = boat.get('make', '').lower()
+        model_norm = normalize_model_name(boat.get('model', ''))
+        length = float(boat.get('length_ft', 0))
+
+        models = self._lengths.setdefault(make, {})
+        models.setdefault(model_norm, []).append(length)
+        postings = self._postings.setdefault(make, {})
+        for gram in trigrams(model_norm):
+            postings.setdefault(gram, set()).add(model_norm)
+
+    def _containing(self, make: str, model_norm: str) -> Iterable[str]:
+        """Indexed names of this make that contain model_norm."""
+        models = self._lengths.get(make, {})
+        grams = trigrams(model_norm)
+        if not grams:
+            # Too short for trigrams: any name could contain it
+            return [m for m in models if model_norm in m]
+        postings = self._postings.get(make, {})
+        lists = sorted((postings.get(g, set()) for g in grams), key=len)
+        candidates = set(lists[0]).intersection(*lists[1:])
+        return [m for m in candidates if model_norm in m]
+
+    def is_duplicate(self, boat: Dict) -> bool:
+        make = boat.get('make', '').lower()
+        model_norm = normalize_model_name(boat.get('model', ''))
+        length = float(boat.get('length_ft', 0))
+        models = self._lengths.get(make)
+        if not models:
+            return False
+
+        if len(models) <= len(model_norm) * (len(model_norm) + 1) // 2:
+            # Fewer names than substrings: checking each name directly is cheaper
+            candidates = {m for m in models if models_match(model_norm, m)}
+        else:
+            candidates = {s for s in substrings(model_norm) if s in models}
+            candidates.update(self._containing(make, model_norm))
+        for candidate in candidates:
+            for seen_length in models[candidate]:
+                if not abs(length - seen_length) > self.length_tolerance:
+                    return True
+        return False
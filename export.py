@@ -0,0 +1,204 @@
+"""
+Streaming export of boats.db to CSV, JSON Lines and Parquet.
+
+save_to_csv() writes a list of boats the caller already holds in memory.
+export_boats() instead reads the boats table with one SQLite statement,
+stepping through it with fetchmany() so only chunk_size rows are held at a
+time, and hands each chunk to a format writer:
+
+    csv      header row, then one line per boat
+    jsonl    one JSON object per boat
+    parquet  one row group per chunk, compressed (needs pyarrow:
+             pip install powerboatlist[export])
+
+Exports can select columns, apply the same bounds as query_boats(), and be
+incremental: with since, only boats whose updated_at is at or after that
+time are written. ExportResult.watermark is the newest updated_at exported,
+to pass as since next time; a boat updated in that same second is exported
+again rather than missed, so consumers should upsert by id.
+
+Files are written to a temporary name and renamed into place, so a
+consumer never reads a half-written export.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO
+
+from search_boats import RANGE_BOUNDS, BoatRepository
+
+COLUMNS = ['id', 'make', 'model', 'length_ft', 'max_hp', 'dry_weight_lbs', 'beam_inches', 'source_url',
+           'updated_at']
+FORMATS = ('csv', 'jsonl', 'parquet')
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_COMPRESSION = 'zstd'
+
+# SQLite's CURRENT_TIMESTAMP format (UTC)
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@dataclass
+class ExportResult:
+    """What one export wrote."""
+    path: str
+    format: str
+    rows: int = 0
+    chunks: int = 0
+    watermark: Optional[str] = None
+
+
+def format_for_path(path: str) -> str:
+    """Export format implied by a file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Cannot tell the export format of {path}; use one of {', '.join(FORMATS)}")
+    return EXTENSIONS[extension]
+
+
+def normalize_since(since: str) -> str:
+    """
+    An ISO date or datetime as a UTC timestamp comparable with updated_at.
+    Times without an offset are taken to be UTC, like updated_at itself.
+    """
+    moment = datetime.fromisoformat(since.strip().replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def iter_chunks(conn: sqlite3.Connection, columns: Optional[Sequence[str]] = None, make: Optional[str] = None,
+                since: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                **bounds) -> Iterator[List[tuple]]:
+    """
+    Lists of at most chunk_size rows of the selected columns, in id order.
+    Each row carries updated_at as an extra last value, for the watermark.
+    """
+    columns = list(columns or COLUMNS)
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    unknown = [name for name in bounds if name not in RANGE_BOUNDS]
+    if unknown:
+        raise ValueError(f"Unknown export bounds: {', '.join(unknown)}")
+
+    where, params = BoatRepository._range_conditions(make, bounds)
+    if since:
+        where += (' AND ' if where else ' WHERE ') + 'updated_at >= ?'
+        params.append(normalize_since(since))
+    cursor = conn.execute(f"SELECT {', '.join(columns)}, updated_at FROM boats{where} ORDER BY id", params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _write_csv(stream: TextIO, columns: List[str], chunks: Iterator[List[tuple]]):
+    writer = csv.writer(stream)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(row[:-1] for row in rows)
+
+
+def _write_jsonl(stream: TextIO, columns: List[str], chunks: Iterator[List[tuple]]):
+    for rows in chunks:
+        stream.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+
+
+def _parquet_schema(columns: List[str]):
+    import pyarrow as pa
+
+    types = {'length_ft': pa.float64(), 'id': pa.int64(), 'max_hp': pa.int64(),
+             'dry_weight_lbs': pa.int64(), 'beam_inches': pa.int64()}
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def _write_parquet(path: str, columns: List[str], chunks: Iterator[List[tuple]],
+                   compression: str = DEFAULT_COMPRESSION):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: pip install powerboatlist[export]") from None
+
+    schema = _parquet_schema(columns)
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for rows in chunks:
+            arrays = [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def export_boats(db_file: str, path: str, fmt: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                 make: Optional[str] = None, since: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 compression: str = DEFAULT_COMPRESSION, **bounds) -> ExportResult:
+    """
+    Writes the boats matching make, bounds (see query_boats) and since to path.
+    fmt defaults to the one implied by path's extension; path '-' writes CSV or
+    JSON Lines to stdout.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    if path == '-' and fmt == 'parquet':
+        raise ValueError("Parquet exports need a file path")
+    columns = list(columns or COLUMNS)
+    result = ExportResult(path, fmt)
+
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        def counted(chunks: Iterator[List[tuple]]) -> Iterator[List[tuple]]:
+            for rows in chunks:
+                result.rows += len(rows)
+                result.chunks += 1
+                newest = max((row[-1] for row in rows if row[-1]), default=None)
+                if newest and (result.watermark is None or newest > result.watermark):
+                    result.watermark = newest
+                yield rows
+
+        chunks = counted(iter_chunks(conn, columns, make, since, chunk_size, **bounds))
+        write_text = _write_csv if fmt == 'csv' else _write_jsonl
+        if path == '-':
+            write_text(sys.stdout, columns, chunks)
+            return result
+
+        tmp_path = f"{path}.tmp"
+        try:
+            if fmt == 'parquet':
+                _write_parquet(tmp_path, columns, chunks, compression)
+            else:
+                with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                    write_text(f, columns, chunks)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    finally:
+        conn.close()
+    return result
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    """The boats in an export file, as dicts (mainly for tests and spot checks)."""
+    fmt = format_for_path(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    elif fmt == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
@@ -0,0 +1,138 @@
+"""
+Persistent cache of Claude extraction results.
+
+extract_specs() sends up to 4000 characters of page text to Claude. Mirror
+pages, pages that did not change between runs and the title/description
+fallback snippets repeat constantly, so results are memoized in a SQLite
+file next to boats.db. Entries are keyed on a hash of the prompt template
+version, the model name and the whitespace-normalized text that was sent, so
+bumping the prompt version or switching models never returns stale results.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "extraction_cache.db"
+
+
+def default_cache_path(db_file: str) -> str:
+    """Returns the extraction cache path that sits next to the given boats database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), CACHE_FILENAME)
+
+
+def make_cache_key(prompt_version: int, model: str, text: str) -> str:
+    """Hashes the prompt version, model and cleaned text into a cache key."""
+    cleaned = ' '.join(text.split())
+    payload = f"{prompt_version}\x00{model}\x00{cleaned}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite-backed memo of parsed extract_specs() results.
+    Safe to share between threads; each call takes the connection lock.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                cache_key TEXT PRIMARY KEY,
+                prompt_version INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_extraction_cache_version ON extraction_cache(prompt_version, model)')
+        self._conn.commit()
+
+    def get(self, prompt_version: int, model: str, text: str) -> Optional[List[Dict]]:
+        """Returns the cached boat list for this text, or None on a miss."""
+        key = make_cache_key(prompt_version, model, text)
+        with self._lock:
+            row = self._conn.execute('SELECT result_json FROM extraction_cache WHERE cache_key = ?',
+                                     (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute('UPDATE extraction_cache SET hit_count = hit_count + 1 WHERE cache_key = ?', (key,))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, prompt_version: int, model: str, text: str, boats: List[Dict]):
+        """Stores the parsed boat list returned for this text."""
+        key = make_cache_key(prompt_version, model, text)
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO extraction_cache (cache_key, prompt_version, model, result_json, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, prompt_version, model, json.dumps(boats), time.time()))
+            self._conn.commit()
+
+    def invalidate(self, prompt_version: Optional[int] = None, model: Optional[str] = None) -> int:
+        """
+        Deletes cached results for a prompt version and/or model (everything if both are None).
+        Returns the number of entries removed.
+        """
+        clauses, params = [], []
+        if prompt_version is not None:
+            clauses.append('prompt_version = ?')
+            params.append(prompt_version)
+        if model is not None:
+            clauses.append('model = ?')
+            params.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            cursor = self._conn.execute(f'DELETE FROM extraction_cache{where}', params)
+            self._conn.commit()
+        return cursor.rowcount
+
+    def prune_stale(self, prompt_version: int, model: str) -> int:
+        """Deletes entries from any other prompt version or model. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM extraction_cache WHERE prompt_version != ? OR model != ?', (prompt_version, model))
+            self._conn.commit()
+        return cursor.rowcount
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Returns the configured extraction cache, or None if caching is disabled."""
+    return _cache
+
+
+def configure_extraction_cache(cache: Optional[ExtractionCache]) -> Optional[ExtractionCache]:
+    """Sets (or with None, disables) the extraction cache used by extract_specs()."""
+    global _cache
+    if _cache is not None and _cache is not cache:
+        _cache.close()
+    _cache = cache
+    return _cache
@@ -0,0 +1,195 @@
+"""
+Streaming HTML-to-text extraction.
+
+fetch_webpage() used to download the whole response, build a full
+BeautifulSoup tree, decompose scripts/styles/page chrome and then keep only
+the first 8000 characters of text. StreamingTextExtractor is an incremental
+html.parser.HTMLParser: it is fed the body chunk by chunk as it downloads,
+drops ignored elements as it goes and reports done once the text budget is
+filled, so the caller can stop reading the response.
+"""
+
+import codecs
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional
+
+# Elements whose content is never visible page text
+IGNORED_TAGS = frozenset(["script", "style", "nav", "footer", "header"])
+
+# Elements kept whole as one block, however much markup they contain
+CONTAINER_TAGS = frozenset(["table", "dl", "ul", "ol"])
+# Elements that start a new block of text
+BLOCK_TAGS = frozenset(["title", "p", "div", "section", "article", "li", "dt", "dd", "tr",
+                        "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "form"])
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class TextBlock:
+    """Visible text of one block-level element (a table, list, paragraph, heading...)."""
+    kind: str
+    text: str
+
+
+class StreamingTextExtractor(HTMLParser):
+    """
+    Collects visible text from HTML fed in arbitrary chunks.
+    Text matches BeautifulSoup's get_text(separator=' ', strip=True) with whitespace
+    collapsed, truncated to max_chars.
+    """
+
+    def __init__(self, max_chars: int = 8000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.done = False
+        self._pieces: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+        # Data for the current text node; the parser may deliver it in several parts
+        self._buffer: List[str] = []
+        self._buffered = 0
+        # Block segmentation, see blocks
+        self._blocks: List[TextBlock] = []
+        self._block_pieces: List[str] = []
+        self._block_kind = 'text'
+        self._container_depth = 0
+
+    def _end_block(self, next_kind: str = 'text'):
+        if self._block_pieces:
+            self._blocks.append(TextBlock(self._block_kind, ' '.join(self._block_pieces)))
+        self._block_pieces = []
+        self._block_kind = next_kind
+
+    def _flush(self):
+        """Adds the buffered text node as one stripped, whitespace-collapsed piece."""
+        if not self._buffer:
+            return
+        piece = _WHITESPACE.sub(' ', ''.join(self._buffer)).strip()
+        self._buffer = []
+        self._buffered = 0
+        if not piece:
+            return
+        self._pieces.append(piece)
+        self._block_pieces.append(piece)
+        self._length += len(piece) + 1
+        if self._length >= self.max_chars:
+            self.done = True
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in IGNORED_TAGS:
+            self._skip_depth += 1
+        elif tag in CONTAINER_TAGS:
+            if not self._container_depth:
+                self._end_block(tag)
+            self._container_depth += 1
+        elif tag in BLOCK_TAGS and not self._container_depth:
+            self._end_block(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags (<br/>, <img/>) never open an ignored element
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in IGNORED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif tag in CONTAINER_TAGS:
+            if self._container_depth:
+                self._container_depth -= 1
+                if not self._container_depth:
+                    self._end_block()
+        elif tag in BLOCK_TAGS and not self._container_depth:
+            self._end_block()
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.max_chars:
+            # A single huge text node: no need to wait for the next tag
+            self._flush()
+
+    def feed(self, data: str):
+        if not self.done:
+            super().feed(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    @property
+    def text(self) -> str:
+        # Include a text node still waiting for its closing tag
+        self._flush()
+        return ' '.join(self._pieces)[:self.max_chars]
+
+    @property
+    def blocks(self) -> List[TextBlock]:
+        """The text split at block-level elements, in document order."""
+        self._flush()
+        pending = [TextBlock(self._block_kind, ' '.join(self._block_pieces))] if self._block_pieces else []
+        return self._blocks + pending
+
+
+def html_to_text(html: str, max_chars: int = 8000, chunk_size: int = 16384) -> str:
+    """Extracts up to max_chars of visible text from an HTML string, stopping early once full."""
+    extractor = StreamingTextExtractor(max_chars)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+    return extractor.text
+
+
+def html_to_blocks(html: str, max_chars: int = 8000, chunk_size: int = 16384) -> List[TextBlock]:
+    """Like html_to_text(), but returns the text split into block-level elements."""
+    extractor = StreamingTextExtractor(max_chars)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+    return extractor.blocks
+
+
+@dataclass
+class StreamResult:
+    """Text extracted from a streamed body, plus the bytes read to produce it."""
+    text: str
+    blocks: List[TextBlock]
+    body: bytes
+    complete: bool  # False if reading stopped before the end of the body
+
+
+def stream_text(chunks: Iterable[bytes], encoding: Optional[str], max_chars: int = 8000,
+                max_bytes: int = 2 * 1024 * 1024) -> StreamResult:
+    """
+    Decodes and parses a stream of body chunks until the text budget or byte cap is reached.
+    Returns the extracted text together with the raw bytes that were consumed.
+    """
+    extractor = StreamingTextExtractor(max_chars)
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    body = bytearray()
+    complete = False
+    for chunk in chunks:
+        body.extend(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or len(body) >= max_bytes:
+            break
+    else:
+        extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+        complete = True
+    return StreamResult(extractor.text, extractor.blocks, bytes(body), complete)
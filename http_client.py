@@ -0,0 +1,199 @@
+"""
+Shared HTTP client for Brave searches and page fetches.
+
+search_web() and fetch_webpage() used to call bare requests.get(), paying a
+new TCP/TLS handshake for every request. HttpClient wraps one requests.Session
+with per-host keep-alive pools, explicit connect/read timeouts, gzip/brotli
+decoding and retry with backoff on 429/5xx, and counts how many connections
+were opened versus reused. When a rate limiter is configured, every request
+first waits on its service or host bucket and reports its status back.
+
+5xx responses are retried inside the session by urllib3. 429s are retried
+by HttpClient.get() instead, so every retry takes a token from the bucket
+and the limiter sees each 429 and backs off.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from rate_limit import get_rate_limiter, host_key, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HttpClientConfig:
+    """Connection pool, timeout and retry settings."""
+    pool_connections: int = 20      # number of hosts to keep pools for
+    pool_maxsize: int = 10          # keep-alive connections per host
+    connect_timeout: float = 5.0
+    read_timeout: float = 15.0
+    max_retries: int = 3
+    backoff_factor: float = 0.5     # sleeps 0.5s, 1s, 2s between retries
+    # Retried by urllib3; 429s are retried by HttpClient.get() through the rate limiter
+    status_forcelist: Tuple[int, ...] = (500, 502, 503, 504)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+class ConnectionStats:
+    """Thread-safe counters for requests sent and connections opened per host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+        self.opened_by_host: Dict[str, int] = {}
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_open(self, host: str):
+        with self._lock:
+            self.opened += 1
+            self.opened_by_host[host] = self.opened_by_host.get(host, 0) + 1
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.opened, 0)
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'opened': self.opened,
+                'reused': max(self.requests - self.opened, 0),
+                'opened_by_host': dict(self.opened_by_host),
+            }
+
+
+def _counting_pool(base, stats: ConnectionStats):
+    """Builds a urllib3 pool class that reports connection checkouts and opens to stats."""
+
+    class CountingPool(base):
+        def _get_conn(self, timeout=None):
+            stats.record_request()
+            return super()._get_conn(timeout)
+
+        def _new_conn(self):
+            stats.record_open(self.host)
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools feed a ConnectionStats instance."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+
+class SessionRetry(Retry):
+    """urllib3 Retry that never retries a 429, even one with a Retry-After header."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by every search and page fetch in a run.
+    Requests use the configured (connect, read) timeout unless one is passed explicitly.
+    """
+
+    def __init__(self, config: Optional[HttpClientConfig] = None):
+        self.config = config or HttpClientConfig()
+        self.stats = ConnectionStats()
+        self.session = requests.Session()
+        # ACCEPT_ENCODING includes "br" when brotli/brotlicffi is installed
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+        retry = SessionRetry(
+            total=self.config.max_retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=self.config.status_forcelist,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            max_retries=retry,
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, rate_key: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the shared session.
+        Waits on the rate limiter bucket rate_key (default: the URL's host) when one is configured.
+        A 429 is retried up to max_retries times, each retry waiting on the bucket again (or,
+        without a limiter, for Retry-After or the backoff); the last response is returned.
+        """
+        kwargs.setdefault('timeout', self.config.timeout)
+        limiter = get_rate_limiter()
+        key = rate_key or host_key(url)
+        for attempt in range(self.config.max_retries + 1):
+            if limiter:
+                limiter.acquire(key)
+            response = self.session.get(url, **kwargs)
+            retry_after = response.headers.get('Retry-After')
+            if limiter:
+                limiter.record_response(key, response.status_code, retry_after)
+            if response.status_code != 429 or attempt == self.config.max_retries:
+                return response
+            response.close()
+            if not limiter:
+                delay = parse_retry_after(retry_after)
+                time.sleep(delay if delay is not None else self.config.backoff_factor * 2 ** attempt)
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Returns the process-wide HttpClient, creating it with default settings on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def configure_http_client(config: HttpClientConfig) -> HttpClient:
+    """Replaces the process-wide HttpClient with one built from config."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = HttpClient(config)
+        return _client
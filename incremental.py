@@ -0,0 +1,72 @@
+"""
+Incremental refresh of known source pages.
+
+A full crawl regenerates queries, searches every manufacturer and
+re-extracts every page. For a nightly refresh, almost none of that changes.
+refresh_sources() works from the source_pages table instead: it picks pages
+whose last successful fetch is older than max_age_hours, re-fetches them
+(with If-None-Match/If-Modified-Since through the page cache, so unchanged
+pages usually cost a 304), and compares the hash of the extraction text
+with the one stored last time. Only pages whose text changed go to the
+extractor, so a refresh makes no search calls and only a handful of Claude
+calls.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import search_boats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_HOURS = 7 * 24
+
+
+@dataclass
+class RefreshStats:
+    """Counters collected during an incremental refresh."""
+    checked: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    failed: int = 0
+    new_boats: int = 0
+    updated_boats: int = 0
+
+
+def refresh_sources(max_age_hours: float = DEFAULT_MAX_AGE_HOURS, limit: Optional[int] = None) -> RefreshStats:
+    """
+    Re-checks stale source pages and re-extracts the ones whose content changed.
+    Pages that cannot be fetched keep their old timestamp and are retried next time.
+    """
+    stats = RefreshStats()
+    repository = search_boats.get_repository()
+    sources = repository.stale_source_pages(max_age_hours, limit)
+    logger.info(f"🔄 Incremental refresh: {len(sources)} sources older than {max_age_hours:g}h")
+
+    for source in sources:
+        url = source['url']
+        stats.checked += 1
+        # Revalidate the cached copy instead of trusting the TTL; a 304 reuses the cached body
+        content = search_boats.fetch_webpage(url, force_revalidate=True)
+        if not content:
+            stats.failed += 1
+            continue
+
+        digest = search_boats.page_content_hash(content)
+        if digest == source['content_hash']:
+            repository.record_source_page(url, source['make'], source['title'], digest)
+            stats.unchanged += 1
+            continue
+
+        stats.changed += 1
+        logger.info(f"   Changed: {url}")
+        boats_found = search_boats.extract_page_boats(content, source['make'], source['title'], url)
+        new, updated = search_boats.persist_boats(boats_found, url)
+        repository.record_source_page(url, source['make'], source['title'], digest)
+        stats.new_boats += new
+        stats.updated_boats += updated
+
+    logger.info(f"🔄 Checked {stats.checked}: {stats.changed} changed, {stats.unchanged} unchanged, "
+                f"{stats.failed} failed")
+    return stats
@@ -0,0 +1,187 @@
+"""
+Claude token and cost accounting, with an optional spend ceiling.
+
+Every create_message() call reports its response.usage to the configured
+UsageTracker, tagged with what the call was for (query generation or
+extraction), the manufacturer and the page URL. The tracker keeps run
+totals and per-domain figures in memory and, when given the repository,
+writes one llm_usage row per call to boats.db so spend can be aggregated per
+manufacturer, domain or run later.
+
+With a budget, check() is called before each request:
+
+    spend < soft limit            every call goes ahead
+    soft limit <= spend < budget  calls for pages on low-yield domains are refused
+    spend >= budget               every call is refused
+
+A domain is low-yield once at least min_pages of its pages have gone to
+Claude (in this run or, via the llm_usage history, earlier ones) without a
+single boat. Refused calls raise BudgetExceededError, which the callers
+treat like any other API failure: extraction returns no boats and query
+generation falls back to the templated queries. The rule-based fast path
+does not use tokens and keeps working after the budget is spent.
+
+Message Batches requests are billed at BATCH_PRICE_FACTOR of the normal
+price. A batch is checked against the budget before it is submitted, with
+each request's estimated cost counted as pending spend.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Call purposes
+PURPOSE_QUERIES = 'queries'
+PURPOSE_EXTRACT = 'extract'
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+}
+
+# Message Batches requests cost half the synchronous price
+BATCH_PRICE_FACTOR = 0.5
+
+DEFAULT_SOFT_FRACTION = 0.8
+DEFAULT_MIN_PAGES = 3
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of sending a Claude request the budget does not allow."""
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int, batch: bool = False) -> float:
+    """USD cost of one call (or batch request); 0.0 for models without a known price."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return cost * BATCH_PRICE_FACTOR if batch else cost
+
+
+def url_domain(url: Optional[str]) -> str:
+    """Host of a URL without a leading www., or '' if there is none."""
+    host = (urlsplit(url).hostname or '') if url else ''
+    return host[4:] if host.startswith('www.') else host
+
+
+@dataclass
+class DomainUsage:
+    """Claude spend and yield for one domain."""
+    pages: int = 0
+    tokens: int = 0
+    cost_usd: float = 0.0
+    boats: int = 0
+
+
+class UsageTracker:
+    """
+    Run totals and per-domain spend, optionally persisted and capped.
+    Safe to share between threads; each update takes the tracker lock.
+    """
+
+    def __init__(self, repository=None, run_id: Optional[str] = None, budget_usd: Optional[float] = None,
+                 soft_fraction: float = DEFAULT_SOFT_FRACTION, min_pages: int = DEFAULT_MIN_PAGES):
+        self.repository = repository
+        self.run_id = run_id
+        self.budget_usd = budget_usd
+        self.soft_fraction = soft_fraction
+        self.min_pages = min_pages
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+        self.refused = 0
+        self.domains: Dict[str, DomainUsage] = {}
+        self._extracted_urls = set()
+        self._lock = threading.Lock()
+
+    def seed(self, history: Iterable[Dict]):
+        """Loads per-domain pages, tokens and boats from earlier runs (see BoatRepository.domain_yield)."""
+        with self._lock:
+            for row in history:
+                usage = self.domains.setdefault(row['domain'], DomainUsage())
+                usage.pages += row['pages']
+                usage.tokens += row['tokens']
+                usage.cost_usd += row['cost_usd']
+                usage.boats += row['boats']
+
+    def is_low_yield(self, domain: str) -> bool:
+        usage = self.domains.get(domain)
+        return bool(usage and usage.pages >= self.min_pages and usage.boats == 0)
+
+    def check(self, purpose: str, url: Optional[str] = None, pending_usd: float = 0.0):
+        """
+        Raises BudgetExceededError if the budget does not allow a call for this purpose and page.
+        pending_usd is spend committed but not recorded yet, such as the estimate for a batch.
+        """
+        if self.budget_usd is None:
+            return
+        with self._lock:
+            spent = self.cost_usd + pending_usd
+            domain = url_domain(url)
+            if spent >= self.budget_usd:
+                reason = f"budget of ${self.budget_usd:.2f} spent"
+            elif spent >= self.budget_usd * self.soft_fraction and domain and self.is_low_yield(domain):
+                reason = f"near budget, skipping low-yield domain {domain}"
+            else:
+                return
+            self.refused += 1
+        raise BudgetExceededError(reason)
+
+    def record_call(self, purpose: str, model: str, input_tokens: int, output_tokens: int,
+                    make: Optional[str] = None, url: Optional[str] = None, batch: bool = False) -> float:
+        """Adds one call's tokens to the totals (and llm_usage). Returns its cost."""
+        cost = call_cost(model, input_tokens, output_tokens, batch)
+        domain = url_domain(url)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cost_usd += cost
+            if domain:
+                usage = self.domains.setdefault(domain, DomainUsage())
+                usage.tokens += input_tokens + output_tokens
+                usage.cost_usd += cost
+                if url not in self._extracted_urls:
+                    self._extracted_urls.add(url)
+                    usage.pages += 1
+        if self.repository is not None:
+            self.repository.record_llm_usage(self.run_id, purpose, model, input_tokens, output_tokens, cost,
+                                             make=make, url=url, domain=domain or None)
+        return cost
+
+    def record_page(self, url: str, boats_found: int):
+        """Credits the boats a page yielded to its domain (and its llm_usage rows)."""
+        with self._lock:
+            if url not in self._extracted_urls:
+                return
+            self.domains[url_domain(url)].boats += boats_found
+        if self.repository is not None and boats_found:
+            self.repository.record_page_yield(self.run_id, url, boats_found)
+
+    def wasted_domains(self, limit: int = 5) -> Dict[str, DomainUsage]:
+        """Domains that used tokens without yielding a boat, most tokens first."""
+        with self._lock:
+            wasted = [(domain, usage) for domain, usage in self.domains.items() if usage.tokens and not usage.boats]
+        wasted.sort(key=lambda item: -item[1].tokens)
+        return dict(wasted[:limit])
+
+
+_tracker: Optional[UsageTracker] = None
+
+
+def get_usage_tracker() -> Optional[UsageTracker]:
+    """Returns the configured usage tracker, or None if token usage is not accounted."""
+    return _tracker
+
+
+def configure_usage_tracker(tracker: Optional[UsageTracker]) -> Optional[UsageTracker]:
+    """Sets (or with None, removes) the tracker create_message() reports to."""
+    global _tracker
+    _tracker = tracker
+    return _tracker
@@ -0,0 +1,205 @@
+"""
+Run metrics: counters, timers and histograms.
+
+The crawl used to report only emoji log lines and a final count. Metrics
+collects, per run, how long each stage takes (query generation, search,
+fetch, parse, extract, Claude calls, dedupe lookups, DB writes) and counts
+pages, bytes, tokens, cache hits and boats. Everything is kept in memory and
+exported at the end of the run:
+
+    write_jsonl()       appends one JSON object per series to a JSON-lines file
+    write_prometheus()  writes the Prometheus text format, for the node_exporter
+                        textfile collector or a Pushgateway
+
+Series are named without the powerboat_ prefix, which is added on export.
+Timers record seconds into a histogram with a 'stage' label, so the
+Prometheus output has stage_seconds_bucket{stage="fetch",le="0.5"} etc.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PREFIX = "powerboat_"
+
+# Histogram bucket upper bounds in seconds; +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = 'stage_seconds'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf if it is past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(q * self.count)
+        for bound, cumulative in zip(self.buckets, self.counts):
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+
+class Metrics:
+    """
+    In-memory registry of counters and histograms, keyed by name and labels.
+    Safe to share between threads; each update takes the registry lock.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Adds value to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Records one value in a histogram."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Times the block into stage_seconds{stage=...}, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self.counters.get(name, {}).get(_label_key(labels), 0)
+
+    def total(self, name: str) -> float:
+        """Sum of a counter over all its label values."""
+        with self._lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self.histograms.get(name, {}).get(_label_key(labels))
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Total seconds spent per timed stage."""
+        with self._lock:
+            series = self.histograms.get(STAGE_SECONDS, {})
+            return {dict(key).get('stage', ''): hist.sum for key, hist in series.items()}
+
+    def records(self) -> List[Dict]:
+        """One dict per series, as written to the JSON-lines export."""
+        with self._lock:
+            records = []
+            for name, series in sorted(self.counters.items()):
+                for key, value in sorted(series.items()):
+                    records.append({'metric': name, 'type': 'counter', 'labels': dict(key), 'value': value})
+            for name, series in sorted(self.histograms.items()):
+                for key, hist in sorted(series.items()):
+                    records.append({
+                        'metric': name, 'type': 'histogram', 'labels': dict(key),
+                        'count': hist.count, 'sum': hist.sum,
+                        'p50': _finite(hist.quantile(0.5)), 'p95': _finite(hist.quantile(0.95)),
+                        'buckets': {str(bound): count for bound, count in zip(hist.buckets, hist.counts)},
+                    })
+        return records
+
+    def write_jsonl(self, path: str, run_id: Optional[str] = None):
+        """Appends this run's series to a JSON-lines file, one object per line."""
+        timestamp = time.time()
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records():
+                record.update(run_id=run_id, timestamp=timestamp)
+                f.write(json.dumps(record, default=str) + '\n')
+
+    def prometheus_text(self) -> str:
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{PREFIX}{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for key, hist in sorted(series.items()):
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{PREFIX}{name}_bucket{_format_labels(key, le=repr(bound))} {count}")
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{PREFIX}{name}_sum{_format_labels(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{PREFIX}{name}_count{_format_labels(key)} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Writes the Prometheus text format to path, replacing it atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+def _finite(value: float) -> Optional[float]:
+    """None for values past the last bucket, which JSON cannot represent."""
+    return value if math.isfinite(value) else None
+
+
+def _format_labels(key: LabelKey, **extra) -> str:
+    pairs = list(key) + sorted(extra.items())
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Returns the metrics registry for the current run."""
+    return _metrics
+
+
+def configure_metrics(metrics: Optional[Metrics] = None) -> Metrics:
+    """Replaces the metrics registry (with None, a fresh empty one) and returns it."""
+    global _metrics
+    _metrics = metrics or Metrics()
+    return _metrics
@@ -0,0 +1,256 @@
+"""
+Content-addressed on-disk cache for fetched pages.
+
+Bodies are stored once under the SHA-256 of their bytes in <cache_dir>/blobs,
+and a small SQLite index maps each normalized URL to its body hash together
+with the ETag/Last-Modified validators from the response. Entries younger
+than the TTL are served without touching the network; older entries are
+revalidated with If-None-Match/If-Modified-Since and reused on a 304. The
+total size of stored bodies is bounded with least-recently-used eviction.
+
+A body the fetcher stopped reading early is stored as partial: without
+validators, and with the text budget (partial_chars) it was read for, so a
+read that needs more text fetches the page again instead of reusing it.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "page_cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL for use as a cache key.
+    Lowercases scheme and host, drops default ports and fragments, sorts query parameters
+    and strips a trailing slash from non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+@dataclass
+class CachedPage:
+    """A cached response body and its revalidation headers."""
+    url: str
+    body_hash: str
+    body: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    partial_chars: Optional[int] = None  # text budget a partial body was read for; None if complete
+
+    @property
+    def complete(self) -> bool:
+        return self.partial_chars is None
+
+    def covers(self, max_chars: Optional[int]) -> bool:
+        """True if the body holds enough of the page for a read of max_chars (None: the whole body)."""
+        return self.complete or (max_chars is not None and max_chars <= self.partial_chars)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class PageCache:
+    """
+    On-disk page cache keyed by normalized URL.
+    Safe to share between threads; each call takes the index lock.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                partial_chars INTEGER
+            )
+        ''')
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(pages)')}
+        if 'partial_chars' not in columns:
+            self._conn.execute('ALTER TABLE pages ADD COLUMN partial_chars INTEGER')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_body_hash ON pages(body_hash)')
+        self._conn.commit()
+
+    def _blob_path(self, body_hash: str) -> str:
+        return os.path.join(self.blob_dir, body_hash[:2], body_hash)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Returns the cached page for url, or None if it is not cached."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, body_hash, encoding, etag, last_modified, fetched_at, partial_chars FROM pages '
+                'WHERE url_key = ?',
+                (key,)).fetchone()
+            if not row:
+                return None
+            try:
+                with open(self._blob_path(row[1]), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                # Blob was removed out from under the index
+                self._conn.execute('DELETE FROM pages WHERE url_key = ?', (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute('UPDATE pages SET last_access = ? WHERE url_key = ?', (time.time(), key))
+            self._conn.commit()
+        return CachedPage(url=row[0], body_hash=row[1], body=body, encoding=row[2], etag=row[3],
+                          last_modified=row[4], fetched_at=row[5], partial_chars=row[6])
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """True if the page is within its TTL and can be used without revalidation."""
+        return time.time() - page.fetched_at < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(page: CachedPage) -> Dict[str, str]:
+        """Builds If-None-Match/If-Modified-Since headers for revalidating page."""
+        headers = {}
+        if page.etag:
+            headers['If-None-Match'] = page.etag
+        if page.last_modified:
+            headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def put(self, url: str, body: bytes, encoding: Optional[str] = None, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, partial_chars: Optional[int] = None) -> CachedPage:
+        """
+        Stores a fetched body, sharing the blob with any identical cached body.
+        With partial_chars the body is a prefix read for that much text, and its
+        validators are dropped so a 304 can never stand in for the full page.
+        """
+        if partial_chars is not None:
+            etag = last_modified = None
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT body_hash FROM pages WHERE url_key = ?',
+                                     (normalize_url(url),)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO pages
+                    (url_key, url, body_hash, encoding, etag, last_modified, size, fetched_at, last_access,
+                     partial_chars)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (normalize_url(url), url, body_hash, encoding, etag, last_modified, len(body), now, now,
+                  partial_chars))
+            self._conn.commit()
+            if old and old[0] != body_hash:
+                self._remove_blob_if_unused(old[0])
+            self._evict()
+        return CachedPage(url=url, body_hash=body_hash, body=body, encoding=encoding, etag=etag,
+                          last_modified=last_modified, fetched_at=now, partial_chars=partial_chars)
+
+    def touch(self, url: str):
+        """Marks a cached page as freshly validated after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE pages SET fetched_at = ?, last_access = ? WHERE url_key = ?',
+                               (now, now, normalize_url(url)))
+            self._conn.commit()
+
+    def total_bytes(self) -> int:
+        """Size of all distinct stored bodies."""
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM pages)').fetchone()
+        return row[0]
+
+    def _remove_blob_if_unused(self, body_hash: str) -> bool:
+        """Deletes a blob no index row points at. Returns True if it was removed."""
+        in_use = self._conn.execute('SELECT 1 FROM pages WHERE body_hash = ? LIMIT 1', (body_hash,)).fetchone()
+        if in_use:
+            return False
+        try:
+            os.remove(self._blob_path(body_hash))
+        except OSError:
+            pass
+        return True
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes."""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT url_key, body_hash, size FROM pages ORDER BY last_access').fetchall()
+        for url_key, body_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM pages WHERE url_key = ?', (url_key,))
+            if self._remove_blob_if_unused(body_hash):
+                total -= size
+            logger.debug(f"Evicted {url_key} from page cache")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Returns the configured page cache, or None if caching is disabled."""
+    return _cache
+
+
+def configure_page_cache(cache: Optional[PageCache]) -> Optional[PageCache]:
+    """Sets (or with None, disables) the page cache used by fetch_webpage()."""
+    global _cache
+    if _cache is not None and _cache is not cache:
+        _cache.close()
+    _cache = cache
+    return _cache
@@ -0,0 +1,85 @@
+"""
+Process-pool HTML parsing.
+
+Turning HTML into text (html.parser tokenizing, whitespace cleanup, block
+scoring) is pure-Python CPU work. With many fetch threads, or when
+re-processing thousands of cached pages, it holds the GIL and becomes the
+bottleneck. A ParsePool hands raw HTML bodies to a ProcessPoolExecutor so
+parsing scales with cores. At most max_pending bodies are in flight; run()
+blocks once that many are waiting, so fetchers cannot pile up unbounded HTML
+in memory.
+
+The worker functions only import html_text and spec_sections, so worker
+processes start without loading the Anthropic client or the database layer.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from html_text import html_to_blocks, html_to_text
+from spec_sections import SpecSelection, select_spec_blocks
+
+logger = logging.getLogger(__name__)
+
+
+def parse_text(html: str, max_chars: int) -> str:
+    """Worker function: visible text of a page, as fetch_page_text() returns it."""
+    return html_to_text(html, max_chars)
+
+
+def parse_spec_selection(html: str, max_chars: int, token_budget: int) -> SpecSelection:
+    """Worker function: the page's most spec-dense blocks, as fetch_spec_selection() picks them."""
+    return select_spec_blocks(html_to_blocks(html, max_chars), token_budget=token_budget)
+
+
+class ParsePool:
+    """
+    ProcessPoolExecutor with a bound on queued work.
+    Safe to share between threads; submit() blocks while max_pending jobs are in flight.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.submitted = 0
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queues fn(*args) on a worker process, waiting for a free slot first."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        self.submitted += 1
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args):
+        """Runs fn(*args) on a worker process and returns its result."""
+        return self.submit(fn, *args).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool: Optional[ParsePool] = None
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """Returns the configured parse pool, or None if pages are parsed in the fetching thread."""
+    return _pool
+
+
+def configure_parse_pool(pool: Optional[ParsePool]) -> Optional[ParsePool]:
+    """Sets (or with None, shuts down) the parse pool used by fetch_webpage()."""
+    global _pool
+    if _pool is not None and _pool is not pool:
+        _pool.close()
+    _pool = pool
+    return _pool
@@ -0,0 +1,217 @@
+"""
+Concurrent crawl pipeline for PowerboatList.
+
+The sequential loop in search_boats.main() waits on every search, fetch and
+Claude call in turn. This module runs the same work as a chain of asyncio
+stages connected by bounded queues:
+
+    manufacturers -> query generation -> search -> frontier
+    frontier -> fetch -> extract -> persist
+
+Searches feed a CrawlFrontier, which drops URLs already seen this run (or
+recently fetched by an earlier one), and the fetch stages drain it while
+searches are still running: each unique page is fetched and extracted once,
+highest priority first among the URLs queued so far. The feeder waits on
+the frontier until the search stage has finished. Each stage has its own
+worker count, so a full run takes roughly as long as its slowest stage
+instead of the sum of every call. The stage functions are
+the existing blocking helpers in search_boats, run on a thread pool.
+Persistence runs on a single worker, one transaction per page, so
+find_duplicate_in_db/upsert_boat see the same database state as the
+sequential loop.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import search_boats
+from crawl_frontier import CrawlFrontier, FrontierEntry, new_run_frontier
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class PipelineConfig:
+    """Worker counts and limits for each pipeline stage."""
+    query_workers: int = 2
+    search_workers: int = 4
+    fetch_workers: int = 8
+    extract_workers: int = 4
+    queue_size: int = 100
+    queries_per_manufacturer: int = 1
+    results_per_query: int = 3
+
+
+@dataclass
+class PipelineStats:
+    """Counters collected during a pipeline run."""
+    queries: int = 0
+    searches: int = 0
+    duplicate_urls: int = 0
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    extractions: int = 0
+    boats_found: int = 0
+    new_boats: int = 0
+    updated_boats: int = 0
+    errors: int = 0
+
+
+async def _run_stage(name: str, inbox: asyncio.Queue, outbox: asyncio.Queue,
+                     handler: Callable[[Any], Any], workers: int, downstream_workers: int,
+                     stats: PipelineStats):
+    """
+    Runs `workers` copies of an async handler over inbox items.
+    Each handler returns a list of items for the next stage. Once every worker has
+    seen the end marker, one end marker per downstream worker is sent on.
+    """
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            try:
+                for out in await handler(item):
+                    await outbox.put(out)
+            except Exception as e:
+                stats.errors += 1
+                logger.warning(f"   {name} stage failed: {e}")
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    for _ in range(downstream_workers):
+        await outbox.put(_DONE)
+
+
+async def run_pipeline_async(manufacturers: List[str], config: PipelineConfig,
+                             frontier: CrawlFrontier = None) -> PipelineStats:
+    """Runs the crawl pipeline on the current event loop."""
+    stats = PipelineStats()
+    frontier = frontier or new_run_frontier()
+    loop = asyncio.get_running_loop()
+    pool_size = (config.query_workers + config.search_workers +
+                 config.fetch_workers + config.extract_workers + 2)  # + persist and frontier feeder
+    executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="pipeline")
+
+    def call(fn, *args):
+        return loop.run_in_executor(executor, fn, *args)
+
+    makes_q: asyncio.Queue = asyncio.Queue()
+    queries_q: asyncio.Queue = asyncio.Queue(config.queue_size)
+    entries_q: asyncio.Queue = asyncio.Queue(config.queue_size)
+    pages_q: asyncio.Queue = asyncio.Queue(config.queue_size)
+    found_q: asyncio.Queue = asyncio.Queue(config.queue_size)
+    # Set when a search schedules a page or the search stage ends
+    scheduled = asyncio.Event()
+    searches_done = asyncio.Event()
+
+    async def generate(make: str) -> List[Dict]:
+        print(f"\nProcessing {make}...")
+        queries = await call(search_boats.manufacturer_queries, make)
+        queries = queries[:config.queries_per_manufacturer]
+        stats.queries += len(queries)
+        return [{'make': make, 'query': query} for query in queries]
+
+    async def search(item: Dict) -> List[Any]:
+        results = await call(search_boats.run_search, item['make'], item['query'])
+        stats.searches += 1
+        for result in results[:config.results_per_query]:
+            added = await call(search_boats.schedule_page, frontier, item['make'], result, item['query'])
+            if added:
+                scheduled.set()
+            else:
+                stats.duplicate_urls += 1
+        return []
+
+    async def search_stage():
+        await _run_stage("search", queries_q, sink, search, config.search_workers, 0, stats)
+        searches_done.set()
+        scheduled.set()
+
+    async def feed():
+        # Hands frontier pages to the fetch workers in priority order until searching is over
+        while True:
+            scheduled.clear()
+            searching = not searches_done.is_set()
+            entry = await call(frontier.pop)
+            if entry is not None:
+                await entries_q.put(entry)
+            elif searching:
+                await scheduled.wait()
+            else:
+                break
+        for _ in range(config.fetch_workers):
+            await entries_q.put(_DONE)
+
+    async def fetch(entry: FrontierEntry) -> List["search_boats.CrawlPage"]:
+        logger.info(f"   Fetching: {entry.title[:50]}...")
+        content = await call(search_boats.fetch_webpage, entry.url)
+        fetched = bool(content)
+        if fetched:
+            stats.pages_fetched += 1
+            await call(frontier.mark_fetched, entry.url)
+        else:
+            stats.pages_failed += 1
+            await call(frontier.mark_failed, entry.url, "no content")
+            # Fallback to title/description if fetch fails
+            content = f"Title: {entry.title}\nDescription: {entry.description}"
+        return [search_boats.CrawlPage(entry.url, content, entry.make, entry.title, fetched, entry.query)]
+
+    async def extract(page: "search_boats.CrawlPage") -> List[Dict]:
+        boats_found = await call(search_boats.extract_page_boats, page.content, page.make, page.title,
+                                 page.url)
+        stats.extractions += 1
+        boats_found = boats_found or []
+        stats.boats_found += len(boats_found)
+        return [{'page': page, 'boats': boats_found}]
+
+    async def persist(item: Dict) -> List[Any]:
+        # One transaction per page
+        page = item['page']
+        new = updated = 0
+        if item['boats']:
+            new, updated = await call(search_boats.persist_boats, item['boats'], page.url)
+            stats.new_boats += new
+            stats.updated_boats += updated
+        await call(search_boats.finish_page, page, item['boats'], new, updated)
+        return []
+
+    for make in manufacturers:
+        makes_q.put_nowait(make)
+    for _ in range(config.query_workers):
+        makes_q.put_nowait(_DONE)
+
+    sink: asyncio.Queue = asyncio.Queue()
+    try:
+        await asyncio.gather(
+            _run_stage("query", makes_q, queries_q, generate,
+                       config.query_workers, config.search_workers, stats),
+            search_stage(),
+            feed(),
+            _run_stage("fetch", entries_q, pages_q, fetch,
+                       config.fetch_workers, config.extract_workers, stats),
+            _run_stage("extract", pages_q, found_q, extract,
+                       config.extract_workers, 1, stats),
+            _run_stage("persist", found_q, sink, persist, 1, 0, stats),
+        )
+    finally:
+        executor.shutdown(wait=True)
+
+    return stats
+
+
+def run_pipeline(manufacturers: List[str], config: PipelineConfig = None,
+                 frontier: CrawlFrontier = None) -> PipelineStats:
+    """
+    Crawls the given manufacturers with the concurrent pipeline.
+    Blocks until every stage has drained and returns the run statistics.
+    """
+    config = config or PipelineConfig()
+    logger.info(f"⚡ Pipeline: {config.search_workers} search / {config.fetch_workers} fetch / "
+                f"{config.extract_workers} extract workers")
+    return asyncio.run(run_pipeline_async(manufacturers, config, frontier))
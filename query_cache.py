@@ -0,0 +1,182 @@
+"""
+Cache of generated search queries, with per-query yield statistics.
+
+generate_search_queries() asks Claude for new queries for every
+manufacturer on every run, one serial round trip each, before the first
+search goes out. QueryCache stores the queries per manufacturer in SQLite
+(query_cache.db next to boats.db) together with the prompt version and
+model that produced them, and serves them until the TTL expires.
+
+Each query also records how many times it was searched and how many new
+boats its pages produced, so ranked() puts the most productive queries
+first. In lazy mode queries are kept regardless of age and new ones are
+generated only once every cached query has been tried since it was last
+generated and its latest run found no new boats.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "query_cache.db"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+
+def default_cache_path(db_file: str) -> str:
+    """Returns the query cache path that sits next to the given boats database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), CACHE_FILENAME)
+
+
+class QueryCache:
+    """
+    SQLite store of search queries per manufacturer and their yield.
+    Safe to share between threads; each call takes the connection lock.
+    """
+
+    def __init__(self, db_path: str, prompt_version: int, model: str,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, lazy: bool = False):
+        self.db_path = db_path
+        self.prompt_version = prompt_version
+        self.model = model
+        self.ttl_seconds = ttl_seconds
+        self.lazy = lazy
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_queries (
+                make TEXT NOT NULL,
+                query TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                generated_at REAL NOT NULL,
+                runs INTEGER NOT NULL DEFAULT 0,
+                new_boats INTEGER NOT NULL DEFAULT 0,
+                updated_boats INTEGER NOT NULL DEFAULT 0,
+                last_new_boats INTEGER NOT NULL DEFAULT 0,
+                last_run_at REAL,
+                PRIMARY KEY (make, query)
+            )
+        ''')
+        self._conn.commit()
+
+    def needs_generation(self, make: str) -> bool:
+        """
+        True if make has no usable cached queries.
+        Normally that means none from the current prompt version and model within the TTL;
+        in lazy mode, that every cached query has run since put() and its latest run found no new boats.
+        """
+        with self._lock:
+            if self.lazy:
+                row = self._conn.execute('''
+                    SELECT COUNT(*), SUM(last_run_at IS NULL OR last_new_boats > 0) FROM search_queries WHERE make = ?
+                ''', (make,)).fetchone()
+                usable = row[0] > 0 and (row[1] or 0) > 0
+            else:
+                row = self._conn.execute('''
+                    SELECT COUNT(*) FROM search_queries
+                    WHERE make = ? AND prompt_version = ? AND model = ? AND generated_at >= ?
+                ''', (make, self.prompt_version, self.model, time.time() - self.ttl_seconds)).fetchone()
+                usable = row[0] > 0
+        if usable:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return not usable
+
+    def has_queries(self, make: str) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM search_queries WHERE make = ? LIMIT 1',
+                                      (make,)).fetchone() is not None
+
+    def put(self, make: str, queries: List[str]):
+        """
+        Replaces make's queries with a newly generated list.
+        Yield statistics are kept for queries that appear again, but they count as untried
+        until searched again, so regenerating exhausted queries in lazy mode retries them
+        once instead of leaving every query exhausted.
+        """
+        now = time.time()
+        with self._lock:
+            placeholders = ','.join('?' * len(queries))
+            self._conn.execute(f'DELETE FROM search_queries WHERE make = ? AND query NOT IN ({placeholders})',
+                               [make, *queries])
+            for position, query in enumerate(queries):
+                self._conn.execute('''
+                    INSERT INTO search_queries (make, query, position, prompt_version, model, generated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(make, query) DO UPDATE SET
+                        position = excluded.position,
+                        prompt_version = excluded.prompt_version,
+                        model = excluded.model,
+                        generated_at = excluded.generated_at,
+                        last_run_at = NULL
+                ''', (make, query, position, self.prompt_version, self.model, now))
+            self._conn.commit()
+
+    def ranked(self, make: str) -> List[str]:
+        """
+        make's queries, most productive first: queries whose latest run found new boats
+        (by average new boats per run), then queries not tried since they were generated,
+        in generated order, then queries that have stopped yielding.
+        """
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT query FROM search_queries WHERE make = ?
+                ORDER BY
+                    CASE WHEN last_new_boats > 0 THEN 0 WHEN last_run_at IS NULL THEN 1 ELSE 2 END,
+                    CAST(new_boats AS REAL) / MAX(runs, 1) DESC,
+                    position
+            ''', (make,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record_search(self, make: str, query: str):
+        """Counts a run of the query; its latest-run yield starts again from zero."""
+        with self._lock:
+            self._conn.execute('''
+                UPDATE search_queries SET runs = runs + 1, last_new_boats = 0, last_run_at = ?
+                WHERE make = ? AND query = ?
+            ''', (time.time(), make, query))
+            self._conn.commit()
+
+    def record_yield(self, make: str, query: str, new_boats: int, updated_boats: int = 0):
+        """Adds boats found on one of the query's pages to its statistics."""
+        if not (new_boats or updated_boats):
+            return
+        with self._lock:
+            self._conn.execute('''
+                UPDATE search_queries SET
+                    new_boats = new_boats + ?,
+                    last_new_boats = last_new_boats + ?,
+                    updated_boats = updated_boats + ?
+                WHERE make = ? AND query = ?
+            ''', (new_boats, new_boats, updated_boats, make, query))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[QueryCache] = None
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    """Returns the configured query cache, or None if queries are generated on every run."""
+    return _cache
+
+
+def configure_query_cache(cache: Optional[QueryCache]) -> Optional[QueryCache]:
+    """Sets (or with None, disables) the query cache used by manufacturer_queries()."""
+    global _cache
+    if _cache is not None and _cache is not cache:
+        _cache.close()
+    _cache = cache
+    return _cache
@@ -0,0 +1,207 @@
+"""
+Token-bucket rate limiting for external services and crawled hosts.
+
+The crawl used to sleep one second after every query: too slow when the
+APIs have headroom, and no protection at all for back-to-back fetches from
+one host or for Anthropic's per-minute limits. A RateLimiter keeps one
+TokenBucket per service ("brave", "anthropic_requests", "anthropic_tokens")
+and one per target host, created on first use. Callers block in acquire()
+only as long as the bucket requires, so the crawl runs at the highest rate
+each limit allows.
+
+Buckets adapt to the server: a 429 halves the bucket's rate and pauses it
+for the Retry-After interval (or one refill period without the header);
+each later success restores a tenth of the configured rate until it is back
+to normal.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Service bucket names
+BRAVE = "brave"
+ANTHROPIC_REQUESTS = "anthropic_requests"
+ANTHROPIC_TOKENS = "anthropic_tokens"
+
+# A throttled bucket never drops below this fraction of its configured rate
+MIN_RATE_FRACTION = 0.05
+# Fraction of the configured rate restored by each success after a 429
+RECOVERY_FRACTION = 0.1
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(when - (time.time() if now is None else now), 0.0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity`.
+    acquire() reserves tokens immediately and sleeps off any deficit, so concurrent
+    callers are spaced out instead of all waking at once.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.waited = 0.0
+        self.throttled = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self, tokens: float, now: float) -> float:
+        deficit = tokens - self._tokens
+        delay = deficit / self.rate if deficit > 0 else 0.0
+        return max(delay, self._paused_until - now)
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds an acquire(tokens) call would block right now."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return self._delay(tokens, now)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Takes tokens from the bucket, sleeping until they are available. Returns the time waited."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            delay = self._delay(tokens, now)
+            self._tokens -= tokens
+            self.waited += delay
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Backs off after a 429: halves the rate and pauses for retry_after seconds."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.throttled += 1
+            self.rate = max(self.rate / 2, self.base_rate * MIN_RATE_FRACTION)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, now + pause)
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self):
+        """Recovers part of the configured rate after a throttled period."""
+        if self.rate >= self.base_rate:
+            return
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_FRACTION)
+
+
+@dataclass
+class RateLimitConfig:
+    """Configured rates for each external service and for every crawled host."""
+    brave_per_second: float = 1.0
+    anthropic_requests_per_minute: float = 50
+    anthropic_tokens_per_minute: float = 50000
+    host_per_second: float = 1.0
+    host_burst: float = 2
+
+
+class RateLimiter:
+    """Named token buckets for services plus a lazily created bucket per host."""
+
+    def __init__(self, config: Optional[RateLimitConfig] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.config = config or RateLimitConfig()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.buckets: Dict[str, TokenBucket] = {
+            BRAVE: self._bucket(self.config.brave_per_second, 1),
+            ANTHROPIC_REQUESTS: self._bucket(self.config.anthropic_requests_per_minute / 60.0,
+                                             max(self.config.anthropic_requests_per_minute / 60.0, 1)),
+            ANTHROPIC_TOKENS: self._bucket(self.config.anthropic_tokens_per_minute / 60.0,
+                                           self.config.anthropic_tokens_per_minute / 6.0),
+        }
+
+    def _bucket(self, rate: float, capacity: float) -> TokenBucket:
+        return TokenBucket(rate, capacity, clock=self._clock, sleep=self._sleep)
+
+    def bucket(self, name: str) -> TokenBucket:
+        """Returns the named service bucket, or the bucket for host `name`."""
+        with self._lock:
+            if name not in self.buckets:
+                self.buckets[name] = self._bucket(self.config.host_per_second, self.config.host_burst)
+            return self.buckets[name]
+
+    def acquire(self, name: str, tokens: float = 1) -> float:
+        """Blocks until `tokens` are available in the named bucket. Returns the time waited."""
+        return self.bucket(name).acquire(tokens)
+
+    def record_response(self, name: str, status_code: int, retry_after: Optional[str] = None):
+        """Feeds a response status (and its Retry-After header) back into the bucket."""
+        bucket = self.bucket(name)
+        if status_code == 429:
+            seconds = parse_retry_after(retry_after)
+            logger.warning(f"⏳ Rate limited by {name}, backing off"
+                           + (f" {seconds:.1f}s" if seconds is not None else ""))
+            bucket.on_throttled(seconds)
+        elif status_code < 400:
+            bucket.on_success()
+
+    def wait_times(self) -> Dict[str, float]:
+        """Current wait for one token in each bucket, in seconds."""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {name: bucket.wait_time() for name, bucket in buckets.items()}
+
+    def total_waited(self) -> Dict[str, float]:
+        """Seconds spent blocked on each bucket so far, for buckets that ever blocked."""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {name: bucket.waited for name, bucket in buckets.items() if bucket.waited > 0}
+
+
+def host_key(url: str) -> str:
+    """Bucket name for the host a URL points at."""
+    return (urlsplit(url).hostname or '').lower()
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Returns the configured rate limiter, or None if requests are not throttled."""
+    return _limiter
+
+
+def configure_rate_limiter(limiter: Optional[RateLimiter]) -> Optional[RateLimiter]:
+    """Sets (or with None, removes) the rate limiter used by HTTP requests and Claude calls."""
+    global _limiter
+    _limiter = limiter
+    return _limiter
@@ -0,0 +1,177 @@
+"""
+Run journal for resumable crawls.
+
+A full crawl generates queries for every manufacturer, runs every search and
+then fetches and extracts every page. If the process dies halfway, all of
+that used to be repeated. RunJournal records each unit of work in SQLite as
+it completes:
+
+    queries  one row per manufacturer, with the generated queries
+    search   one row per (manufacturer, query), with the search results
+    page     one row per URL, done once its boats are persisted
+
+A run started with resume=True continues the most recent unfinished run:
+completed rows are reused instead of calling Claude or Brave again, and only
+failed or pending pages are fetched. Persisting a page and journaling it are
+separate commits, so a crash between the two re-processes that one page;
+upserts are idempotent, so the result is the same.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = "run_journal.db"
+
+# Stages
+STAGE_QUERIES = 'queries'
+STAGE_SEARCH = 'search'
+STAGE_PAGE = 'page'
+
+# Statuses
+STATUS_PENDING = 'pending'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def default_journal_path(db_file: str) -> str:
+    """Returns the journal path that sits next to the given boats database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), JOURNAL_FILENAME)
+
+
+def search_key(make: str, query: str) -> str:
+    """Journal key of one search."""
+    return f"{make}\x00{query}"
+
+
+@dataclass
+class JournalEntry:
+    """The recorded status of one unit of work and its saved output."""
+    status: str
+    payload: Any
+
+
+class RunJournal:
+    """
+    SQLite record of crawl runs and the status of each stage item.
+    Safe to share between threads; each call takes the connection lock.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.run_id: Optional[str] = None
+        self.resumed = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS journal (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                item_key TEXT NOT NULL,
+                make TEXT,
+                query TEXT,
+                url TEXT,
+                status TEXT NOT NULL,
+                payload_json TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, stage, item_key)
+            )
+        ''')
+        self._conn.commit()
+
+    def start_run(self, resume: bool = False) -> str:
+        """
+        Starts a new run, or with resume=True continues the latest unfinished one.
+        Returns the run id.
+        """
+        with self._lock:
+            row = None
+            if resume:
+                row = self._conn.execute('''
+                    SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1
+                ''').fetchone()
+            if row:
+                self.run_id, self.resumed = row[0], True
+            else:
+                if resume:
+                    logger.info("↻ No unfinished run to resume, starting a new one")
+                self.run_id, self.resumed = f"{time.time():.6f}", False
+                self._conn.execute('INSERT INTO runs (run_id, started_at) VALUES (?, ?)', (self.run_id, time.time()))
+                self._conn.commit()
+        return self.run_id
+
+    def get(self, stage: str, key: str) -> Optional[JournalEntry]:
+        """Returns the recorded entry for a stage item in the current run, or None."""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT status, payload_json FROM journal WHERE run_id = ? AND stage = ? AND item_key = ?
+            ''', (self.run_id, stage, key)).fetchone()
+        if row is None:
+            return None
+        return JournalEntry(row[0], json.loads(row[1]) if row[1] is not None else None)
+
+    def is_done(self, stage: str, key: str) -> bool:
+        entry = self.get(stage, key)
+        return entry is not None and entry.status == STATUS_DONE
+
+    def record(self, stage: str, key: str, status: str, payload: Any = None, make: Optional[str] = None,
+               query: Optional[str] = None, url: Optional[str] = None, error: Optional[str] = None):
+        """Records (or updates) the status and output of a stage item in the current run."""
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO journal
+                    (run_id, stage, item_key, make, query, url, status, payload_json, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self.run_id, stage, key, make, query, url, status,
+                  json.dumps(payload) if payload is not None else None, error, time.time()))
+            self._conn.commit()
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of items per (stage, status) in the current run."""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT stage, status, COUNT(*) FROM journal WHERE run_id = ? GROUP BY stage, status
+            ''', (self.run_id,)).fetchall()
+        return {(stage, status): count for stage, status, count in rows}
+
+    def finish_run(self):
+        """Marks the current run complete, so --resume will not pick it up again."""
+        with self._lock:
+            self._conn.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?', (time.time(), self.run_id))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_journal: Optional[RunJournal] = None
+
+
+def get_run_journal() -> Optional[RunJournal]:
+    """Returns the configured run journal, or None if runs are not journaled."""
+    return _journal
+
+
+def configure_run_journal(journal: Optional[RunJournal]) -> Optional[RunJournal]:
+    """Sets (or with None, removes) the journal used by the crawl modes."""
+    global _journal
+    if _journal is not None and _journal is not journal:
+        _journal.close()
+    _journal = journal
+    return _journal
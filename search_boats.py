@@ -1,71 +1,680 @@
+import argparse
+import cProfile
+import csv
+import hashlib
 import os
-import time
 import json
-import requests
 import sqlite3
 import logging
-import re
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
-from dotenv import load_dotenv
-import anthropic
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING, List, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+from crawl_frontier import (CrawlFrontier, FrontierEntry, canonicalize_url, configure_frontier,
+                            default_frontier_path, get_frontier, new_run_frontier, url_priority)
+from dedupe_index import DuplicateIndex, models_match, normalize_model_name, sql_lower, substrings, trigrams
+from extraction_cache import ExtractionCache, configure_extraction_cache, default_cache_path, get_extraction_cache
+from html_text import StreamResult, TextBlock, html_to_blocks, html_to_text, stream_text
+from llm_usage import (PURPOSE_EXTRACT, PURPOSE_QUERIES, BudgetExceededError, UsageTracker, configure_usage_tracker,
+                       get_usage_tracker)
+from metrics import configure_metrics, get_metrics
+from page_cache import DEFAULT_CACHE_DIR, CachedPage, PageCache, configure_page_cache, get_page_cache
+from parse_pool import ParsePool, configure_parse_pool, get_parse_pool, parse_spec_selection, parse_text
+from query_cache import (QueryCache, configure_query_cache, default_cache_path as default_query_cache_path,
+                         get_query_cache)
+from rate_limit import (ANTHROPIC_REQUESTS, ANTHROPIC_TOKENS, BRAVE, RateLimitConfig, RateLimiter,
+                        configure_rate_limiter, get_rate_limiter)
+from run_journal import (STAGE_PAGE, STAGE_QUERIES, STAGE_SEARCH, STATUS_DONE, STATUS_FAILED, RunJournal,
+                         configure_run_journal, default_journal_path, get_run_journal, search_key)
+from spec_rules import extract_specs_fast
+from spec_sections import CHARS_PER_TOKEN, SpecSelection, select_spec_blocks
+
+if TYPE_CHECKING:
+    import requests
+
+# anthropic, requests (through http_client) and dotenv are imported on first use, so
+# importing this module for filter_boats, the repository or the local query commands
+# stays fast and never loads the network libraries.
 
 # Database configuration
 DB_FILE = "boats.db"
 
-# Load environment variables
-load_dotenv()
+LOG_FILE = "powerboat_search.log"
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('powerboat_search.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Configuration
+# Configuration (load_environment() adds values from .env)
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
 
-# Initialize Claude Client
-try:
-    if ANTHROPIC_API_KEY:
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        logger.info("✓ Claude AI client initialized successfully")
-    else:
-        client = None
-        logger.warning("⚠ ANTHROPIC_API_KEY not found. Specs extraction will be disabled.")
-        logger.warning("  Get your API key at: https://console.anthropic.com/")
-except Exception as e:
-    client = None
-    logger.error(f"✗ Error initializing Claude client: {e}")
+# Claude client, created by get_client() on first use; tests and tools may assign it directly
+_UNINITIALIZED = object()
+client = _UNINITIALIZED
+_client_lock = threading.Lock()
+
+def configure_logging():
+    """Logs INFO and above to the console and LOG_FILE (called by the crawl entry point)."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE),
+            logging.StreamHandler()
+        ]
+    )
+
+def load_environment():
+    """Loads .env into the environment and fills in API keys that were not already set."""
+    global ANTHROPIC_API_KEY, BRAVE_API_KEY
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    ANTHROPIC_API_KEY = ANTHROPIC_API_KEY or os.getenv("ANTHROPIC_API_KEY")
+    BRAVE_API_KEY = BRAVE_API_KEY or os.getenv("BRAVE_API_KEY")
+
+def get_client():
+    """
+    Returns the Claude client, creating it on first use.
+    None if ANTHROPIC_API_KEY is not set or the client cannot be created.
+    """
+    global client
+    with _client_lock:
+        if client is not _UNINITIALIZED:
+            return client
+        try:
+            if ANTHROPIC_API_KEY:
+                import anthropic
+
+                client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+                logger.info("✓ Claude AI client initialized successfully")
+            else:
+                client = None
+                logger.warning("⚠ ANTHROPIC_API_KEY not found. Specs extraction will be disabled.")
+                logger.warning("  Get your API key at: https://console.anthropic.com/")
+        except Exception as e:
+            client = None
+            logger.error(f"✗ Error initializing Claude client: {e}")
+        return client
+
+# query_boats() bound -> (column, comparison)
+RANGE_BOUNDS = {
+    'min_length': ('length_ft', '>='),
+    'max_length': ('length_ft', '<='),
+    'min_hp': ('max_hp', '>='),
+    'max_hp': ('max_hp', '<='),
+    'min_weight': ('dry_weight_lbs', '>='),
+    'max_weight': ('dry_weight_lbs', '<='),
+    'min_beam': ('beam_inches', '>='),
+    'max_beam': ('beam_inches', '<='),
+}
+
+# Columns llm_usage_summary() can group by
+LLM_USAGE_GROUPS = ('run_id', 'make', 'domain', 'purpose', 'model')
+
+# Largest number of bound parameters used in one IN (...) list
+SQL_IN_CHUNK = 500
+# Margin added to find_duplicate()'s SQL length window; matches are re-checked exactly
+LENGTH_WINDOW_SLACK = 1e-6
+
+# Connection pragmas: WAL lets readers (sqlite3 CLI, exports) run during a crawl and
+# synchronous=NORMAL only fsyncs at checkpoints instead of on every commit
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=5000",
+)
+
+class BoatRepository:
+    """
+    Owns a single long-lived SQLite connection to the boats database.
+    Writes made inside transaction() are committed together; writes outside one
+    commit immediately. The connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, db_file: str = DB_FILE):
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self._depth = 0
+        self.conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        for pragma in DB_PRAGMAS:
+            self.conn.execute(pragma)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups writes into one transaction. Nested calls join the outermost transaction,
+        which commits on exit or rolls back if an exception escapes it.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self.conn.execute('BEGIN')
+            self._depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.conn.execute('ROLLBACK')
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute('COMMIT')
+
+    def init_schema(self):
+        """Creates the boats table if it does not exist."""
+        with self.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS boats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    make TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    length_ft REAL,
+                    max_hp INTEGER,
+                    dry_weight_lbs INTEGER,
+                    beam_inches INTEGER,
+                    source_url TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(make, model)
+                )
+            ''')
+            self._migrate_dedupe_index(conn)
+            self._migrate_source_pages(conn)
+            self._migrate_llm_usage(conn)
+            self._migrate_sheet_sync(conn)
+
+    def _migrate_dedupe_index(self, conn: sqlite3.Connection):
+        """
+        Adds the duplicate-lookup index: normalized make/model columns, a trigram table
+        for model-name containment, and indexes for make, make+length and make+model.
+        """
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(boats)')}
+        for column in ('make_norm', 'model_norm'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE boats ADD COLUMN {column} TEXT')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS boat_trigrams (
+                make_norm TEXT NOT NULL,
+                trigram TEXT NOT NULL,
+                boat_id INTEGER NOT NULL,
+                PRIMARY KEY (make_norm, trigram, boat_id)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boat_trigrams_boat ON boat_trigrams(boat_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_lower_make ON boats(LOWER(make))')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_make_norm_length ON boats(make_norm, length_ft)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_make_norm_model_norm ON boats(make_norm, model_norm)')
+        # Range queries (query_boats): any size window, with or without a make
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_length ON boats(length_ft)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_max_hp ON boats(max_hp)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_make_length ON boats(make COLLATE NOCASE, length_ft)')
+        # Incremental exports (export.py): boats changed since a timestamp
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_updated_at ON boats(updated_at)')
+        # Rows not yet in the dedupe index (older databases, rows written by other tools)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_boats_unindexed ON boats(id) WHERE model_norm IS NULL')
+        self._index_pending(conn)
+
+    def _migrate_source_pages(self, conn: sqlite3.Connection):
+        """
+        Adds the source_pages table used by incremental refreshes: one row per page
+        boats were extracted from, with the hash of the text sent for extraction.
+        Existing databases are seeded from boats.source_url; those rows have no hash yet.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_pages'").fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS source_pages (
+                url TEXT PRIMARY KEY,
+                make TEXT,
+                title TEXT,
+                content_hash TEXT,
+                last_fetched_at TIMESTAMP,
+                last_changed_at TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_source_pages_fetched ON source_pages(last_fetched_at)')
+        if not exists:
+            conn.execute('''
+                INSERT OR IGNORE INTO source_pages (url, make, last_fetched_at)
+                SELECT source_url, MIN(make), MAX(updated_at) FROM boats
+                WHERE source_url IS NOT NULL AND source_url != ''
+                GROUP BY source_url
+            ''')
+
+    def _migrate_llm_usage(self, conn: sqlite3.Connection):
+        """
+        Adds the llm_usage table: one row per Claude call with its tokens and cost,
+        and the number of boats found on the page it was made for.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                purpose TEXT NOT NULL,
+                model TEXT NOT NULL,
+                make TEXT,
+                url TEXT,
+                domain TEXT,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost_usd REAL NOT NULL,
+                boats_found INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_run_url ON llm_usage(run_id, url)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_usage_domain ON llm_usage(domain)')
+
+    def _migrate_sheet_sync(self, conn: sqlite3.Connection):
+        """
+        Adds the Google Sheets sync state (sheets_sync.py): the column layout last written
+        to each sheet, and the row and content hash of every boat on it.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sheet_syncs (
+                sheet_id TEXT PRIMARY KEY,
+                columns TEXT NOT NULL,
+                synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sheet_rows (
+                sheet_id TEXT NOT NULL,
+                boat_id INTEGER NOT NULL,
+                row_number INTEGER NOT NULL,
+                row_hash TEXT NOT NULL,
+                PRIMARY KEY (sheet_id, boat_id)
+            )
+        ''')
+
+    def _index_boat(self, conn: sqlite3.Connection, boat_id: int, make: str, model: str):
+        """Stores the normalized make/model and trigrams used by find_duplicate()."""
+        make_norm = sql_lower(make)
+        model_norm = normalize_model_name(model)
+        conn.execute('UPDATE boats SET make_norm = ?, model_norm = ? WHERE id = ?', (make_norm, model_norm, boat_id))
+        conn.execute('DELETE FROM boat_trigrams WHERE boat_id = ?', (boat_id,))
+        conn.executemany('INSERT OR IGNORE INTO boat_trigrams (make_norm, trigram, boat_id) VALUES (?, ?, ?)',
+                         [(make_norm, gram, boat_id) for gram in trigrams(model_norm)])
+
+    def _index_pending(self, conn: sqlite3.Connection):
+        """Indexes any rows whose normalized columns have not been filled in."""
+        for boat_id, make, model in conn.execute(
+                'SELECT id, make, model FROM boats WHERE model_norm IS NULL').fetchall():
+            self._index_boat(conn, boat_id, make, model)
+
+    def upsert(self, boat_data: Dict) -> bool:
+        """
+        Insert or update a boat in the database.
+        Returns True if inserted (new), False if updated (existing).
+        """
+        make = boat_data.get('make', '')
+        model = boat_data.get('model', '')
+        length_ft = boat_data.get('length_ft')
+        max_hp = boat_data.get('max_hp')
+        dry_weight = boat_data.get('dry_weight_lbs')
+        beam = boat_data.get('beam_inches')
+        source_url = boat_data.get('source_url', '')
+
+        with self.transaction() as conn:
+            # Check if exists
+            existing = conn.execute('SELECT id, model FROM boats WHERE make = ? AND model = ?',
+                                    (make, model)).fetchone()
+
+            if existing:
+                # Update - fill in missing fields, prefer longer model name
+                conn.execute('''
+                    UPDATE boats SET
+                        length_ft = COALESCE(?, length_ft),
+                        max_hp = COALESCE(?, max_hp),
+                        dry_weight_lbs = COALESCE(?, dry_weight_lbs),
+                        beam_inches = COALESCE(?, beam_inches),
+                        source_url = COALESCE(?, source_url),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE make = ? AND model = ?
+                ''', (length_ft, max_hp, dry_weight, beam, source_url, make, model))
+                return False
+
+            # Insert new
+            cursor = conn.execute('''
+                INSERT INTO boats (make, model, length_ft, max_hp, dry_weight_lbs, beam_inches, source_url)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (make, model, length_ft, max_hp, dry_weight, beam, source_url))
+            self._index_boat(conn, cursor.lastrowid, make, model)
+            return True
+
+    def exists(self, make: str, model: str) -> bool:
+        """True if a boat with exactly this make and model is stored."""
+        with self._lock:
+            return self.conn.execute('SELECT 1 FROM boats WHERE make = ? AND model = ?',
+                                     (make, model)).fetchone() is not None
+
+    def upsert_many(self, boats: List[Dict]) -> int:
+        """
+        Bulk insert-or-update with executemany in a single transaction.
+        Existing (make, model) rows get the same COALESCE merge as upsert().
+        Returns the number of newly inserted boats.
+        """
+        rows = [(b.get('make', ''), b.get('model', ''), b.get('length_ft'), b.get('max_hp'),
+                 b.get('dry_weight_lbs'), b.get('beam_inches'), b.get('source_url', ''))
+                for b in boats]
+        with self.transaction() as conn:
+            before = conn.execute('SELECT COUNT(*) FROM boats').fetchone()[0]
+            conn.executemany('''
+                INSERT INTO boats (make, model, length_ft, max_hp, dry_weight_lbs, beam_inches, source_url)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(make, model) DO UPDATE SET
+                    length_ft = COALESCE(excluded.length_ft, length_ft),
+                    max_hp = COALESCE(excluded.max_hp, max_hp),
+                    dry_weight_lbs = COALESCE(excluded.dry_weight_lbs, dry_weight_lbs),
+                    beam_inches = COALESCE(excluded.beam_inches, beam_inches),
+                    source_url = COALESCE(excluded.source_url, source_url),
+                    updated_at = CURRENT_TIMESTAMP
+            ''', rows)
+            self._index_pending(conn)
+            after = conn.execute('SELECT COUNT(*) FROM boats').fetchone()[0]
+        return after - before
+
+    def find_duplicate(self, boat_data: Dict, length_tolerance: float = 0.5) -> Optional[Dict]:
+        """
+        Check if a similar boat exists in the database using fuzzy matching.
+        Returns the existing boat data if found, None otherwise.
+
+        Candidates come from the dedupe index instead of a scan of every boat of the
+        make: names the new name contains are looked up by value, names containing
+        the new name by trigram intersection. Each lookup only takes boats inside the
+        length window (or without a length), so idx_boats_make_norm_length narrows it.
+        Matches are confirmed with the same length and substring tests as before and
+        the lowest id wins, as with a scan.
+        """
+        new_make = boat_data.get('make', '').lower()
+        new_model_norm = normalize_model_name(boat_data.get('model', ''))
+        new_length = float(boat_data.get('length_ft', 0))
+        # Slightly wider than the tolerance so float rounding never drops a match
+        window = (new_length - length_tolerance - LENGTH_WINDOW_SLACK,
+                  new_length + length_tolerance + LENGTH_WINDOW_SLACK)
+        in_window = '(length_ft BETWEEN ? AND ? OR length_ft IS NULL OR length_ft = 0)'
+
+        with self.transaction() as conn:
+            self._index_pending(conn)
+            candidate_ids = set()
+
+            # Existing names that equal or are contained in the new name
+            names = sorted(substrings(new_model_norm))
+            for start in range(0, len(names), SQL_IN_CHUNK):
+                chunk = names[start:start + SQL_IN_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                candidate_ids.update(row[0] for row in conn.execute(
+                    f'SELECT id FROM boats WHERE make_norm = ? AND model_norm IN ({placeholders}) AND {in_window}',
+                    [new_make, *chunk, *window]))
+
+            # Existing names that contain the new name
+            grams = sorted(trigrams(new_model_norm))
+            if grams:
+                placeholders = ','.join('?' * len(grams))
+                candidate_ids.update(row[0] for row in conn.execute(f'''
+                    SELECT t.boat_id FROM boat_trigrams t JOIN boats ON boats.id = t.boat_id
+                    WHERE t.make_norm = ? AND t.trigram IN ({placeholders}) AND {in_window}
+                    GROUP BY t.boat_id HAVING COUNT(*) = ?
+                ''', [new_make, *grams, *window, len(grams)]))
+            else:
+                candidate_ids.update(row[0] for row in conn.execute(
+                    f'SELECT id FROM boats WHERE make_norm = ? AND instr(model_norm, ?) > 0 AND {in_window}',
+                    (new_make, new_model_norm, *window)))
+
+            if not candidate_ids:
+                return None
+            ids = sorted(candidate_ids)
+            rows = []
+            for start in range(0, len(ids), SQL_IN_CHUNK):
+                chunk = ids[start:start + SQL_IN_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows.extend(conn.execute(
+                    f'SELECT id, make, model, length_ft, model_norm FROM boats WHERE id IN ({placeholders})',
+                    chunk).fetchall())
+
+        for row in sorted(rows):
+            existing_id, existing_make, existing_model, existing_length, existing_model_norm = row
+
+            # Check length similarity
+            if existing_length and abs(new_length - existing_length) > length_tolerance:
+                continue
+
+            # Check model name similarity
+            if models_match(new_model_norm, existing_model_norm):
+                return {'id': existing_id, 'make': existing_make, 'model': existing_model, 'length_ft': existing_length}
+
+        return None
+
+    def update_by_id(self, boat_id: int, boat_data: Dict):
+        """Update an existing boat by ID, merging in new data."""
+        with self.transaction() as conn:
+            # Get current data
+            current = conn.execute('SELECT model, dry_weight_lbs, beam_inches FROM boats WHERE id = ?',
+                                   (boat_id,)).fetchone()
+            if not current:
+                return
+
+            current_model, current_weight, current_beam = current
+            new_model = boat_data.get('model', '')
+
+            # Prefer longer/more specific model name
+            final_model = new_model if len(new_model) > len(current_model) else current_model
+
+            conn.execute('''
+                UPDATE boats SET
+                    model = ?,
+                    dry_weight_lbs = COALESCE(?, dry_weight_lbs),
+                    beam_inches = COALESCE(?, beam_inches),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (final_model, boat_data.get('dry_weight_lbs'), boat_data.get('beam_inches'), boat_id))
+            if final_model != current_model:
+                make = conn.execute('SELECT make FROM boats WHERE id = ?', (boat_id,)).fetchone()[0]
+                self._index_boat(conn, boat_id, make, final_model)
+
+    def record_source_page(self, url: str, make: str, title: str, content_hash: str) -> bool:
+        """
+        Records a successful fetch of a source page and the hash of its extraction text.
+        Returns True if the page is new or its content changed since the last fetch.
+        """
+        with self.transaction() as conn:
+            row = conn.execute('SELECT content_hash FROM source_pages WHERE url = ?', (url,)).fetchone()
+            changed = row is None or row[0] != content_hash
+            conn.execute('''
+                INSERT INTO source_pages (url, make, title, content_hash, last_fetched_at, last_changed_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(url) DO UPDATE SET
+                    make = COALESCE(excluded.make, make),
+                    title = COALESCE(NULLIF(excluded.title, ''), title),
+                    content_hash = excluded.content_hash,
+                    last_fetched_at = CURRENT_TIMESTAMP,
+                    last_changed_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE last_changed_at END
+            ''', (url, make, title, content_hash, changed))
+        return changed
+
+    def stale_source_pages(self, max_age_hours: float, limit: Optional[int] = None) -> List[Dict]:
+        """Source pages last fetched more than max_age_hours ago, oldest first."""
+        sql = '''
+            SELECT url, make, title, content_hash, last_fetched_at FROM source_pages
+            WHERE last_fetched_at IS NULL OR last_fetched_at < datetime('now', ?)
+            ORDER BY last_fetched_at
+        '''
+        params = [f'-{max_age_hours * 3600:.0f} seconds']
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{'url': url, 'make': make, 'title': title or '', 'content_hash': content_hash,
+                 'last_fetched_at': fetched} for url, make, title, content_hash, fetched in rows]
+
+    def record_llm_usage(self, run_id: Optional[str], purpose: str, model: str, input_tokens: int,
+                         output_tokens: int, cost_usd: float, make: Optional[str] = None,
+                         url: Optional[str] = None, domain: Optional[str] = None):
+        """Records the tokens and cost of one Claude call."""
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO llm_usage (run_id, purpose, model, make, url, domain, input_tokens, output_tokens, cost_usd)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (run_id, purpose, model, make, url, domain, input_tokens, output_tokens, cost_usd))
+
+    def record_page_yield(self, run_id: Optional[str], url: str, boats_found: int):
+        """Stores how many boats a page yielded on the Claude calls made for it this run."""
+        with self.transaction() as conn:
+            conn.execute('UPDATE llm_usage SET boats_found = ? WHERE run_id IS ? AND url = ?',
+                         (boats_found, run_id, url))
+
+    def llm_usage_summary(self, group_by: str = 'run_id', run_id: Optional[str] = None) -> List[Dict]:
+        """
+        Claude calls, tokens, cost and boats found grouped by 'run_id', 'make', 'domain',
+        'purpose' or 'model', most expensive first; optionally limited to one run.
+        """
+        if group_by not in LLM_USAGE_GROUPS:
+            raise ValueError(f"Cannot group llm_usage by {group_by!r}")
+        sql = f'''
+            SELECT {group_by}, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost_usd), SUM(boats_found)
+            FROM llm_usage
+        '''
+        params = []
+        if run_id is not None:
+            sql += ' WHERE run_id = ?'
+            params.append(run_id)
+        sql += f' GROUP BY {group_by} ORDER BY SUM(cost_usd) DESC, SUM(input_tokens) DESC'
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{group_by: key, 'calls': calls, 'input_tokens': input_tokens, 'output_tokens': output_tokens,
+                 'cost_usd': cost, 'boats_found': boats}
+                for key, calls, input_tokens, output_tokens, cost, boats in rows]
+
+    def domain_yield(self) -> List[Dict]:
+        """Pages sent to Claude, tokens, cost and boats found per domain across all runs."""
+        with self._lock:
+            rows = self.conn.execute('''
+                SELECT domain, COUNT(DISTINCT url), SUM(input_tokens + output_tokens), SUM(cost_usd),
+                       SUM(boats_found)
+                FROM llm_usage WHERE domain IS NOT NULL AND purpose = ?
+                GROUP BY domain
+            ''', (PURPOSE_EXTRACT,)).fetchall()
+        return [{'domain': domain, 'pages': pages, 'tokens': tokens, 'cost_usd': cost, 'boats': boats}
+                for domain, pages, tokens, cost, boats in rows]
+
+    def sheet_state(self, sheet_id: str) -> Tuple[Optional[str], Dict[int, Tuple[int, str]]]:
+        """The column layout last synced to a sheet (None if never) and boat id -> (row, hash)."""
+        with self._lock:
+            row = self.conn.execute('SELECT columns FROM sheet_syncs WHERE sheet_id = ?', (sheet_id,)).fetchone()
+            rows = self.conn.execute('SELECT boat_id, row_number, row_hash FROM sheet_rows WHERE sheet_id = ?',
+                                     (sheet_id,)).fetchall()
+        return (row[0] if row else None), {boat_id: (number, row_hash) for boat_id, number, row_hash in rows}
+
+    def save_sheet_state(self, sheet_id: str, columns: str, written: List[Tuple[int, int, str]],
+                         removed: List[int]):
+        """Records rows written to a sheet as (boat id, row, hash) and forgets removed boats."""
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO sheet_syncs (sheet_id, columns) VALUES (?, ?)
+                ON CONFLICT(sheet_id) DO UPDATE SET columns = excluded.columns, synced_at = CURRENT_TIMESTAMP
+            ''', (sheet_id, columns))
+            conn.executemany('INSERT OR REPLACE INTO sheet_rows (sheet_id, boat_id, row_number, row_hash) '
+                             'VALUES (?, ?, ?, ?)', [(sheet_id, *row) for row in written])
+            conn.executemany('DELETE FROM sheet_rows WHERE sheet_id = ? AND boat_id = ?',
+                             [(sheet_id, boat_id) for boat_id in removed])
+
+    def clear_sheet_state(self, sheet_id: str):
+        """Forgets everything synced to a sheet, so the next sync rewrites it."""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM sheet_rows WHERE sheet_id = ?', (sheet_id,))
+            conn.execute('DELETE FROM sheet_syncs WHERE sheet_id = ?', (sheet_id,))
+
+    def count(self) -> int:
+        """Returns the total number of boats in the database."""
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM boats').fetchone()[0]
+
+    @staticmethod
+    def _range_conditions(make: Optional[str], bounds: Dict[str, Optional[float]]) -> Tuple[str, List]:
+        """WHERE clause and parameters for query_boats()/count_matching()."""
+        conditions, params = [], []
+        if make:
+            # NOCASE matches the idx_boats_make_length collation (ASCII case folding, like LOWER())
+            conditions.append('make = ? COLLATE NOCASE')
+            params.append(make)
+        for name, value in bounds.items():
+            if value is not None:
+                column, operator = RANGE_BOUNDS[name]
+                conditions.append(f'{column} {operator} ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+    def query_boats(self, make: Optional[str] = None, min_length: Optional[float] = None,
+                    max_length: Optional[float] = None, min_hp: Optional[int] = None,
+                    max_hp: Optional[int] = None, min_weight: Optional[int] = None,
+                    max_weight: Optional[int] = None, min_beam: Optional[int] = None,
+                    max_beam: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Boats within the given inclusive bounds (None leaves a bound open; make is
+        case-insensitive), ordered by make and model. Boats missing a bounded value
+        do not match. Length, HP and make+length bounds are answered from indexes.
+        """
+        where, params = self._range_conditions(make, {
+            'min_length': min_length, 'max_length': max_length, 'min_hp': min_hp, 'max_hp': max_hp,
+            'min_weight': min_weight, 'max_weight': max_weight, 'min_beam': min_beam, 'max_beam': max_beam,
+        })
+        sql = f'''
+            SELECT id, make, model, length_ft, max_hp, dry_weight_lbs, beam_inches, source_url, updated_at
+            FROM boats{where}
+            ORDER BY make, model
+        '''
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def count_matching(self, make: Optional[str] = None, min_length: Optional[float] = None,
+                       max_length: Optional[float] = None, min_hp: Optional[int] = None) -> int:
+        """Number of boats query_boats() would return for these bounds."""
+        where, params = self._range_conditions(make, {'min_length': min_length, 'max_length': max_length,
+                                                      'min_hp': min_hp})
+        with self._lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM boats{where}', params).fetchone()[0]
+
+    def make_counts(self) -> List[Tuple[str, int]]:
+        """(make, number of boats) for every make, most boats first."""
+        with self._lock:
+            return self.conn.execute(
+                'SELECT make, COUNT(*) FROM boats GROUP BY make ORDER BY COUNT(*) DESC, make').fetchall()
+
+    def source_page_count(self) -> int:
+        """Number of pages tracked for incremental refreshes."""
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM source_pages').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+_repository: Optional[BoatRepository] = None
+_repository_lock = threading.Lock()
+
+def get_repository() -> BoatRepository:
+    """Returns the shared repository for DB_FILE, reopening it if DB_FILE has changed."""
+    global _repository
+    with _repository_lock:
+        if _repository is None or _repository.db_file != DB_FILE:
+            if _repository is not None:
+                _repository.close()
+            _repository = BoatRepository(DB_FILE)
+        return _repository
 
 def init_database():
     """Initialize SQLite database with boats table."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS boats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            make TEXT NOT NULL,
-            model TEXT NOT NULL,
-            length_ft REAL,
-            max_hp INTEGER,
-            dry_weight_lbs INTEGER,
-            beam_inches INTEGER,
-            source_url TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(make, model)
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    get_repository().init_schema()
     logger.info(f"✓ Database initialized: {DB_FILE}")
 
 def upsert_boat(boat_data: Dict) -> bool:
@@ -73,124 +682,112 @@ def upsert_boat(boat_data: Dict) -> bool:
     Insert or update a boat in the database.
     Returns True if inserted (new), False if updated (existing).
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    make = boat_data.get('make', '')
-    model = boat_data.get('model', '')
-    length_ft = boat_data.get('length_ft')
-    max_hp = boat_data.get('max_hp')
-    dry_weight = boat_data.get('dry_weight_lbs')
-    beam = boat_data.get('beam_inches')
-    source_url = boat_data.get('source_url', '')
-
-    # Check if exists
-    cursor.execute('SELECT id, model FROM boats WHERE make = ? AND model = ?', (make, model))
-    existing = cursor.fetchone()
-
-    if existing:
-        # Update - fill in missing fields, prefer longer model name
-        cursor.execute('''
-            UPDATE boats SET
-                length_ft = COALESCE(?, length_ft),
-                max_hp = COALESCE(?, max_hp),
-                dry_weight_lbs = COALESCE(?, dry_weight_lbs),
-                beam_inches = COALESCE(?, beam_inches),
-                source_url = COALESCE(?, source_url),
-                updated_at = CURRENT_TIMESTAMP
-            WHERE make = ? AND model = ?
-        ''', (length_ft, max_hp, dry_weight, beam, source_url, make, model))
-        conn.commit()
-        conn.close()
-        return False
-    else:
-        # Insert new
-        cursor.execute('''
-            INSERT INTO boats (make, model, length_ft, max_hp, dry_weight_lbs, beam_inches, source_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (make, model, length_ft, max_hp, dry_weight, beam, source_url))
-        conn.commit()
-        conn.close()
-        return True
+    return get_repository().upsert(boat_data)
 
 def find_duplicate_in_db(boat_data: Dict, length_tolerance: float = 0.5) -> Optional[Dict]:
     """
     Check if a similar boat exists in the database using fuzzy matching.
     Returns the existing boat data if found, None otherwise.
     """
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    new_make = boat_data.get('make', '').lower()
-    new_model_norm = normalize_model_name(boat_data.get('model', ''))
-    new_length = float(boat_data.get('length_ft', 0))
-
-    cursor.execute('SELECT id, make, model, length_ft FROM boats WHERE LOWER(make) = ?', (new_make,))
-    rows = cursor.fetchall()
-
-    for row in rows:
-        existing_id, existing_make, existing_model, existing_length = row
-        existing_model_norm = normalize_model_name(existing_model)
-
-        # Check length similarity
-        if existing_length and abs(new_length - existing_length) > length_tolerance:
-            continue
-
-        # Check model name similarity
-        if (new_model_norm == existing_model_norm or
-            new_model_norm in existing_model_norm or
-            existing_model_norm in new_model_norm):
-            conn.close()
-            return {'id': existing_id, 'make': existing_make, 'model': existing_model, 'length_ft': existing_length}
-
-    conn.close()
-    return None
+    return get_repository().find_duplicate(boat_data, length_tolerance)
 
 def update_boat_by_id(boat_id: int, boat_data: Dict):
     """Update an existing boat by ID, merging in new data."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Get current data
-    cursor.execute('SELECT model, dry_weight_lbs, beam_inches FROM boats WHERE id = ?', (boat_id,))
-    current = cursor.fetchone()
+    get_repository().update_by_id(boat_id, boat_data)
 
-    if current:
-        current_model, current_weight, current_beam = current
-        new_model = boat_data.get('model', '')
-
-        # Prefer longer/more specific model name
-        final_model = new_model if len(new_model) > len(current_model) else current_model
-
-        cursor.execute('''
-            UPDATE boats SET
-                model = ?,
-                dry_weight_lbs = COALESCE(?, dry_weight_lbs),
-                beam_inches = COALESCE(?, beam_inches),
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (final_model, boat_data.get('dry_weight_lbs'), boat_data.get('beam_inches'), boat_id))
-        conn.commit()
-
-    conn.close()
-
-def generate_search_queries(manufacturer: str) -> List[str]:
+def create_message(prompt: str, model: str, max_tokens: int = 1024, purpose: str = PURPOSE_EXTRACT,
+                   make: Optional[str] = None, url: Optional[str] = None):
     """
-    Uses Claude to generate targeted search queries for a specific manufacturer.
+    Sends one prompt to Claude.
+    When a rate limiter is configured, waits on the Anthropic request and token buckets first
+    and backs off both on a 429. When a usage tracker is configured, the call's tokens are
+    recorded against purpose, make and url, and a call the budget does not allow raises
+    BudgetExceededError without being sent.
+    """
+    tracker = get_usage_tracker()
+    if tracker:
+        tracker.check(purpose, url)
+    limiter = get_rate_limiter()
+    if limiter:
+        limiter.acquire(ANTHROPIC_REQUESTS)
+        limiter.acquire(ANTHROPIC_TOKENS, len(prompt) // CHARS_PER_TOKEN + max_tokens)
+    metrics = get_metrics()
+    metrics.inc('llm_requests_total', model=model)
+    try:
+        with metrics.timer('llm'):
+            response = get_client().messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+    except Exception as e:
+        # anthropic.RateLimitError, recognized by status so anthropic need not be imported here
+        if getattr(e, 'status_code', None) == 429:
+            metrics.inc('llm_rate_limited_total', model=model)
+            if limiter:
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('retry-after') if response is not None else None
+                limiter.record_response(ANTHROPIC_REQUESTS, 429, retry_after)
+                limiter.record_response(ANTHROPIC_TOKENS, 429, retry_after)
+        raise
+    if limiter:
+        limiter.record_response(ANTHROPIC_REQUESTS, 200)
+        limiter.record_response(ANTHROPIC_TOKENS, 200)
+    record_message_usage(getattr(response, 'usage', None), model, purpose, make=make, url=url)
+    return response
+
+
+def record_message_usage(usage, model: str, purpose: str = PURPOSE_EXTRACT, make: Optional[str] = None,
+                         url: Optional[str] = None, batch: bool = False):
+    """
+    Counts a message's usage (input_tokens/output_tokens) in the token metrics and,
+    when a usage tracker is configured, records it against purpose, make and url.
     """
-    default_queries = [
+    input_tokens, output_tokens = getattr(usage, 'input_tokens', None), getattr(usage, 'output_tokens', None)
+    if not (isinstance(input_tokens, int) and isinstance(output_tokens, int)):
+        return
+    metrics = get_metrics()
+    metrics.inc('llm_input_tokens_total', input_tokens, model=model)
+    metrics.inc('llm_output_tokens_total', output_tokens, model=model)
+    tracker = get_usage_tracker()
+    if tracker:
+        tracker.record_call(purpose, model, input_tokens, output_tokens, make=make, url=url, batch=batch)
+
+
+# Bump QUERY_PROMPT_VERSION whenever the query prompt changes so cached queries are regenerated
+QUERY_MODEL = "claude-3-haiku-20240307"
+QUERY_PROMPT_VERSION = 2
+
+def feet_inches(length_ft: float) -> str:
+    """A length in feet written as feet and inches, e.g. 13.5 -> 13'6"."""
+    feet, inches = divmod(round(length_ft * 12), 12)
+    return f"{feet}'{inches}\"" if inches else f"{feet}'"
+
+def default_search_queries(manufacturer: str) -> List[str]:
+    """Templated search queries used when Claude is unavailable or not needed yet."""
+    return [
         f"{manufacturer} boats 13-14 feet specifications",
         f"{manufacturer} existing 13 foot boat models specs",
         f"{manufacturer} 13'6\" to 13'11\" boat reviews"
     ]
 
-    if not client:
+def generate_search_queries(manufacturer: str, fallback: bool = True) -> Optional[List[str]]:
+    """
+    Uses Claude to generate targeted search queries for a specific manufacturer.
+    When Claude is unavailable, refused by the budget or fails, returns the templated
+    queries, or None with fallback=False (so they are not cached as Claude's).
+    """
+    default_queries = default_search_queries(manufacturer) if fallback else None
+
+    if not get_client():
         return default_queries
     
+    criteria = search_criteria()
+    low, high = criteria.min_length, criteria.max_length
     prompt = f"""
     I am looking for detailed specifications for powerboats made by {manufacturer}.
-    Specifically, I need to find models that are between 13 feet (13')
-    and 14 feet (14') in length.
+    Specifically, I need to find models that are between {low:g} feet ({feet_inches(low)})
+    and {high:g} feet ({feet_inches(high)}) in length, rated for at least {criteria.min_hp} HP.
     
     Please generate 3 specific search queries that would help me find:
     1. Current model specifications
@@ -201,11 +798,8 @@ def generate_search_queries(manufacturer: str) -> List[str]:
     """
     
     try:
-        response = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with get_metrics().timer('queries'):
+            response = create_message(prompt, QUERY_MODEL, purpose=PURPOSE_QUERIES, make=manufacturer)
         content = response.content[0].text
         # Clean up code blocks if present
         if "```" in content:
@@ -215,6 +809,9 @@ def generate_search_queries(manufacturer: str) -> List[str]:
         if isinstance(queries, list) and len(queries) > 0:
             return queries
         return default_queries
+    except BudgetExceededError as e:
+        logger.info(f"   💸 Using default queries for {manufacturer}: {e}")
+        return default_queries
     except Exception as e:
         print(f"Error generating queries for {manufacturer}: {e}")
         return default_queries
@@ -233,67 +830,222 @@ def search_web(query: str) -> List[Dict]:
     url = "https://api.search.brave.com/res/v1/web/search"
     headers = {
         "Accept": "application/json",
-        "Accept-Encoding": "gzip",
         "X-Subscription-Token": BRAVE_API_KEY
     }
     params = {"q": query, "count": 10}
     
+    metrics = get_metrics()
+    from http_client import get_http_client
+
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
+        with metrics.timer('search'):
+            response = get_http_client().get(url, rate_key=BRAVE, headers=headers, params=params)
+            response.raise_for_status()
+            data = response.json()
         
         results = []
         if 'web' in data and 'results' in data['web']:
             results = data['web']['results']
             
+        metrics.inc('searches_total')
+        metrics.inc('search_results_total', len(results))
         return results
     except Exception as e:
+        metrics.inc('search_errors_total')
         print(f"Error searching for '{query}': {e}")
         return []
 
-def fetch_webpage(url: str) -> Optional[str]:
+# Most visible text kept per page, and the most body bytes read to find it
+PAGE_TEXT_LIMIT = 8000
+# Text scanned for spec-dense blocks when SPEC_SELECTION is on
+SPEC_SOURCE_TEXT_LIMIT = 40000
+SPEC_SELECTION = True
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+FETCH_CHUNK_SIZE = 16384
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def _request_page(url: str, max_chars: Optional[int] = None, force_revalidate: bool = False
+                  ) -> Tuple[Optional[CachedPage], Optional['requests.Response']]:
     """
-    Fetches webpage content and extracts text.
+    Returns (cached page, None) when the page cache can answer for url - fresh, or
+    revalidated with a 304 - and otherwise (None, streaming response) for a 2xx reply.
+    A cached prefix too short for a read of max_chars (None: the whole body) is ignored.
+    With force_revalidate a fresh cached page is revalidated instead of trusting the TTL.
+    Raises requests exceptions on network or HTTP errors.
     """
+    headers = dict(FETCH_HEADERS)
+    cache = get_page_cache()
+    cached = cache.get(url) if cache else None
+    if cached and not cached.covers(max_chars):
+        cached = None
+    if cached:
+        if not force_revalidate and cache.is_fresh(cached):
+            cache.hits += 1
+            get_metrics().inc('cache_hits_total', cache='page')
+            return cached, None
+        headers.update(cache.conditional_headers(cached))
+
+    from http_client import get_http_client
+
+    response = get_http_client().get(url, headers=headers, stream=True)
+    if cached and response.status_code == 304:
+        response.close()
+        cache.touch(url)
+        cache.revalidated += 1
+        get_metrics().inc('cache_revalidated_total', cache='page')
+        return cached, None
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return None, response
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-
-        # Get text content
-        text = soup.get_text(separator=' ', strip=True)
+def _store_page(url: str, response: 'requests.Response', body: bytes, partial_chars: Optional[int] = None):
+    """
+    Counts a downloaded body and saves it to the page cache. partial_chars marks a
+    body cut short once that much text was found (see PageCache.put).
+    """
+    get_metrics().inc('page_bytes_total', len(body))
+    cache = get_page_cache()
+    if cache:
+        cache.misses += 1
+        get_metrics().inc('cache_misses_total', cache='page')
+        cache.put(url, body, encoding=response.encoding, etag=response.headers.get('ETag'),
+                  last_modified=response.headers.get('Last-Modified'), partial_chars=partial_chars)
+
+def _stream_page(url: str, response: 'requests.Response', max_chars: int, max_bytes: int) -> StreamResult:
+    """Streams a response through the text extractor and caches the bytes it read."""
+    result = stream_text(response.iter_content(FETCH_CHUNK_SIZE), response.encoding,
+                         max_chars=max_chars, max_bytes=max_bytes)
+    # Stopping at max_bytes reads what any later read would; stopping at max_chars does not
+    partial = not result.complete and len(result.body) < max_bytes
+    _store_page(url, response, result.body, partial_chars=max_chars if partial else None)
+    return result
+
+def fetch_page_text(url: str, max_chars: int = PAGE_TEXT_LIMIT, max_bytes: int = MAX_PAGE_BYTES,
+                    force_revalidate: bool = False) -> str:
+    """
+    Fetches a page and extracts up to max_chars of visible text, using the page cache
+    when one is configured. Network responses are parsed while they stream in and the
+    download stops once enough text is collected or max_bytes have been read.
+    Raises requests exceptions on network or HTTP errors.
+    """
+    cached, response = _request_page(url, max_chars, force_revalidate)
+    if cached:
+        with get_metrics().timer('parse'):
+            return html_to_text(cached.text, max_chars)
+    try:
+        return _stream_page(url, response, max_chars, max_bytes).text
+    finally:
+        response.close()
 
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text)
+def fetch_html(url: str, max_bytes: int = MAX_PAGE_BYTES, force_revalidate: bool = False) -> str:
+    """
+    Fetches the raw HTML for a URL (at most max_bytes), using the page cache when one
+    is configured. Raises requests exceptions on network or HTTP errors.
+    """
+    cached, response = _request_page(url, force_revalidate=force_revalidate)
+    if cached:
+        return cached.text
+    try:
+        body = bytearray()
+        for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) >= max_bytes:
+                break
+        body = bytes(body[:max_bytes])
+        _store_page(url, response, body)
+        return body.decode(response.encoding or 'utf-8', errors='replace')
+    finally:
+        response.close()
+
+def fetch_page_blocks(url: str, max_chars: int = SPEC_SOURCE_TEXT_LIMIT, max_bytes: int = MAX_PAGE_BYTES,
+                      force_revalidate: bool = False) -> List[TextBlock]:
+    """
+    Like fetch_page_text(), but returns the visible text split into block-level
+    elements (tables, lists, paragraphs, headings) for spec-section selection.
+    """
+    cached, response = _request_page(url, max_chars, force_revalidate)
+    if cached:
+        with get_metrics().timer('parse'):
+            return html_to_blocks(cached.text, max_chars)
+    try:
+        return _stream_page(url, response, max_chars, max_bytes).blocks
+    finally:
+        response.close()
 
-        # Limit to first 8000 chars to avoid token limits
-        return text[:8000]
+def fetch_spec_selection(url: str, force_revalidate: bool = False) -> Optional[SpecSelection]:
+    """
+    Fetches a page and selects its most spec-dense blocks within the extraction budget.
+    Returns None if the page cannot be fetched.
+    """
+    token_budget = EXTRACTION_TEXT_LIMIT // CHARS_PER_TOKEN
+    pool = get_parse_pool()
+    try:
+        if pool:
+            # Download in this thread, parse on a worker process
+            html = fetch_html(url, force_revalidate=force_revalidate)
+            with get_metrics().timer('parse'):
+                selection = pool.run(parse_spec_selection, html, SPEC_SOURCE_TEXT_LIMIT, token_budget)
+        else:
+            blocks = fetch_page_blocks(url, force_revalidate=force_revalidate)
+            selection = select_spec_blocks(blocks, token_budget=token_budget)
     except Exception as e:
         logger.warning(f"Failed to fetch {url}: {e}")
         return None
+    if selection.chosen:
+        logger.info(f"   Selected spec blocks {selection.chosen} of {len(selection.scores)} "
+                    f"({len(selection.text)} chars)")
+    return selection
 
-def extract_specs(text_content: str) -> Optional[Dict]:
+def fetch_webpage(url: str, select_specs: Optional[bool] = None, force_revalidate: bool = False) -> Optional[str]:
     """
-    Uses Claude to extract boat specifications from text content.
+    Fetches webpage content and extracts text.
+    With spec selection (the default, see SPEC_SELECTION) only the most spec-dense
+    blocks that fit the extraction budget are returned. When a parse pool is configured
+    the HTML is parsed on a worker process instead of the calling thread.
+    force_revalidate checks a cached page with the server even while it is fresh.
     """
-    if not client:
+    metrics = get_metrics()
+    with metrics.timer('fetch'):
+        content = _fetch_webpage(url, select_specs, force_revalidate)
+    metrics.inc('pages_fetched_total' if content else 'pages_failed_total')
+    return content
+
+def _fetch_webpage(url: str, select_specs: Optional[bool], force_revalidate: bool) -> Optional[str]:
+    if select_specs is None:
+        select_specs = SPEC_SELECTION
+    if select_specs:
+        selection = fetch_spec_selection(url, force_revalidate)
+        return selection.text if selection else None
+    pool = get_parse_pool()
+    try:
+        if pool:
+            html = fetch_html(url, force_revalidate=force_revalidate)
+            with get_metrics().timer('parse'):
+                return pool.run(parse_text, html, PAGE_TEXT_LIMIT)
+        return fetch_page_text(url, force_revalidate=force_revalidate)
+    except Exception as e:
+        logger.warning(f"Failed to fetch {url}: {e}")
         return None
-        
-    prompt = f"""
+
+# Bump EXTRACTION_PROMPT_VERSION whenever the extraction prompt changes so cached results are not reused
+EXTRACTION_MODEL = "claude-3-haiku-20240307"
+EXTRACTION_PROMPT_VERSION = 1
+EXTRACTION_TEXT_LIMIT = 4000
+
+def build_extraction_prompt(text: str) -> str:
+    """Builds the Claude prompt used to extract boat specs from page text."""
+    return f"""
     Analyze the following text and extract specifications for powerboats mentioned.
     Look for boats in the 10-18 foot range.
 
     Text:
-    {text_content[:4000]}
+    {text}
 
     Return a JSON array of boat objects. Each object should have:
     - make (string)
@@ -306,95 +1058,103 @@ def extract_specs(text_content: str) -> Optional[Dict]:
     Return an empty array [] if no boats with specs are found.
     Only include boats where you can determine both length AND max HP from the text.
     """
-    
+
+def parse_extraction_response(content: str) -> List[Dict]:
+    """
+    Parses Claude's extraction reply into a list of boat dicts.
+    Raises json.JSONDecodeError if the reply contains no valid JSON.
+    """
+    # Check for empty/null before parsing
+    if "null" in content.lower() and len(content) < 20:
+        return []
+    if content.strip() == "[]":
+        return []
+
+    # Clean up code blocks
+    if "```json" in content:
+        content = content.split("```json")[-1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+
+    # Find JSON array in response (handle preamble text)
+    if "[" in content:
+        start = content.find("[")
+        end = content.rfind("]") + 1
+        if start != -1 and end > start:
+            content = content[start:end]
+
+    data = json.loads(content)
+    # Ensure we return a list
+    if isinstance(data, dict):
+        data = [data]
+    return data if isinstance(data, list) else []
+
+def extract_specs(text_content: str, make: Optional[str] = None, url: Optional[str] = None) -> Optional[Dict]:
+    """
+    Uses Claude to extract boat specifications from text content.
+    Results are memoized in the extraction cache when one is configured.
+    make and url only tag the call's token usage.
+    """
+    if not get_client():
+        return None
+
+    text = text_content[:EXTRACTION_TEXT_LIMIT]
+    cache = get_extraction_cache()
+    if cache:
+        cached = cache.get(EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL, text)
+        if cached is not None:
+            get_metrics().inc('cache_hits_total', cache='extraction')
+            return cached
+        get_metrics().inc('cache_misses_total', cache='extraction')
+
+    content = ""
     try:
-        response = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        response = create_message(build_extraction_prompt(text), EXTRACTION_MODEL, make=make, url=url)
         content = response.content[0].text
-        
-        # Check for empty/null before parsing
-        if "null" in content.lower() and len(content) < 20:
-            return []
-        if content.strip() == "[]":
-            return []
-
-        # Clean up code blocks
-        if "```json" in content:
-            content = content.split("```json")[-1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        # Find JSON array in response (handle preamble text)
-        if "[" in content:
-            start = content.find("[")
-            end = content.rfind("]") + 1
-            if start != -1 and end > start:
-                content = content[start:end]
-
-        data = json.loads(content)
-        # Ensure we return a list
-        if isinstance(data, dict):
-            data = [data]
-        result = data if isinstance(data, list) else []
+        result = parse_extraction_response(content)
         if result:
             logger.info(f"   Extracted {len(result)} boats from page")
+        if cache:
+            cache.put(EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL, text, result)
         return result
     except json.JSONDecodeError as e:
         logger.warning(f"   JSON parse error: {e} - Content: {content[:100]}")
         return []
+    except BudgetExceededError as e:
+        logger.info(f"   💸 Skipped extraction: {e}")
+        return []
     except Exception as e:
         print(f"Error extracting specs: {e}")
         return []
 
-def normalize_model_name(model: str) -> str:
+def extract_page_boats(text_content: str, make: Optional[str] = None, title: Optional[str] = None,
+                       url: Optional[str] = None) -> Optional[List[Dict]]:
     """
-    Normalizes a model name for duplicate comparison.
-    Removes leading numbers (like '130' in '130 Super Sport') and extra whitespace.
+    Extracts boats from page text, trying the rule-based fast path before Claude.
+    Clean spec sheets (one labelled length and max HP, model named in the title)
+    never reach the API; anything ambiguous falls through to extract_specs().
     """
-    model = model.lower().strip()
-    # Remove leading numbers followed by space (e.g., "130 super sport" -> "super sport")
-    model = re.sub(r'^\d+\s*', '', model)
-    # Remove common suffixes/prefixes that might vary
-    model = re.sub(r'\s+', ' ', model)  # Normalize whitespace
-    return model
-
-def is_duplicate_boat(new_boat: Dict, seen_boats: List[Dict], length_tolerance: float = 0.5) -> bool:
+    metrics = get_metrics()
+    with metrics.timer('extract'):
+        fast = extract_specs_fast(text_content, make=make, title=title)
+        if fast:
+            logger.info(f"   ⚡ Rule-based extraction: {fast[0]['make']} {fast[0]['model']}")
+            metrics.inc('fast_path_extractions_total')
+            return fast
+        return extract_specs(text_content, make=make, url=url)
+
+def is_duplicate_boat(new_boat: Dict, seen_boats: Union[List[Dict], DuplicateIndex],
+                      length_tolerance: float = 0.5) -> bool:
     """
     Checks if a boat is a duplicate of any previously seen boat.
     Uses fuzzy matching on model names and length similarity.
-    """
-    new_make = new_boat.get('make', '').lower()
-    new_model = new_boat.get('model', '')
-    new_model_norm = normalize_model_name(new_model)
-    new_length = float(new_boat.get('length_ft', 0))
-
-    for seen in seen_boats:
-        seen_make = seen.get('make', '').lower()
-        seen_model = seen.get('model', '')
-        seen_model_norm = normalize_model_name(seen_model)
-        seen_length = float(seen.get('length_ft', 0))
-
-        # Must be same manufacturer
-        if new_make != seen_make:
-            continue
-
-        # Check length similarity
-        if abs(new_length - seen_length) > length_tolerance:
-            continue
 
-        # Check model name similarity:
-        # 1. Exact normalized match
-        # 2. One contains the other
-        # 3. One is a substring of the other (after normalization)
-        if (new_model_norm == seen_model_norm or
-            new_model_norm in seen_model_norm or
-            seen_model_norm in new_model_norm):
-            return True
-
-    return False
+    Pass a DuplicateIndex that accepted boats are add()ed to when checking many
+    boats against a growing list; its own length_tolerance is used.
+    """
+    if not isinstance(seen_boats, DuplicateIndex):
+        seen_boats = DuplicateIndex(length_tolerance, seen_boats)
+    return seen_boats.is_duplicate(new_boat)
 
 def merge_boat_data(existing: Dict, new: Dict) -> Dict:
     """
@@ -413,10 +1173,17 @@ def merge_boat_data(existing: Dict, new: Dict) -> Dict:
 
     return merged
 
-def filter_boats(boats: List[Dict]) -> List[Dict]:
+def filter_boats(boats: List[Dict], min_length: Optional[float] = None, max_length: Optional[float] = None,
+                 min_hp: Optional[int] = None) -> List[Dict]:
     """
     Filters a list of boats based on length and HP criteria.
+    Bounds left as None come from search_criteria() (the configured target window).
+    For repeated filtering of a large set, catalog.BoatCatalog does the same vectorized.
     """
+    criteria = search_criteria()
+    min_length = criteria.min_length if min_length is None else min_length
+    max_length = criteria.max_length if max_length is None else max_length
+    min_hp = criteria.min_hp if min_hp is None else min_hp
     filtered = []
     seen = set()
 
@@ -430,8 +1197,7 @@ def filter_boats(boats: List[Dict]) -> List[Dict]:
             # Create a unique key to prevent duplicates
             key = f"{make}-{model}".lower()
 
-            # 13' = 13.0, 14' = 14.0
-            if 13.0 <= length <= 14.0 and hp >= 40:
+            if min_length <= length <= max_length and hp >= min_hp:
                 if key not in seen:
                     filtered.append(boat)
                     seen.add(key)
@@ -443,6 +1209,7 @@ def filter_boats(boats: List[Dict]) -> List[Dict]:
 def save_to_csv(boats: List[Dict], filename: str = "powerboat_results.csv"):
     """
     Save boat results to CSV file.
+    For the whole database, export.export_boats() streams rows from boats.db instead.
     """
     if not boats:
         print(f"No boats to save to {filename}")
@@ -465,13 +1232,757 @@ def save_to_csv(boats: List[Dict], filename: str = "powerboat_results.csv"):
         print(f"Error saving to CSV: {e}")
         return None
 
-def main():
+DEFAULT_MANUFACTURERS = ["Boston Whaler", "Carolina Skiff", "Gheenoe"]
+
+
+class SearchCriteria(NamedTuple):
+    """The target size window: inclusive length bounds in feet and a minimum max-HP rating."""
+    min_length: float
+    max_length: float
+    min_hp: int
+
+
+# Used when config.py/config_template.py do not set MIN_LENGTH, MAX_LENGTH or MIN_HORSEPOWER
+DEFAULT_CRITERIA = SearchCriteria(13.5, 13.92, 40)
+
+
+def search_criteria() -> SearchCriteria:
+    """
+    The target window from MIN_LENGTH, MAX_LENGTH and MIN_HORSEPOWER in config.py
+    (falling back to config_template.py). Crawls store every boat; the window is
+    applied when boats are filtered or queried.
+    """
+    try:
+        import config
+    except ImportError:
+        import config_template as config
+    return SearchCriteria(
+        float(getattr(config, 'MIN_LENGTH', DEFAULT_CRITERIA.min_length)),
+        float(getattr(config, 'MAX_LENGTH', DEFAULT_CRITERIA.max_length)),
+        int(getattr(config, 'MIN_HORSEPOWER', DEFAULT_CRITERIA.min_hp)),
+    )
+
+
+def load_manufacturers(use_all: bool = False) -> List[str]:
+    """
+    Returns the manufacturer list for a run.
+    The short default list keeps test runs cheap; use_all loads the full MANUFACTURERS
+    list from config.py (falling back to config_template.py).
+    """
+    if not use_all:
+        return list(DEFAULT_MANUFACTURERS)
+    try:
+        from config import MANUFACTURERS
+    except ImportError:
+        from config_template import MANUFACTURERS
+    return list(MANUFACTURERS)
+
+
+def process_extracted_boat(boat_data: Dict, url: str, pending: Optional[List[Dict]] = None) -> Optional[str]:
+    """
+    Writes one extracted boat to the database, whatever its size; the target window
+    is applied at query time (query_boats, filter_boats).
+    Returns 'new' if a boat was inserted, 'updated' if an existing boat was updated,
+    or None if its length or HP is missing or invalid.
+    With pending, new boats are queued there for one upsert_many() instead (see persist_boats).
+    """
+    try:
+        length = float(boat_data.get('length_ft') or 0)
+        hp = int(boat_data.get('max_hp') or 0)
+        boat_data['source_url'] = url  # Track source
+
+        # Debug: show what was extracted
+        logger.info(f"   Found: {boat_data.get('make')} {boat_data.get('model')} - {length}' / {hp}HP")
+
+        if length > 0 and hp > 0:
+            boat_data['length_ft'], boat_data['max_hp'] = length, hp
+            # Check for duplicates in database using fuzzy matching
+            with get_metrics().timer('dedupe'):
+                existing = find_duplicate_in_db(boat_data)
+
+            if existing:
+                # Update existing boat with new data
+                update_boat_by_id(existing['id'], boat_data)
+                logger.info(f"   📝 Updated: {existing['model']} with data from {boat_data.get('model')}")
+                return 'updated'
+
+            if pending is not None:
+                return _queue_new_boat(boat_data, pending)
+
+            # Insert new boat - writes to DB immediately
+            if upsert_boat(boat_data):
+                print(f"  ✅ NEW: {boat_data.get('make')} {boat_data.get('model')} ({length}' / {hp}HP)")
+                return 'new'
+            logger.info(f"   📝 Updated existing: {boat_data.get('model')}")
+            return 'updated'
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def _queue_new_boat(boat_data: Dict, pending: List[Dict]) -> str:
+    """
+    Queues a boat with no duplicate in the database for persist_boats()'s upsert_many().
+    A queued boat it duplicates, or one with the same make and model, is merged the way
+    update_by_id() or upsert() would merge the stored row, so the outcome is the same as
+    writing each boat as it comes.
+    """
+    make, model = boat_data.get('make', ''), boat_data.get('model', '')
+    for queued in pending:
+        if is_duplicate_boat(boat_data, [queued]):
+            logger.info(f"   📝 Updated: {queued['model']} with data from {model}")
+            if len(model) > len(queued.get('model', '')):
+                queued['model'] = model
+            for field in ('dry_weight_lbs', 'beam_inches'):
+                if boat_data.get(field) is not None:
+                    queued[field] = boat_data[field]
+            return 'updated'
+    for queued in pending:
+        if queued.get('make') == make and queued.get('model') == model:
+            queued.update({field: value for field, value in boat_data.items() if value is not None})
+            logger.info(f"   📝 Updated existing: {model}")
+            return 'updated'
+
+    if get_repository().exists(make, model):
+        upsert_boat(boat_data)
+        logger.info(f"   📝 Updated existing: {model}")
+        return 'updated'
+    pending.append(dict(boat_data))
+    print(f"  ✅ NEW: {make} {model} ({boat_data['length_ft']}' / {boat_data['max_hp']}HP)")
+    return 'new'
+
+
+def count_boats() -> int:
+    """Returns the total number of boats in the database."""
+    return get_repository().count()
+
+
+def open_local_repository(db_file: str) -> Optional[BoatRepository]:
+    """Opens an existing boats database for the local commands, or returns None if there is none."""
+    if not os.path.exists(db_file):
+        print(f"No database at {db_file}; run a crawl first", file=sys.stderr)
+        return None
+    repository = BoatRepository(db_file)
+    repository.init_schema()
+    return repository
+
+
+def add_range_arguments(parser: argparse.ArgumentParser):
+    """--make, the query_boats() bounds and --target, shared by the query and export commands."""
+    parser.add_argument('--make', help='only this manufacturer (case-insensitive)')
+    parser.add_argument('--min-length', type=float, help='minimum length in feet')
+    parser.add_argument('--max-length', type=float, help='maximum length in feet')
+    parser.add_argument('--min-hp', type=int, help='minimum max-HP rating')
+    parser.add_argument('--max-hp', type=int, help='maximum max-HP rating')
+    parser.add_argument('--min-weight', type=int, help='minimum dry weight in lbs')
+    parser.add_argument('--max-weight', type=int, help='maximum dry weight in lbs')
+    parser.add_argument('--min-beam', type=int, help='minimum beam in inches')
+    parser.add_argument('--max-beam', type=int, help='maximum beam in inches')
+    parser.add_argument('--target', action='store_true',
+                        help='the configured MIN_LENGTH/MAX_LENGTH/MIN_HORSEPOWER window (explicit bounds override it)')
+
+
+def apply_target(args: argparse.Namespace):
+    """With --target, fills the length and HP bounds left unset from search_criteria()."""
+    if args.target:
+        for name, value in search_criteria()._asdict().items():
+            if getattr(args, name) is None:
+                setattr(args, name, value)
+
+
+def range_bounds(args: argparse.Namespace) -> Dict[str, Optional[float]]:
+    """The query_boats() bounds given on the command line."""
+    return {name: getattr(args, name) for name in RANGE_BOUNDS}
+
+
+def query_command(argv: List[str]) -> int:
+    """
+    powerboatlist query: lists boats from the local database, optionally within
+    length, HP, weight and beam bounds. Reads only SQLite; no API keys, network libraries or log file are involved.
+    """
+    parser = argparse.ArgumentParser(prog="powerboatlist query", description="List boats in the local database")
+    parser.add_argument('--db', default=DB_FILE, help='boats database file')
+    add_range_arguments(parser)
+    parser.add_argument('--limit', type=int, help='at most this many boats')
+    parser.add_argument('--format', choices=['table', 'csv', 'json'], default='table')
+    args = parser.parse_args(argv)
+    apply_target(args)
+
+    repository = open_local_repository(args.db)
+    if repository is None:
+        return 1
+    try:
+        boats = repository.query_boats(args.make, limit=args.limit, **range_bounds(args))
+    finally:
+        repository.close()
+
+    if args.format == 'json':
+        print(json.dumps(boats, indent=2))
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=['make', 'model', 'length_ft', 'max_hp', 'dry_weight_lbs',
+                                                        'beam_inches', 'source_url'], extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(boats)
+    else:
+        for boat in boats:
+            print(f"{boat['make']:<24} {boat['model']:<28} {boat['length_ft'] or 0:>6.2f} ft "
+                  f"{boat['max_hp'] or 0:>4} HP")
+        print(f"{len(boats)} boats")
+    return 0
+
+
+def stats_command(argv: List[str]) -> int:
+    """powerboatlist stats: boats per manufacturer, tracked sources and Claude spend per run."""
+    parser = argparse.ArgumentParser(prog="powerboatlist stats", description="Summarize the local database")
+    parser.add_argument('--db', default=DB_FILE, help='boats database file')
+    parser.add_argument('--runs', type=int, default=5, help='show Claude spend for this many runs')
+    args = parser.parse_args(argv)
+
+    repository = open_local_repository(args.db)
+    if repository is None:
+        return 1
+    try:
+        print(f"Boats: {repository.count()}")
+        for make, count in repository.make_counts():
+            print(f"  {make:<30} {count:>5}")
+        print(f"Tracked source pages: {repository.source_page_count()}")
+        runs = repository.llm_usage_summary('run_id')[:args.runs]
+        if runs:
+            print("Claude spend by run:")
+            for row in runs:
+                print(f"  {row['run_id'] or '(no run)'}: {row['calls']} calls, "
+                      f"{row['input_tokens'] + row['output_tokens']:,} tokens, ${row['cost_usd']:.4f}, "
+                      f"{row['boats_found']} boats")
+    finally:
+        repository.close()
+    return 0
+
+
+def export_command(argv: List[str]) -> int:
+    """
+    powerboatlist export: streams boats from the local database to CSV, JSON Lines
+    or Parquet, optionally only selected columns, bounds or recent changes.
+    """
+    from export import COLUMNS, DEFAULT_CHUNK_SIZE, DEFAULT_COMPRESSION, FORMATS, export_boats
+
+    parser = argparse.ArgumentParser(prog="powerboatlist export", description="Export the local database")
+    parser.add_argument('output', help="output file (.csv, .jsonl or .parquet), or - for stdout")
+    parser.add_argument('--db', default=DB_FILE, help='boats database file')
+    parser.add_argument('--format', choices=FORMATS, help='output format (default: from the file extension)')
+    parser.add_argument('--columns', help=f"comma-separated columns (default: {','.join(COLUMNS)})")
+    add_range_arguments(parser)
+    parser.add_argument('--since', help='only boats updated at or after this ISO date/time (UTC if no offset)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='rows read (and Parquet row group size) per chunk')
+    parser.add_argument('--compression', default=DEFAULT_COMPRESSION, help='Parquet compression codec')
+    args = parser.parse_args(argv)
+    apply_target(args)
+    if args.output == '-' and not args.format:
+        parser.error("--format is required when writing to stdout")
+
+    if not os.path.exists(args.db):
+        print(f"No database at {args.db}; run a crawl first", file=sys.stderr)
+        return 1
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    try:
+        result = export_boats(args.db, args.output, args.format, columns, args.make, args.since, args.chunk_size,
+                              args.compression, **range_bounds(args))
+    except (ValueError, ImportError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {result.rows} boats to {result.path} "
+          f"(latest update: {result.watermark or 'none'})", file=sys.stderr)
+    return 0
+
+
+def open_sheet_sync(repository: BoatRepository, sheet: str, worksheet: Optional[str] = None,
+                    credentials_file: Optional[str] = None, make: Optional[str] = None,
+                    bounds: Optional[Dict[str, Optional[float]]] = None):
+    """A SheetSync for a Google Sheet; bounds default to the target window."""
+    from sheets_sync import GspreadBackend, SheetSync
+
+    if bounds is None:
+        bounds = search_criteria()._asdict()
+    return SheetSync(repository, GspreadBackend.open(sheet, worksheet, credentials_file), make, bounds)
+
+
+def sheet_sync_command(argv: List[str]) -> int:
+    """
+    powerboatlist sheet-sync: pushes boats changed since the last sync to a Google Sheet
+    in batched range updates.
+    """
+    from sheets_sync import sheet_url_setting
+
+    parser = argparse.ArgumentParser(prog="powerboatlist sheet-sync", description="Sync boats to a Google Sheet")
+    parser.add_argument('--db', default=DB_FILE, help='boats database file')
+    parser.add_argument('--sheet', help='spreadsheet URL or key (default: GOOGLE_SHEET_URL)')
+    parser.add_argument('--worksheet', help='worksheet title (default: the first one)')
+    parser.add_argument('--credentials', help='service account JSON file (default: application default credentials)')
+    add_range_arguments(parser)
+    parser.add_argument('--all', action='store_true', help='every boat, not just the target window')
+    parser.add_argument('--full', action='store_true', help='clear the sheet and rewrite every row')
+    args = parser.parse_args(argv)
+    load_environment()
+    sheet = args.sheet or sheet_url_setting()
+    if not sheet:
+        print("No sheet given; pass --sheet or set GOOGLE_SHEET_URL", file=sys.stderr)
+        return 1
+    if not args.all:
+        args.target = True
+    apply_target(args)
+
+    repository = open_local_repository(args.db)
+    if repository is None:
+        return 1
+    try:
+        result = open_sheet_sync(repository, sheet, args.worksheet, args.credentials, args.make,
+                                 range_bounds(args)).sync(full=args.full)
+    finally:
+        repository.close()
+    print(f"Sheet synced: {result.written} rows written, {result.removed} removed, {result.unchanged} unchanged "
+          f"({result.api_calls} API calls)")
+    return 0
+
+
+# Subcommands that work on the local database without crawling
+COMMANDS = {
+    'query': query_command,
+    'stats': stats_command,
+    'export': export_command,
+    'sheet-sync': sheet_sync_command,
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses command line arguments for the powerboatlist entry point."""
+    parser = argparse.ArgumentParser(prog="powerboatlist", description="Search for 13'-14' powerboats",
+                                     epilog="Local commands: powerboatlist query|stats|export|sheet-sync --help")
+    parser.add_argument('--all-manufacturers', action='store_true',
+                        help='search the full MANUFACTURERS list from config.py/config_template.py')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='run the concurrent asyncio crawl pipeline instead of the sequential loop')
+    parser.add_argument('--batch', action='store_true',
+                        help='extract all fetched pages with one Message Batches request (cheaper, slower)')
+    parser.add_argument('--batch-poll-seconds', type=float, default=30.0,
+                        help='how often to poll a submitted batch for completion')
+    parser.add_argument('--queue-workers', type=int, default=None, metavar='N',
+                        help='coordinate a work-queue crawl: seed the searches and run N local worker processes '
+                             '(0: wait for workers started elsewhere with --worker)')
+    parser.add_argument('--worker', action='store_true',
+                        help='claim and run tasks from the work queue until its crawl is finished')
+    parser.add_argument('--queue-db', default=None, help='work queue database (default: work_queue.db next to boats.db)')
+    parser.add_argument('--crawl-id', default=None, help='work-queue crawl to join (default: the latest unfinished one)')
+    parser.add_argument('--lease-seconds', type=float, default=120.0,
+                        help='how long a worker holds a task without a heartbeat before it is reclaimed')
+    parser.add_argument('--search-workers', type=int, default=4, help='concurrent searches (pipeline mode)')
+    parser.add_argument('--fetch-workers', type=int, default=8, help='concurrent page fetches (pipeline mode)')
+    parser.add_argument('--extract-workers', type=int, default=4, help='concurrent Claude extractions (pipeline mode)')
+    parser.add_argument('--connect-timeout', type=float, default=5.0, help='HTTP connect timeout in seconds')
+    parser.add_argument('--read-timeout', type=float, default=15.0, help='HTTP read timeout in seconds')
+    parser.add_argument('--max-retries', type=int, default=3, help='HTTP retries on 429/5xx responses')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='directory for the fetched page cache')
+    parser.add_argument('--cache-ttl-hours', type=float, default=7 * 24,
+                        help='serve cached pages without revalidation for this long')
+    parser.add_argument('--cache-max-mb', type=int, default=500, help='page cache size limit (LRU eviction)')
+    parser.add_argument('--no-page-cache', action='store_true', help='always fetch pages from the network')
+    parser.add_argument('--no-spec-selection', action='store_true',
+                        help='send the start of each page to Claude instead of its most spec-dense sections')
+    parser.add_argument('--no-extraction-cache', action='store_true',
+                        help='always send page text to Claude, ignoring cached extractions')
+    parser.add_argument('--clear-extraction-cache', action='store_true',
+                        help='drop all cached extractions before the run')
+    parser.add_argument('--incremental', action='store_true',
+                        help='re-check known source pages instead of searching, re-extracting only changed ones')
+    parser.add_argument('--max-age-hours', type=float, default=7 * 24,
+                        help='incremental mode: re-check sources last fetched longer ago than this')
+    parser.add_argument('--incremental-limit', type=int, default=None,
+                        help='incremental mode: re-check at most this many sources, oldest first')
+    parser.add_argument('--query-ttl-days', type=float, default=30,
+                        help='regenerate cached search queries older than this')
+    parser.add_argument('--lazy-queries', action='store_true',
+                        help='keep cached queries until they stop finding new boats (starts from templated queries)')
+    parser.add_argument('--no-query-cache', action='store_true', help='generate search queries with Claude every run')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue the last interrupted run, skipping queries, searches and pages it finished')
+    parser.add_argument('--revisit-hours', type=float, default=7 * 24,
+                        help='skip pages fetched by an earlier run within this many hours')
+    parser.add_argument('--no-frontier-history', action='store_true',
+                        help='only dedupe URLs within this run, ignoring pages fetched by earlier runs')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='parse HTML on this many worker processes (0: parse in the fetching thread)')
+    parser.add_argument('--parse-queue', type=int, default=None,
+                        help='most pages waiting for a parse worker (default: twice --parse-workers)')
+    parser.add_argument('--brave-rps', type=float, default=1.0, help='Brave Search requests per second')
+    parser.add_argument('--anthropic-rpm', type=float, default=50, help='Claude requests per minute')
+    parser.add_argument('--anthropic-tpm', type=float, default=50000, help='Claude tokens per minute')
+    parser.add_argument('--host-rps', type=float, default=1.0, help='page fetches per second to any one host')
+    parser.add_argument('--budget-usd', type=float, default=None,
+                        help='Claude spend ceiling for the run; no more Claude calls once it is reached')
+    parser.add_argument('--budget-soft-fraction', type=float, default=0.8,
+                        help='past this fraction of --budget-usd, skip Claude extraction for low-yield domains')
+    parser.add_argument('--low-yield-pages', type=int, default=3,
+                        help='a domain is low-yield after this many Claude-extracted pages without a boat')
+    parser.add_argument('--metrics-jsonl', default=None,
+                        help='append per-stage timings and counters for the run to this JSON-lines file')
+    parser.add_argument('--metrics-prom', default=None,
+                        help='write the run metrics in Prometheus text format to this file (textfile collector)')
+    parser.add_argument('--export', default=None, metavar='PATH',
+                        help='after the run, export boats.db to this .csv, .jsonl or .parquet file')
+    parser.add_argument('--sync-sheet', action='store_true',
+                        help='after the run, push changed target-window boats to GOOGLE_SHEET_URL')
+    parser.add_argument('--profile', default=None,
+                        help='write a cProfile dump of the run to this file (main thread only)')
+    return parser.parse_args(argv)
+
+
+# Limit to 1 query per manufacturer to save API credits during initial test
+QUERIES_PER_MANUFACTURER = 1
+# Only the top results of each search are fetched
+RESULTS_PER_QUERY = 3
+
+
+class CrawlPage(NamedTuple):
+    """A fetched page (or its search snippet) ready for extraction."""
+    url: str
+    content: str
+    make: str
+    title: str
+    fetched: bool = True  # False if content is the search snippet fallback
+    query: str = ''  # the search that found the page
+
+
+def manufacturer_queries(make: str) -> List[str]:
+    """
+    Search queries for a manufacturer, most productive first.
+    Reused from the run journal when resuming, and from the query cache while fresh;
+    otherwise generated with Claude (in lazy mode, the templated defaults come first).
+    """
+    journal = get_run_journal()
+    entry = journal.get(STAGE_QUERIES, make) if journal else None
+    if entry and entry.status == STATUS_DONE:
+        return entry.payload
+    cache = get_query_cache()
+    if cache is None:
+        queries = generate_search_queries(make)
+    else:
+        queries = None
+        if cache.needs_generation(make):
+            get_metrics().inc('cache_misses_total', cache='query')
+            if cache.lazy and not cache.has_queries(make):
+                cache.put(make, default_search_queries(make))
+            else:
+                generated = generate_search_queries(make, fallback=False)
+                if generated:
+                    cache.put(make, generated)
+                else:
+                    # Only Claude's queries are cached; reuse older ones or the templates this time
+                    queries = cache.ranked(make) or default_search_queries(make)
+        else:
+            get_metrics().inc('cache_hits_total', cache='query')
+        queries = queries or cache.ranked(make)
+    if journal:
+        journal.record(STAGE_QUERIES, make, STATUS_DONE, queries, make=make)
+    return queries
+
+
+def run_search(make: str, query: str) -> List[Dict]:
+    """Search results for one query, reused from the run journal when resuming."""
+    journal = get_run_journal()
+    key = search_key(make, query)
+    entry = journal.get(STAGE_SEARCH, key) if journal else None
+    if entry and entry.status == STATUS_DONE:
+        return entry.payload
+    results = search_web(query)
+    cache = get_query_cache()
+    if cache:
+        cache.record_search(make, query)
+    if journal:
+        # search_web() returns [] on errors, so an empty result is retried on resume
+        journal.record(STAGE_SEARCH, key, STATUS_DONE if results else STATUS_FAILED, results,
+                       make=make, query=query)
+    return results
+
+
+def schedule_page(frontier: CrawlFrontier, make: str, result: Dict, query: str = '') -> bool:
+    """
+    Adds a search result to the frontier. When resuming, pages the journal records as
+    done are skipped and failed or unfinished ones are scheduled again.
+    """
+    url = result.get('url', '')
+    journal = get_run_journal()
+    resuming = bool(journal and journal.resumed)
+    if resuming and url and journal.is_done(STAGE_PAGE, canonicalize_url(url)):
+        return False
+    return frontier.add(url, make, result.get('title', ''), result.get('description', ''), retry=resuming,
+                        query=query)
+
+
+def page_content_hash(text: str) -> str:
+    """Hash of the whitespace-normalized text a page gives for extraction."""
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+def finish_page(page: CrawlPage, boats_found: Optional[List[Dict]] = None, new_boats: int = 0,
+                updated_boats: int = 0):
+    """
+    Records that a page's boats have been persisted: in the run journal, against the
+    query that found the page, and for pages that yielded boats, in source_pages for
+    later incremental refreshes.
+    """
+    if page.fetched and boats_found:
+        get_repository().record_source_page(page.url, page.make, page.title, page_content_hash(page.content))
+    cache = get_query_cache()
+    if cache and page.query:
+        cache.record_yield(page.make, page.query, new_boats, updated_boats)
+    tracker = get_usage_tracker()
+    if tracker:
+        tracker.record_page(page.url, len(boats_found or []))
+    journal = get_run_journal()
+    if journal:
+        journal.record(STAGE_PAGE, page.url, STATUS_DONE if page.fetched else STATUS_FAILED,
+                       make=page.make, url=page.url)
+
+
+def seed_work_queue(queue, crawl_id: str, manufacturers: List[str]) -> int:
+    """
+    Coordinator side of a work-queue crawl: adds one search task per (manufacturer, query).
+    Returns the number of tasks added.
+    """
+    from work_queue import KIND_SEARCH
+
+    tasks = []
+    for make in manufacturers:
+        for query in manufacturer_queries(make)[:QUERIES_PER_MANUFACTURER]:
+            tasks.append((search_key(make, query), {'make': make, 'query': query}, 0))
+    return queue.add_many(crawl_id, KIND_SEARCH, tasks)
+
+
+def work_queue_handlers(queue, crawl_id: str) -> Dict:
+    """Worker side of a work-queue crawl: the handler for each task kind."""
+    from work_queue import KIND_PAGE, KIND_SEARCH
+
+    def search(task) -> Dict:
+        make, query = task.payload['make'], task.payload['query']
+        results = run_search(make, query)
+        pages = [(canonicalize_url(result['url']),
+                  {'url': result['url'], 'make': make, 'title': result.get('title', ''),
+                   'description': result.get('description', ''), 'query': query},
+                  url_priority(result['url'], make))
+                 for result in results[:RESULTS_PER_QUERY] if result.get('url')]
+        return {'results': len(results), 'pages': queue.add_many(crawl_id, KIND_PAGE, pages)}
+
+    def page(task) -> Dict:
+        entry = task.payload
+        logger.info(f"   Fetching: {entry['title'][:50]}...")
+        content = fetch_webpage(entry['url'])
+        fetched = bool(content)
+        if not fetched:
+            content = f"Title: {entry['title']}\nDescription: {entry['description']}"
+        crawl_page = CrawlPage(entry['url'], content, entry['make'], entry['title'], fetched, entry['query'])
+        boats_found = extract_page_boats(crawl_page.content, crawl_page.make, crawl_page.title, crawl_page.url)
+        new, updated = persist_boats(boats_found, crawl_page.url)
+        finish_page(crawl_page, boats_found, new, updated)
+        return {'fetched': fetched, 'boats': len(boats_found), 'new_boats': new, 'updated_boats': updated}
+
+    return {KIND_SEARCH: search, KIND_PAGE: page}
+
+
+def crawl_work_queue(manufacturers: List[str], queue, crawl_id: str, worker_argv: List[str], workers: int,
+                     poll_interval: float = 5.0) -> Tuple[int, int]:
+    """
+    Seeds a work-queue crawl, starts `workers` local worker processes (search_boats.py
+    --worker plus worker_argv) and waits until every task is done or failed, reclaiming
+    expired leases meanwhile. Returns (new_boats_count, updated_boats_count) over all workers.
+    """
+    import subprocess
+    import time
+
+    from work_queue import KIND_PAGE
+
+    seeded = seed_work_queue(queue, crawl_id, manufacturers)
+    logger.info(f"📬 Work queue: crawl {crawl_id}, {seeded} searches seeded, {workers} local workers")
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', '--crawl-id', crawl_id,
+                                   *worker_argv]) for _ in range(workers)]
+    try:
+        while not queue.is_finished(crawl_id):
+            if processes and all(process.poll() is not None for process in processes):
+                logger.error("✗ Every worker has exited with tasks left; run more with --worker "
+                             f"--crawl-id {crawl_id}")
+                break
+            queue.reclaim_expired(crawl_id)
+            time.sleep(poll_interval)
+    finally:
+        for process in processes:
+            process.wait()
+    counts = queue.counts(crawl_id)
+    if queue.is_finished(crawl_id):
+        queue.finish_crawl(crawl_id)
+    logger.info("📬 Work queue: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    results = queue.results(crawl_id, KIND_PAGE)
+    return (sum(result['new_boats'] for result in results), sum(result['updated_boats'] for result in results))
+
+
+def discover_pages(manufacturers: List[str], frontier: CrawlFrontier) -> int:
+    """
+    Runs the searches for every manufacturer and adds their results to the frontier.
+    Returns the number of pages newly scheduled for fetching.
+    """
+    added = 0
+    for make in manufacturers:
+        print(f"\nProcessing {make}...")
+        queries = manufacturer_queries(make)
+
+        for query in queries[:QUERIES_PER_MANUFACTURER]:
+            search_results = run_search(make, query)
+
+            for result in search_results[:RESULTS_PER_QUERY]:
+                if schedule_page(frontier, make, result, query):
+                    added += 1
+
+    logger.info(f"🧭 Frontier: {added} pages to fetch, {frontier.duplicates} duplicate URLs, "
+                f"{frontier.skipped} fetched by a recent run")
+    return added
+
+
+def fetch_frontier_page(entry: FrontierEntry, frontier: CrawlFrontier) -> CrawlPage:
+    """
+    Fetches one frontier page and records the outcome.
+    Content falls back to the search title/description when the page cannot be fetched.
+    """
+    logger.info(f"   Fetching: {entry.title[:50]}...")
+    content = fetch_webpage(entry.url)
+    fetched = bool(content)
+
+    if fetched:
+        frontier.mark_fetched(entry.url)
+    else:
+        frontier.mark_failed(entry.url, "no content")
+        # Fallback to title/description if fetch fails
+        content = f"Title: {entry.title}\nDescription: {entry.description}"
+
+    return CrawlPage(entry.url, content, entry.make, entry.title, fetched, entry.query)
+
+
+def iter_pages(manufacturers: List[str], frontier: Optional[CrawlFrontier] = None) -> Iterator[CrawlPage]:
+    """
+    Runs every search first, then fetches the deduplicated pages in frontier priority order.
+    Yields CrawlPage tuples, one per unique page.
+    """
+    frontier = frontier or new_run_frontier()
+    discover_pages(manufacturers, frontier)
+    for entry in frontier.drain():
+        yield fetch_frontier_page(entry, frontier)
+
+
+def persist_boats(boats_found: List[Dict], url: str) -> Tuple[int, int]:
+    """
+    Writes extracted boats for one page in one transaction: matches of stored boats are
+    updated in place and the new boats go in with a single upsert_many().
+    Returns (new_boats_count, updated_boats_count).
+    """
+    new_boats_count = 0
+    updated_boats_count = 0
+    metrics = get_metrics()
+    repository = get_repository()
+    pending: List[Dict] = []
+    with metrics.timer('db_write'), repository.transaction():
+        for boat_data in boats_found or []:
+            outcome = process_extracted_boat(boat_data, url, pending)
+            if outcome == 'new':
+                new_boats_count += 1
+            elif outcome == 'updated':
+                updated_boats_count += 1
+        if pending:
+            repository.upsert_many(pending)
+    metrics.inc('boats_found_total', len(boats_found or []))
+    metrics.inc('boats_new_total', new_boats_count)
+    metrics.inc('boats_updated_total', updated_boats_count)
+    return new_boats_count, updated_boats_count
+
+
+def crawl_sequential(manufacturers: List[str]) -> Tuple[int, int]:
+    """
+    Crawls manufacturers one query and one page at a time.
+    Returns (new_boats_count, updated_boats_count).
+    """
+    new_boats_count = 0
+    updated_boats_count = 0
+
+    for page in iter_pages(manufacturers):
+        boats_found = extract_page_boats(page.content, page.make, page.title, page.url)
+        new, updated = persist_boats(boats_found, page.url)
+        finish_page(page, boats_found, new, updated)
+        new_boats_count += new
+        updated_boats_count += updated
+
+    return new_boats_count, updated_boats_count
+
+
+def crawl_batch(manufacturers: List[str], poll_interval: float = 30.0,
+                pages_per_transaction: int = 50) -> Tuple[int, int]:
+    """
+    Fetches every page first, then extracts them all with one Message Batches request.
+    Results are written pages_per_transaction pages at a time. Pages whose batch request
+    failed are marked failed in the frontier and left out of the journal, so --resume
+    (or a later run) retries them.
+    Returns (new_boats_count, updated_boats_count).
+    """
+    from batch_extract import AnthropicBatchBackend, run_batch_extraction
+
+    frontier = new_run_frontier()
+    pages = list(iter_pages(manufacturers, frontier))
+    extracted = {}
+    for page in pages:
+        fast = extract_specs_fast(page.content, make=page.make, title=page.title)
+        if fast:
+            extracted[page.url] = fast
+    remaining = [(page.url, page.content) for page in pages if page.url not in extracted]
+    logger.info(f"📦 Collected {len(pages)} pages, {len(remaining)} need batch extraction")
+    extracted.update(run_batch_extraction(remaining, AnthropicBatchBackend(get_client()),
+                                          poll_interval=poll_interval, makes={page.url: page.make for page in pages}))
+
+    failed = [page for page in pages if page.url not in extracted]
+    for page in failed:
+        frontier.mark_failed(page.url, "batch request failed")
+    if failed:
+        logger.warning(f"📦 {len(failed)} pages failed batch extraction and will be retried")
+    pages = [page for page in pages if page.url in extracted]
+
+    new_boats_count = 0
+    updated_boats_count = 0
+    repository = get_repository()
+    for start in range(0, len(pages), pages_per_transaction):
+        chunk = pages[start:start + pages_per_transaction]
+        counts = []
+        with repository.transaction():
+            for page in chunk:
+                new, updated = persist_boats(extracted[page.url], page.url)
+                counts.append((new, updated))
+                new_boats_count += new
+                updated_boats_count += updated
+        for page, (new, updated) in zip(chunk, counts):
+            finish_page(page, extracted[page.url], new, updated)
+
+    return new_boats_count, updated_boats_count
+
+
+def main(argv: Optional[List[str]] = None):
+    global SPEC_SELECTION
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    args = parse_args(argv)
+    configure_logging()
+    load_environment()
+
     logger.info("=" * 60)
     logger.info("🚤 Starting Powerboat Search...")
-    logger.info("   Target: 13'-14' boats with 40+ HP")
+    criteria = search_criteria()
+    logger.info(f"   Target: {criteria.min_length}'-{criteria.max_length}' boats with {criteria.min_hp}+ HP "
+                f"(all sizes are stored)")
     logger.info("=" * 60)
 
-    if not BRAVE_API_KEY:
+    if not BRAVE_API_KEY and not args.incremental:
         logger.error("✗ BRAVE_API_KEY is not set in environment or .env file.")
         logger.error("  Please obtain a key from https://brave.com/search/api/")
         logger.error("  Add it to your .env file or export as environment variable")
@@ -486,79 +1997,198 @@ def main():
     # Initialize database
     init_database()
 
-    # Limited list for testing
-    manufacturers = ["Boston Whaler", "Carolina Skiff", "Gheenoe"]
-    new_boats_count = 0
-    updated_boats_count = 0
-
-    for make in manufacturers:
-        print(f"\nProcessing {make}...")
-        queries = generate_search_queries(make)
-
-        # Limit to 1 query per manufacturer to save API credits during initial test
-        for query in queries[:1]:
-            search_results = search_web(query)
-
-            # Limit to top 3 results
-            for result in search_results[:3]:
-                url = result.get('url', '')
-                title = result.get('title', '')
-
-                # Fetch full webpage content
-                logger.info(f"   Fetching: {title[:50]}...")
-                content = fetch_webpage(url)
-
-                if not content:
-                    # Fallback to title/description if fetch fails
-                    content = f"Title: {title}\nDescription: {result.get('description', '')}"
-
-                boats_found = extract_specs(content)
-                for boat_data in boats_found:
-                    # Filter check
-                    try:
-                        length = float(boat_data.get('length_ft', 0))
-                        hp = int(boat_data.get('max_hp', 0))
-                        boat_data['source_url'] = url  # Track source
-
-                        # Debug: show what was extracted
-                        logger.info(f"   Found: {boat_data.get('make')} {boat_data.get('model')} - {length}' / {hp}HP")
-
-                        # 13' = 13.0, 14' = 14.0
-                        if 13.0 <= length <= 14.0 and hp >= 40:
-                            # Check for duplicates in database using fuzzy matching
-                            existing = find_duplicate_in_db(boat_data)
-
-                            if existing:
-                                # Update existing boat with new data
-                                update_boat_by_id(existing['id'], boat_data)
-                                logger.info(f"   📝 Updated: {existing['model']} with data from {boat_data.get('model')}")
-                                updated_boats_count += 1
-                            else:
-                                # Insert new boat - writes to DB immediately
-                                if upsert_boat(boat_data):
-                                    print(f"  ✅ NEW: {boat_data.get('make')} {boat_data.get('model')}")
-                                    new_boats_count += 1
-                                else:
-                                    logger.info(f"   📝 Updated existing: {boat_data.get('model')}")
-                                    updated_boats_count += 1
-                    except (ValueError, TypeError):
-                        pass
-
-            # Be nice to APIs
-            time.sleep(1)
+    from http_client import HttpClientConfig, configure_http_client
+
+    http = configure_http_client(HttpClientConfig(
+        pool_maxsize=max(args.fetch_workers, 10),
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        max_retries=args.max_retries,
+    ))
+
+    limiter = configure_rate_limiter(RateLimiter(RateLimitConfig(
+        brave_per_second=args.brave_rps,
+        anthropic_requests_per_minute=args.anthropic_rpm,
+        anthropic_tokens_per_minute=args.anthropic_tpm,
+        host_per_second=args.host_rps,
+    )))
+
+    if not args.no_page_cache:
+        configure_page_cache(PageCache(args.cache_dir, ttl_seconds=args.cache_ttl_hours * 3600,
+                                       max_bytes=args.cache_max_mb * 1024 * 1024))
+
+    if args.no_spec_selection:
+        SPEC_SELECTION = False
+
+    if args.parse_workers > 0:
+        configure_parse_pool(ParsePool(args.parse_workers, args.parse_queue))
+
+    if not args.no_extraction_cache:
+        extraction_cache = configure_extraction_cache(ExtractionCache(default_cache_path(DB_FILE)))
+        if args.clear_extraction_cache:
+            extraction_cache.invalidate()
+        else:
+            extraction_cache.prune_stale(EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL)
+
+    if not args.no_query_cache:
+        configure_query_cache(QueryCache(default_query_cache_path(DB_FILE), QUERY_PROMPT_VERSION, QUERY_MODEL,
+                                         ttl_seconds=args.query_ttl_days * 24 * 3600, lazy=args.lazy_queries))
+
+    queue = None
+    if args.worker or args.queue_workers is not None:
+        # The work queue records progress and deduplicates pages, in place of the journal and frontier
+        from work_queue import WorkQueue, default_queue_path
+
+        queue = WorkQueue(args.queue_db or default_queue_path(DB_FILE))
+        journal = configure_run_journal(None)
+        if args.worker:
+            run_id = args.crawl_id or queue.latest_crawl()
+            if run_id is None:
+                logger.error("✗ No unfinished work-queue crawl to join; start one with --queue-workers")
+                return
+        else:
+            run_id = queue.start_crawl()
+    else:
+        journal = configure_run_journal(RunJournal(default_journal_path(DB_FILE)))
+        run_id = journal.start_run(resume=args.resume)
+        if journal.resumed:
+            logger.info(f"↻ Resuming run {run_id}")
+
+    if not args.no_frontier_history and queue is None:
+        configure_frontier(CrawlFrontier(default_frontier_path(DB_FILE), revisit_seconds=args.revisit_hours * 3600,
+                                         run_id=run_id))
+
+    repository = get_repository()
+    usage = configure_usage_tracker(UsageTracker(repository, run_id, budget_usd=args.budget_usd,
+                                                 soft_fraction=args.budget_soft_fraction,
+                                                 min_pages=args.low_yield_pages))
+    if args.budget_usd is not None:
+        usage.seed(repository.domain_yield())
+        logger.info(f"💸 Claude budget: ${args.budget_usd:.2f}")
+
+    manufacturers = load_manufacturers(args.all_manufacturers)
+    metrics = configure_metrics()
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    if args.worker:
+        from work_queue import run_worker
+
+        worker_stats = run_worker(queue, run_id, work_queue_handlers(queue, run_id), lease_seconds=args.lease_seconds)
+        logger.info(f"📬 Worker finished: {worker_stats.done} tasks done, {worker_stats.failed} failed, "
+                    f"{worker_stats.lost} lost leases")
+        new_boats_count = worker_stats.totals.get('new_boats', 0)
+        updated_boats_count = worker_stats.totals.get('updated_boats', 0)
+    elif args.queue_workers is not None:
+        # Local workers share the per-service rate limits
+        share = max(args.queue_workers, 1)
+        worker_argv = ['--lease-seconds', str(args.lease_seconds), '--brave-rps', str(args.brave_rps / share),
+                       '--anthropic-rpm', str(args.anthropic_rpm / share),
+                       '--anthropic-tpm', str(args.anthropic_tpm / share), '--host-rps', str(args.host_rps / share)]
+        if args.queue_db:
+            worker_argv += ['--queue-db', args.queue_db]
+        new_boats_count, updated_boats_count = crawl_work_queue(manufacturers, queue, run_id, worker_argv,
+                                                                args.queue_workers)
+    elif args.incremental:
+        from incremental import refresh_sources
+
+        refresh = refresh_sources(args.max_age_hours, args.incremental_limit)
+        new_boats_count, updated_boats_count = refresh.new_boats, refresh.updated_boats
+    elif args.pipeline:
+        from pipeline import PipelineConfig, run_pipeline
+
+        config = PipelineConfig(
+            search_workers=args.search_workers,
+            fetch_workers=args.fetch_workers,
+            extract_workers=args.extract_workers,
+        )
+        stats = run_pipeline(manufacturers, config)
+        new_boats_count, updated_boats_count = stats.new_boats, stats.updated_boats
+    elif args.batch:
+        new_boats_count, updated_boats_count = crawl_batch(manufacturers, args.batch_poll_seconds)
+    else:
+        new_boats_count, updated_boats_count = crawl_sequential(manufacturers)
+
+    if args.export:
+        from export import export_boats
+
+        with metrics.timer('export'):
+            exported = export_boats(DB_FILE, args.export)
+        logger.info(f"📦 Exported {exported.rows} boats to {exported.path}")
+    if args.sync_sheet:
+        from sheets_sync import sheet_url_setting
+
+        sheet = sheet_url_setting()
+        if sheet:
+            try:
+                open_sheet_sync(repository, sheet).sync()
+            except Exception as e:
+                logger.error(f"✗ Sheet sync failed: {e}")
+        else:
+            logger.error("✗ --sync-sheet needs GOOGLE_SHEET_URL in the environment or config.py")
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        logger.info(f"📈 Profile written to {args.profile} (view with: python -m pstats {args.profile})")
+    if args.metrics_jsonl:
+        metrics.write_jsonl(args.metrics_jsonl, run_id=run_id)
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+
+    if journal:
+        journal.finish_run()
+    if queue:
+        queue.close()
+    parse_pool = get_parse_pool()
+    configure_parse_pool(None)
 
     # Get final count from database
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM boats')
-    total_boats = cursor.fetchone()[0]
-    conn.close()
+    total_boats = count_boats()
 
     print(f"\n{'='*60}")
     print(f"Search Complete!")
     print(f"  New boats added: {new_boats_count}")
     print(f"  Boats updated: {updated_boats_count}")
     print(f"  Total in database: {total_boats}")
+    print(f"  In target window: {repository.count_matching(None, *criteria)}")
+    http_stats = http.stats.as_dict()
+    print(f"  HTTP connections: {http_stats['opened']} opened, {http_stats['reused']} reused")
+    stage_totals = metrics.stage_totals()
+    if stage_totals:
+        print("  Stage time: " + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds
+                                          in sorted(stage_totals.items(), key=lambda item: -item[1])))
+    if usage.calls:
+        print(f"  Claude usage: {usage.calls} calls, {usage.input_tokens:,} input / {usage.output_tokens:,} output "
+              f"tokens, ${usage.cost_usd:.4f}")
+        for row in repository.llm_usage_summary('make', run_id=run_id)[:5]:
+            print(f"    {row['make'] or '(no make)'}: ${row['cost_usd']:.4f}, {row['boats_found']} boats")
+        wasted = usage.wasted_domains()
+        if wasted:
+            print("  Domains with no boats: " + ", ".join(f"{domain} ({domain_usage.tokens:,} tokens)"
+                                                       for domain, domain_usage in wasted.items()))
+    if usage.refused:
+        print(f"  Budget: {usage.refused} Claude calls skipped")
+    cache = get_page_cache()
+    if cache:
+        print(f"  Page cache: {cache.hits} hits, {cache.revalidated} revalidated, {cache.misses} misses")
+    if parse_pool:
+        print(f"  Parse pool: {parse_pool.submitted} pages parsed on {parse_pool.workers} worker processes")
+    waited = limiter.total_waited()
+    if waited:
+        print("  Rate limit waits: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in sorted(waited.items())))
+    query_cache = get_query_cache()
+    if query_cache:
+        print(f"  Query cache: {query_cache.hits} manufacturers reused queries, {query_cache.misses} generated")
+    frontier = get_frontier()
+    if frontier:
+        print(f"  Frontier: {frontier.added} pages scheduled, {frontier.duplicates} duplicate URLs, "
+              f"{frontier.skipped} skipped as recently fetched")
+    extraction_cache = get_extraction_cache()
+    if extraction_cache:
+        print(f"  Extraction cache: {extraction_cache.hits} hits, {extraction_cache.misses} misses "
+              f"({extraction_cache.hit_rate:.0%} hit rate)")
     print(f"{'='*60}")
     print(f"\nWatch live: sqlite3 {DB_FILE} 'SELECT * FROM boats'")
     print(f"Or use: watch -n 1 \"sqlite3 {DB_FILE} 'SELECT make, model, length_ft, max_hp FROM boats'\"")
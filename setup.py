@@ -21,7 +21,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/YOUR_USERNAME/PowerboatList",
     packages=find_packages(),
-    py_modules=["search_boats", "__version__"],
+    py_modules=["search_boats", "pipeline", "http_client", "page_cache", "extraction_cache", "batch_extract", "dedupe_index", "html_text", "spec_sections", "spec_rules", "crawl_frontier", "rate_limit", "parse_pool", "run_journal", "incremental", "query_cache", "benchmark", "metrics", "llm_usage", "catalog", "export", "sheets_sync", "work_queue", "__version__"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -53,8 +53,15 @@ setup(
             "mypy>=1.5.0",
             "pre-commit>=3.3.3",
         ],
+        "catalog": [
+            "pandas>=1.5.0",
+        ],
+        "export": [
+            "pyarrow>=10.0.0",
+        ],
         "colab": [
             "gspread>=5.12.0",
+            "google-auth>=2.0.0",
             "oauth2client>=4.1.3",
         ],
     },
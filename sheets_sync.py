@@ -0,0 +1,293 @@
+"""
+Incremental Google Sheets sync.
+
+The Colab notebook appends one row per matching boat with append_row(), one
+API call each, which runs into the Sheets write quota on a large crawl.
+SheetSync keeps, per sheet, the row each boat was written to and a hash of
+the values written (sheet_rows in boats.db, which includes updated_at in
+the hash). A sync compares the boats in boats.db against that state and
+writes only:
+
+    new boats        into rows freed by removed boats, then after the last row
+    changed boats    over their existing row
+    removed boats    (deleted, or no longer within the bounds) blanked
+
+Consecutive rows are merged into one A1 range and all ranges go out in a
+single values.batchUpdate call (split every max_rows_per_call rows), so a
+crawl costs a handful of calls however many boats it touched. The state is
+saved after each call, so a failed sync resumes where it stopped.
+
+The first sync, or one after the column layout changes, clears the sheet
+and rewrites it from the header row down. Rows are not kept sorted; new
+boats take the first free row.
+
+The spreadsheet sits behind SheetBackend: GspreadBackend for the real API
+(gspread and google-auth, pip install powerboatlist[colab]) and
+FakeSheetBackend, an in-memory grid for tests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# (boats column, sheet header)
+SHEET_COLUMNS = [
+    ('id', 'ID'),
+    ('make', 'Make'),
+    ('model', 'Model'),
+    ('length_ft', 'Length (ft)'),
+    ('max_hp', 'Max HP'),
+    ('dry_weight_lbs', 'Dry Weight (lbs)'),
+    ('beam_inches', 'Beam (in)'),
+    ('source_url', 'Source'),
+    ('updated_at', 'Updated'),
+]
+HEADER_ROW = 1
+MAX_ROWS_PER_CALL = 5000
+
+# config_template.py placeholder for GOOGLE_SHEET_URL
+_PLACEHOLDER_URL = "your_google_sheet_url_here"
+_A1_RANGE = re.compile(r'^(?:.*!)?([A-Z]+)(\d+):([A-Z]+)(\d+)$')
+
+
+def column_letter(number: int) -> str:
+    """A1 column letters for a 1-based column number (1 -> A, 27 -> AA)."""
+    letters = ''
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def column_number(letters: str) -> int:
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord('A') + 1
+    return number
+
+
+def a1_range(first_row: int, last_row: int, width: int) -> str:
+    return f"A{first_row}:{column_letter(width)}{last_row}"
+
+
+def parse_a1_range(a1: str) -> Tuple[int, int, int, int]:
+    """(first row, first column, last row, last column) of an A1 range like Sheet1!A2:I5."""
+    match = _A1_RANGE.match(a1)
+    if not match:
+        raise ValueError(f"Unsupported A1 range: {a1}")
+    first_col, first_row, last_col, last_row = match.groups()
+    return int(first_row), column_number(first_col), int(last_row), column_number(last_col)
+
+
+def sheet_url_setting() -> Optional[str]:
+    """GOOGLE_SHEET_URL from the environment, or from config.py/config_template.py if it is filled in."""
+    url = os.getenv("GOOGLE_SHEET_URL")
+    if not url:
+        try:
+            import config
+        except ImportError:
+            import config_template as config
+        url = getattr(config, 'GOOGLE_SHEET_URL', None)
+    return url if url and url != _PLACEHOLDER_URL else None
+
+
+class SheetBackend:
+    """Interface for a worksheet that takes batched value updates."""
+
+    sheet_id: str = ''
+
+    def batch_update(self, data: List[Dict]):
+        """Writes [{'range': 'A2:I3', 'values': [[...], ...]}, ...] in one values.batchUpdate call."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Empties the worksheet."""
+        raise NotImplementedError
+
+
+class GspreadBackend(SheetBackend):
+    """Backend for a gspread Worksheet."""
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self.sheet_id = f"{worksheet.spreadsheet.id}:{worksheet.id}"
+
+    @classmethod
+    def open(cls, sheet: str, worksheet: Optional[str] = None,
+             credentials_file: Optional[str] = None) -> 'GspreadBackend':
+        """
+        Opens a spreadsheet by URL or key, with a service account file or, without one,
+        the application default credentials (as the notebook does in Colab).
+        """
+        import gspread
+
+        if credentials_file:
+            gc = gspread.service_account(filename=credentials_file)
+        else:
+            from google.auth import default
+
+            credentials, _ = default(scopes=['https://www.googleapis.com/auth/spreadsheets',
+                                             'https://www.googleapis.com/auth/drive'])
+            gc = gspread.authorize(credentials)
+        spreadsheet = gc.open_by_url(sheet) if sheet.startswith('http') else gc.open_by_key(sheet)
+        return cls(spreadsheet.worksheet(worksheet) if worksheet else spreadsheet.sheet1)
+
+    def batch_update(self, data: List[Dict]):
+        # values.batchUpdate does not grow the grid, so add any rows the ranges need first
+        last_row = max(parse_a1_range(entry['range'])[2] for entry in data)
+        if last_row > self.worksheet.row_count:
+            self.worksheet.add_rows(last_row - self.worksheet.row_count)
+        self.worksheet.batch_update(data, value_input_option='RAW')
+
+    def clear(self):
+        self.worksheet.clear()
+
+
+class FakeSheetBackend(SheetBackend):
+    """In-memory worksheet that records the calls made to it."""
+
+    def __init__(self, sheet_id: str = "fake_sheet"):
+        self.sheet_id = sheet_id
+        self.cells: Dict[Tuple[int, int], object] = {}
+        self.calls: List[Tuple[str, int]] = []
+
+    def batch_update(self, data: List[Dict]):
+        self.calls.append(('batch_update', len(data)))
+        for entry in data:
+            first_row, first_col, _, _ = parse_a1_range(entry['range'])
+            for i, values in enumerate(entry['values']):
+                for j, value in enumerate(values):
+                    if value == '':
+                        self.cells.pop((first_row + i, first_col + j), None)
+                    else:
+                        self.cells[(first_row + i, first_col + j)] = value
+
+    def clear(self):
+        self.calls.append(('clear', 0))
+        self.cells.clear()
+
+    def rows(self) -> List[List]:
+        """The grid down to the last non-empty row, with '' for empty cells."""
+        if not self.cells:
+            return []
+        last_row = max(row for row, _ in self.cells)
+        last_col = max(col for _, col in self.cells)
+        return [[self.cells.get((row, col), '') for col in range(1, last_col + 1)]
+                for row in range(1, last_row + 1)]
+
+
+@dataclass
+class SyncResult:
+    """What one sync changed on the sheet."""
+    written: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    api_calls: int = 0
+
+
+def _row_values(boat: Dict) -> List:
+    return ['' if boat.get(column) is None else boat[column] for column, _ in SHEET_COLUMNS]
+
+
+def _row_hash(values: List) -> str:
+    return hashlib.sha1(json.dumps(values, default=str).encode('utf-8')).hexdigest()
+
+
+class SheetSync:
+    """
+    Pushes the boats matching make and bounds (see BoatRepository.query_boats) to a sheet,
+    writing only what changed since the last sync.
+    """
+
+    def __init__(self, repository, backend: SheetBackend, make: Optional[str] = None,
+                 bounds: Optional[Dict[str, Optional[float]]] = None, max_rows_per_call: int = MAX_ROWS_PER_CALL):
+        self.repository = repository
+        self.backend = backend
+        self.make = make
+        self.bounds = bounds or {}
+        self.max_rows_per_call = max_rows_per_call
+        self.layout = ','.join(column for column, _ in SHEET_COLUMNS)
+
+    def sync(self, full: bool = False) -> SyncResult:
+        """Brings the sheet up to date; full rewrites it from scratch."""
+        with get_metrics().timer('sheet_sync'):
+            result = self._sync(full)
+        get_metrics().inc('sheet_api_calls_total', result.api_calls)
+        get_metrics().inc('sheet_rows_written_total', result.written + result.removed)
+        return result
+
+    def _sync(self, full: bool) -> SyncResult:
+        sheet_id = self.backend.sheet_id
+        result = SyncResult()
+        layout, state = self.repository.sheet_state(sheet_id)
+        # row -> (values, (boat id, row, hash) to record or None, boat id to forget or None)
+        writes: Dict[int, Tuple[List, Optional[Tuple[int, int, str]], Optional[int]]] = {}
+
+        if full or layout != self.layout:
+            self.repository.clear_sheet_state(sheet_id)
+            state = {}
+            self.backend.clear()
+            result.api_calls += 1
+            writes[HEADER_ROW] = ([header for _, header in SHEET_COLUMNS], None, None)
+
+        boats = self.repository.query_boats(self.make, **self.bounds)
+        current = {boat['id'] for boat in boats}
+        # (row, boat id) of boats no longer on the sheet, lowest row first
+        free_rows = sorted((row, boat_id) for boat_id, (row, _) in state.items() if boat_id not in current)
+        next_row = max([HEADER_ROW] + [row for row, _ in state.values()]) + 1
+
+        for boat in boats:
+            values = _row_values(boat)
+            row_hash = _row_hash(values)
+            if boat['id'] in state:
+                row, previous_hash = state[boat['id']]
+                if previous_hash == row_hash:
+                    result.unchanged += 1
+                    continue
+                writes[row] = (values, (boat['id'], row, row_hash), None)
+            elif free_rows:
+                row, old_boat_id = free_rows.pop(0)
+                writes[row] = (values, (boat['id'], row, row_hash), old_boat_id)
+            else:
+                row, next_row = next_row, next_row + 1
+                writes[row] = (values, (boat['id'], row, row_hash), None)
+            result.written += 1
+        for row, old_boat_id in free_rows:
+            writes[row] = ([''] * len(SHEET_COLUMNS), None, old_boat_id)
+        result.removed = len(free_rows)
+
+        for rows in self._batches(sorted(writes)):
+            data = [{'range': a1_range(run[0], run[-1], len(SHEET_COLUMNS)),
+                     'values': [writes[row][0] for row in run]} for run in _runs(rows)]
+            self.backend.batch_update(data)
+            result.api_calls += 1
+            self.repository.save_sheet_state(
+                sheet_id, self.layout,
+                [writes[row][1] for row in rows if writes[row][1]],
+                [writes[row][2] for row in rows if writes[row][2] is not None])
+        if result.written or result.removed:
+            logger.info(f"📊 Sheet sync: {result.written} rows written, {result.removed} removed, "
+                        f"{result.api_calls} API calls")
+        return result
+
+    def _batches(self, rows: List[int]) -> List[List[int]]:
+        return [rows[i:i + self.max_rows_per_call] for i in range(0, len(rows), self.max_rows_per_call)]
+
+
+def _runs(rows: List[int]) -> List[List[int]]:
+    """Sorted row numbers split into runs of consecutive rows."""
+    runs: List[List[int]] = []
+    for row in rows:
+        if runs and row == runs[-1][-1] + 1:
+            runs[-1].append(row)
+        else:
+            runs.append([row])
+    return runs
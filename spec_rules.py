@@ -0,0 +1,162 @@
+"""
+Rule-based spec extraction, used as a fast path ahead of Claude.
+
+Manufacturer spec sheets usually label their numbers clearly ("LOA 13'4"",
+"Max HP 60", "Dry Weight 475 lbs"). extract_specs_fast() reads those labels
+with regular expressions, converts units (feet/inches, meters, kg) and
+returns the same list-of-dicts shape as extract_specs(). It only answers
+when the result is unambiguous: exactly one labelled length, exactly one
+labelled max HP, both in a plausible range, and a model name taken from the
+page title. Anything else returns None and falls through to Claude.
+"""
+
+import re
+from typing import Dict, List, Optional, Set
+
+FEET_PER_METER = 3.28084
+LBS_PER_KG = 2.20462
+
+# Plausible ranges for a confident answer
+LENGTH_RANGE_FT = (6.0, 40.0)
+HP_RANGE = (2, 600)
+
+# Gap allowed between a label and its value ("LOA (approx.): 13'4"")
+_GAP = r"[^\d\n]{0,25}?"
+
+_FEET_MARK = r"(?:'|’|′|ft\.?|feet|foot)"
+_INCH_MARK = r"(?:\"|”|″|''|in\.?|inches|inch)"
+
+# 13'6", 13 ft 6 in, 13' 6.5", 13 feet
+_FEET_INCHES = rf"(?P<ft>\d{{1,2}})\s*{_FEET_MARK}\s*(?:(?P<in>\d{{1,2}}(?:\.\d+)?)\s*{_INCH_MARK})?"
+# 13.5 ft
+_DECIMAL_FEET = rf"(?P<dft>\d{{1,2}}\.\d+)\s*{_FEET_MARK}"
+# 4.11 m
+_METERS = r"(?P<m>\d{1,2}(?:\.\d+)?)\s*(?:m|meters|metres)\b"
+# 162 in
+_INCHES = rf"(?P<tin>\d{{2,3}}(?:\.\d+)?)\s*{_INCH_MARK}"
+_DIMENSION = rf"(?:{_DECIMAL_FEET}|{_FEET_INCHES}|{_METERS}|{_INCHES})"
+
+LENGTH_RE = re.compile(
+    rf"\b(?:LOA|length\s+overall|overall\s+length|hull\s+length|boat\s+length|length){_GAP}{_DIMENSION}",
+    re.I)
+BEAM_RE = re.compile(rf"\b(?:beam|max(?:imum)?\s+beam){_GAP}{_DIMENSION}", re.I)
+HP_RE = re.compile(
+    r"\b(?:max(?:imum)?\.?\s*(?:hp|horsepower|h\.p\.|power|outboard|engine)(?:\s+rating)?"
+    r"|(?:hp|horsepower|power)\s+(?:rating|capacity|max(?:imum)?))"
+    rf"{_GAP}(?P<hp>\d{{1,3}})(?!\s*(?:'|ft|feet|in\b|\"|lbs?|kg))",
+    re.I)
+WEIGHT_RE = re.compile(
+    rf"\b(?:dry\s+weight|weight\s*\(dry\)|hull\s+weight|approx\.?\s+weight|weight){_GAP}"
+    r"(?P<w>\d{1,2},\d{3}|\d{2,5})\s*(?P<unit>lbs?\.?|pounds|kg|kgs)?",
+    re.I)
+
+# Title words that describe the page rather than the boat
+_TITLE_NOISE = re.compile(
+    r"\b(?:specs?|specifications?|reviews?|for\s+sale|boats?|brochure|details|features|"
+    r"owner'?s?\s+manual|pictures|photos|price|prices)\b.*$",
+    re.I)
+_TITLE_SEPARATORS = re.compile(r"\s+[|–—-]\s+|\s*\|\s*")
+
+
+def _dimension_feet(match: "re.Match") -> Optional[float]:
+    """Converts a matched _DIMENSION group to feet."""
+    groups = match.groupdict()
+    if groups.get('dft'):
+        return float(groups['dft'])
+    if groups.get('ft'):
+        return int(groups['ft']) + float(groups.get('in') or 0) / 12.0
+    if groups.get('m'):
+        return float(groups['m']) * FEET_PER_METER
+    if groups.get('tin'):
+        return float(groups['tin']) / 12.0
+    return None
+
+
+def parse_length_ft(text: str) -> Set[float]:
+    """Distinct labelled overall lengths in text, in feet rounded to 0.01."""
+    values = set()
+    for match in LENGTH_RE.finditer(text):
+        feet = _dimension_feet(match)
+        if feet is not None:
+            values.add(round(feet, 2))
+    return values
+
+
+def parse_beam_inches(text: str) -> Set[int]:
+    """Distinct labelled beams in text, in whole inches."""
+    values = set()
+    for match in BEAM_RE.finditer(text):
+        feet = _dimension_feet(match)
+        if feet is not None:
+            values.add(int(round(feet * 12)))
+    return values
+
+
+def parse_max_hp(text: str) -> Set[int]:
+    """Distinct labelled maximum horsepower ratings in text."""
+    return {int(match.group('hp')) for match in HP_RE.finditer(text)}
+
+
+def parse_dry_weight_lbs(text: str) -> Set[int]:
+    """Distinct labelled weights in text, in pounds."""
+    values = set()
+    for match in WEIGHT_RE.finditer(text):
+        weight = float(match.group('w').replace(',', ''))
+        unit = (match.group('unit') or '').lower()
+        if unit.startswith('kg'):
+            weight *= LBS_PER_KG
+        values.add(int(round(weight)))
+    return values
+
+
+def guess_model(title: str, make: str) -> Optional[str]:
+    """
+    Pulls a model name out of a page title such as
+    "Boston Whaler 130 Super Sport Specs | Boat Test". Returns None unless the
+    title names the make and something follows it.
+    """
+    if not title or not make:
+        return None
+    for segment in _TITLE_SEPARATORS.split(title):
+        position = segment.lower().find(make.lower())
+        if position == -1:
+            continue
+        model = segment[position + len(make):]
+        model = _TITLE_NOISE.sub('', model)
+        model = re.sub(r"^\s*(?:\d{4}\s+)?", '', model)  # leading model year
+        model = model.strip(" :,-–—()")
+        if model and len(model) <= 40:
+            return model
+    return None
+
+
+def extract_specs_fast(text: str, make: Optional[str] = None, title: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Extracts one boat's specs from labelled values without calling Claude.
+    Returns a one-element list in extract_specs() format when the page gives a single,
+    plausible length and max HP and a model name can be read from the title (or the
+    first line of text); otherwise None so the caller can fall back to Claude.
+    """
+    if not make or not text:
+        return None
+
+    lengths = parse_length_ft(text)
+    hps = parse_max_hp(text)
+    if len(lengths) != 1 or len(hps) != 1:
+        return None
+    length_ft, max_hp = lengths.pop(), hps.pop()
+    if not (LENGTH_RANGE_FT[0] <= length_ft <= LENGTH_RANGE_FT[1] and HP_RANGE[0] <= max_hp <= HP_RANGE[1]):
+        return None
+
+    model = guess_model(title or '', make) or guess_model(text.split('\n', 1)[0][:200], make)
+    if not model:
+        return None
+
+    boat = {'make': make, 'model': model, 'length_ft': length_ft, 'max_hp': max_hp}
+    weights = parse_dry_weight_lbs(text)
+    if len(weights) == 1:
+        boat['dry_weight_lbs'] = weights.pop()
+    beams = parse_beam_inches(text)
+    if len(beams) == 1:
+        boat['beam_inches'] = beams.pop()
+    return [boat]
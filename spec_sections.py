@@ -0,0 +1,102 @@
+"""
+Spec-dense section selection ahead of Claude extraction.
+
+extract_specs() only sends the first 4000 characters of a page, and on long
+pages the spec table is often past that cutoff. select_spec_blocks() scores
+each block of page text (tables, definition lists, paragraphs...) by how
+densely it mentions lengths, horsepower, beam and weight, and keeps the
+best-scoring blocks that fit a token budget, in document order. The returned
+SpecSelection records which blocks were chosen.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from html_text import TextBlock
+
+# Rough chars-per-token ratio used to turn a token budget into characters
+CHARS_PER_TOKEN = 4
+
+# (pattern, weight) pairs for spec mentions
+SPEC_PATTERNS: Tuple[Tuple["re.Pattern", float], ...] = (
+    # 13'6", 13' 6", 13’6”
+    (re.compile(r"\b\d{1,2}\s*['’′]\s*\d{1,2}(?:\.\d+)?\s*(?:\"|''|”|″)"), 3.0),
+    # 13 ft 6 in, 13.5 ft, 13 feet
+    (re.compile(r"\b\d{1,2}(?:\.\d+)?\s*(?:ft\.?|feet|foot)\b", re.I), 2.0),
+    # 40 HP, 40hp, 40 horsepower
+    (re.compile(r"\b\d{1,3}\s*(?:hp|h\.p\.|horsepower)\b", re.I), 3.0),
+    (re.compile(r"\b(?:loa|length overall|overall length|hull length|length)\b", re.I), 2.0),
+    (re.compile(r"\b(?:max(?:imum)?\.?\s*(?:hp|horsepower|power)|hp rating|power rating)\b", re.I), 2.0),
+    (re.compile(r"\bbeam\b", re.I), 1.5),
+    (re.compile(r"\b(?:dry\s+)?weight\b", re.I), 1.0),
+    (re.compile(r"\b\d[\d,]*\s*(?:lbs?\.?|pounds)\b", re.I), 1.0),
+    (re.compile(r"\b\d{2,3}(?:\.\d+)?\s*(?:in\.?|inches|\")(?=\W|$)", re.I), 1.0),
+)
+
+# Structured blocks are more likely to be spec sheets than prose
+KIND_BONUS = {'table': 1.5, 'dl': 1.5, 'ul': 1.1, 'ol': 1.1}
+
+# Short blocks are scored as if they were this long, so a lone "LOA" cell cannot dominate
+MIN_SCORED_LENGTH = 80
+
+# Kinds kept first when they fit, since they usually name the make and model
+HEADING_KINDS = ('title', 'h1')
+
+
+def score_block(block: TextBlock) -> float:
+    """Weighted spec mentions per 100 characters of block text."""
+    hits = sum(weight * len(pattern.findall(block.text)) for pattern, weight in SPEC_PATTERNS)
+    if not hits:
+        return 0.0
+    density = hits * 100.0 / max(len(block.text), MIN_SCORED_LENGTH)
+    return density * KIND_BONUS.get(block.kind, 1.0)
+
+
+@dataclass
+class SpecSelection:
+    """The text chosen for extraction and which blocks it came from."""
+    text: str
+    chosen: List[int] = field(default_factory=list)   # block indices, in document order
+    scores: List[float] = field(default_factory=list)  # score for every block
+    fallback: bool = False  # True if no block looked like specs and the page start was used
+
+
+def select_spec_blocks(blocks: Sequence[TextBlock], token_budget: int = 1000) -> SpecSelection:
+    """
+    Picks the most spec-dense blocks that fit in token_budget.
+    The page title/first heading is kept when it fits so the model can name the boat.
+    Pages with no spec-like block fall back to their leading text.
+    """
+    char_budget = token_budget * CHARS_PER_TOKEN
+    scores = [score_block(block) for block in blocks]
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+    if not ranked:
+        text = ' '.join(block.text for block in blocks)[:char_budget]
+        return SpecSelection(text=text, scores=scores, fallback=True)
+
+    texts = {}
+    used = 0
+
+    def take(index: int, text: str) -> bool:
+        nonlocal used
+        if used + len(text) + 1 > char_budget:
+            return False
+        texts[index] = text
+        used += len(text) + 1
+        return True
+
+    for kind in HEADING_KINDS:
+        heading = next((i for i, block in enumerate(blocks) if block.kind == kind), None)
+        if heading is not None and heading not in texts:
+            take(heading, blocks[heading].text)
+    for index in ranked:
+        if index not in texts:
+            take(index, blocks[index].text)
+    if not any(scores[i] for i in texts):
+        # The best block alone is over budget: send as much of it as fits
+        best = ranked[0]
+        take(best, blocks[best].text[:max(char_budget - used - 1, 0)])
+
+    chosen = sorted(texts)
+    return SpecSelection(text='\n'.join(texts[i] for i in chosen), chosen=chosen, scores=scores)
@@ -0,0 +1,171 @@
+"""
+Unit tests for batch spec extraction
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import search_boats
+from batch_extract import AnthropicBatchBackend, BatchBackend, FakeBatchBackend, run_batch_extraction
+from extraction_cache import ExtractionCache, configure_extraction_cache
+from llm_usage import UsageTracker, configure_usage_tracker
+from metrics import configure_metrics
+
+
+def responder(params):
+    prompt = params['messages'][0]['content']
+    if "broken" in prompt:
+        return None
+    if "Whaler" in prompt:
+        return json.dumps([{'make': 'Boston Whaler', 'model': '130 Sport', 'length_ft': 13.5, 'max_hp': 40}])
+    return "[]"
+
+
+class TestRunBatchExtraction(unittest.TestCase):
+    """Test batching, polling and result mapping"""
+
+    def tearDown(self):
+        configure_extraction_cache(None)
+        configure_usage_tracker(None)
+        configure_metrics()
+
+    def test_results_map_back_to_urls(self):
+        """Test that every URL gets its own result and failed requests are left out"""
+        backend = FakeBatchBackend(responder, polls_until_done=3)
+        pages = [
+            ("https://a.example.com", "Boston Whaler 130 Sport"),
+            ("https://b.example.com", "Nothing to see"),
+            ("https://c.example.com", "broken page"),
+        ]
+
+        results = run_batch_extraction(pages, backend, poll_interval=0)
+
+        self.assertEqual(results["https://a.example.com"][0]['model'], '130 Sport')
+        self.assertEqual(results["https://b.example.com"], [])
+        self.assertNotIn("https://c.example.com", results)
+        self.assertEqual(len(backend.batches), 1)
+
+    def test_identical_text_submitted_once(self):
+        """Test that mirror pages share one batch request"""
+        backend = FakeBatchBackend(responder)
+        pages = [("https://a.example.com", "Boston Whaler"), ("https://mirror.example.com", "Boston Whaler")]
+
+        results = run_batch_extraction(pages, backend, poll_interval=0)
+
+        self.assertEqual(len(backend.batches["fake_batch_1"]), 1)
+        self.assertEqual(results["https://a.example.com"], results["https://mirror.example.com"])
+
+    def test_cached_pages_are_not_submitted(self):
+        """Test that the extraction cache is consulted and filled"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = configure_extraction_cache(ExtractionCache(os.path.join(tmpdir, 'cache.db')))
+            backend = FakeBatchBackend(responder)
+
+            run_batch_extraction([("https://a.example.com", "Boston Whaler")], backend, poll_interval=0)
+            run_batch_extraction([("https://a.example.com", "Boston Whaler")], backend, poll_interval=0)
+
+            self.assertEqual(len(backend.batches), 1)
+            self.assertEqual(cache.hits, 1)
+            configure_extraction_cache(None)
+
+
+    def test_usage_is_recorded(self):
+        """Test that each result's tokens reach the tracker, llm_usage and the metrics"""
+        metrics = configure_metrics()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repository = search_boats.BoatRepository(os.path.join(tmpdir, 'boats.db'))
+            repository.init_schema()
+            tracker = configure_usage_tracker(UsageTracker(repository, run_id='run1'))
+            backend = FakeBatchBackend(responder)
+
+            run_batch_extraction([("https://a.example.com/1", "Boston Whaler"),
+                                  ("https://c.example.com/1", "broken")], backend, poll_interval=0,
+                                 makes={"https://a.example.com/1": "Boston Whaler"})
+
+            rows = repository.llm_usage_summary('make')
+            repository.close()
+        self.assertEqual(tracker.calls, 1)
+        self.assertGreater(tracker.input_tokens, 0)
+        self.assertEqual([row['make'] for row in rows], ['Boston Whaler'])
+        self.assertEqual(metrics.counter('llm_requests_total', model=search_boats.EXTRACTION_MODEL), 2)
+        self.assertEqual(metrics.counter('llm_input_tokens_total', model=search_boats.EXTRACTION_MODEL),
+                         tracker.input_tokens)
+
+    def test_budget_limits_submitted_pages(self):
+        """Test that the estimated batch cost is checked against the budget before submitting"""
+        tracker = configure_usage_tracker(UsageTracker(budget_usd=0.0015))
+        backend = FakeBatchBackend(responder)
+        pages = [(f"https://example.com/{i}", f"Boston Whaler page {i}") for i in range(5)]
+
+        results = run_batch_extraction(pages, backend, poll_interval=0)
+
+        # About $0.0007 per request at the batch price with max_tokens output: two fit
+        self.assertEqual(len(backend.batches["fake_batch_1"]), 2)
+        self.assertEqual(tracker.refused, 3)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(sum(1 for boats in results.values() if boats), 2)
+        self.assertLess(tracker.cost_usd, 0.0015)
+
+
+class TestCrawlBatch(unittest.TestCase):
+    """Test that crawl_batch leaves failed batch requests unfinished"""
+
+    def test_failed_pages_are_not_finished(self):
+        pages = [search_boats.CrawlPage("https://a.example.com/1", "Boston Whaler 130", "Boston Whaler", "A"),
+                 search_boats.CrawlPage("https://c.example.com/1", "broken page", "Boston Whaler", "C")]
+        frontier = Mock()
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch('search_boats.DB_FILE', os.path.join(tmpdir, 'boats.db')), \
+                patch('search_boats.new_run_frontier', return_value=frontier), \
+                patch('search_boats.iter_pages', return_value=iter(pages)), \
+                patch('search_boats.get_client'), \
+                patch('batch_extract.AnthropicBatchBackend', return_value=FakeBatchBackend(responder)), \
+                patch('search_boats.finish_page') as finish_page:
+            search_boats.init_database()
+            new, _ = search_boats.crawl_batch(["Boston Whaler"], poll_interval=0)
+            search_boats.get_repository().close()
+
+        self.assertEqual(new, 1)
+        self.assertEqual([c.args[0].url for c in finish_page.call_args_list], ["https://a.example.com/1"])
+        frontier.mark_failed.assert_called_once_with("https://c.example.com/1", "batch request failed")
+
+
+class TestAnthropicBatchBackend(unittest.TestCase):
+    """Test the adapter around client.messages.batches"""
+
+    def test_backend_reads_succeeded_and_errored_results(self):
+        """Test that non-succeeded results come back as None"""
+        client = Mock()
+        client.messages.batches.create.return_value = Mock(id="msgbatch_1")
+        client.messages.batches.retrieve.return_value = Mock(processing_status="ended")
+        ok = Mock(custom_id="page-1")
+        ok.result.type = "succeeded"
+        ok.result.message.content = [Mock(text="[]")]
+        ok.result.message.usage = Mock(input_tokens=900, output_tokens=5)
+        failed = Mock(custom_id="page-2")
+        failed.result.type = "errored"
+        client.messages.batches.results.return_value = [ok, failed]
+        backend = AnthropicBatchBackend(client)
+
+        batch_id = backend.submit([])
+
+        self.assertTrue(backend.is_done(batch_id))
+        self.assertEqual(list(backend.results(batch_id)),
+                         [("page-1", "[]", ok.result.message.usage), ("page-2", None, None)])
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing part of the interface fails at construction"""
+        class SubmitOnly(BatchBackend):
+            def submit(self, requests):
+                return "msgbatch_1"
+
+        with self.assertRaises(TypeError):
+            SubmitOnly()
+        with self.assertRaises(TypeError):
+            BatchBackend()
+
+
+if __name__ == '__main__':
+    unittest.main()
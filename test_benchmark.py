@@ -0,0 +1,56 @@
+"""
+Unit tests for the offline benchmark harness
+"""
+import unittest
+
+import benchmark
+import search_boats
+
+
+class TestPercentile(unittest.TestCase):
+    """Test nearest-rank percentiles"""
+
+    def test_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(benchmark.percentile(values, 50), 50.0)
+        self.assertEqual(benchmark.percentile(values, 95), 95.0)
+        self.assertEqual(benchmark.percentile([3.0], 95), 3.0)
+        self.assertEqual(benchmark.percentile([], 50), 0.0)
+
+
+class TestRunBenchmark(unittest.TestCase):
+    """Test offline runs against the recorded and synthetic corpora"""
+
+    def setUp(self):
+        self.db_file = search_boats.DB_FILE
+        self.client = search_boats.client
+
+    def assertValidReport(self, report):
+        self.assertGreater(report.pages, 0)
+        self.assertGreaterEqual(report.new_boats + report.updated_boats, 1)
+        self.assertEqual(set(report.stages), set(benchmark.STAGES))
+        for stage in report.stages.values():
+            self.assertGreaterEqual(stage['p95'], stage['p50'])
+        # Globals are restored afterwards
+        self.assertEqual(search_boats.DB_FILE, self.db_file)
+        self.assertIs(search_boats.client, self.client)
+
+    def test_recorded_corpus_sequential(self):
+        report = benchmark.run_benchmark(benchmark.load_corpus(), 'sequential')
+        self.assertValidReport(report)
+        # The forum thread shared by two manufacturers is fetched once
+        self.assertEqual(report.pages, 8)
+        self.assertEqual(report.stages['queries']['count'], 3)
+
+    def test_synthetic_corpus_pipeline(self):
+        corpus = benchmark.synthetic_corpus(manufacturers=3)
+        report = benchmark.run_benchmark(corpus, 'pipeline')
+        self.assertValidReport(report)
+        # Top three results per search: the shared forum thread and two model pages per make
+        self.assertEqual(report.pages, 7)
+        # Spec sheets are answered by the rule-based fast path
+        self.assertLess(report.llm_calls, report.pages + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for the columnar boat catalog
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import search_boats
+from catalog import BoatCatalog, FilterCriteria
+
+MODELS = ["Super Sport", "130 Super Sport", "Sport", "JVX 13", "JVX", "Dory", "Skiff 13", "13 Skiff", "Alaskan"]
+
+
+def random_boats(rng, count):
+    return [{'make': rng.choice(["Lund", "lund", "Whaler", "Boston Whaler"]),
+             'model': rng.choice(MODELS),
+             'length_ft': rng.choice([12.9, 13.0, 13.4, 13.5, 13.9, 14.0, 14.1, rng.uniform(12, 15)]),
+             'max_hp': rng.choice([30, 40, 60])} for _ in range(count)]
+
+
+def keys(boats):
+    return [(boat['make'], boat['model'], boat['length_ft']) for boat in boats]
+
+
+class TestFiltering(unittest.TestCase):
+    """Test vectorized range filtering"""
+
+    def test_select_matches_filter_boats(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            boats = random_boats(rng, rng.randint(0, 40))
+            boats.append({'make': 'Bad', 'model': 'Text', 'length_ft': 'thirteen', 'max_hp': 40})
+            boats.append({'make': 'Bad', 'model': 'NoHP', 'length_ft': 13.5})
+            self.assertEqual(keys(BoatCatalog.from_records(boats).select().to_records()),
+                             keys(search_boats.filter_boats([dict(b) for b in boats])))
+
+    def test_parameterized_criteria(self):
+        boats = [
+            {'make': 'A', 'model': 'One', 'length_ft': 12.0, 'max_hp': 25, 'dry_weight_lbs': 300},
+            {'make': 'B', 'model': 'Two', 'length_ft': 13.5, 'max_hp': 40, 'dry_weight_lbs': 500},
+            {'make': 'C', 'model': 'Three', 'length_ft': 16.0, 'max_hp': 90},
+        ]
+        catalog = BoatCatalog.from_records(boats)
+        self.assertEqual(len(catalog.filter()), 1)
+        self.assertEqual(len(catalog.filter(min_length=11, max_length=17, min_hp=None)), 3)
+        # A missing weight fails a weight bound
+        light = catalog.filter(FilterCriteria(min_length=None, max_length=None, min_hp=None, max_weight=400))
+        self.assertEqual([boat['model'] for boat in light.to_records()], ['One'])
+        self.assertEqual(search_boats.filter_boats(boats, min_length=11, max_length=17, min_hp=20), boats)
+
+
+class TestDedupe(unittest.TestCase):
+    """Test group-by-make fuzzy dedupe"""
+
+    def test_dedupe_matches_is_duplicate_boat(self):
+        rng = random.Random(11)
+        for _ in range(50):
+            boats = random_boats(rng, rng.randint(0, 40))
+            kept = []
+            for boat in boats:
+                if not search_boats.is_duplicate_boat(boat, kept):
+                    kept.append(boat)
+            self.assertEqual(keys(BoatCatalog.from_records(boats).dedupe().to_records()), keys(kept))
+
+    def test_dedupe_tolerance(self):
+        boats = [{'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40},
+                 {'make': 'LUND', 'model': 'WC-14 Deluxe', 'length_ft': 14.0, 'max_hp': 40},
+                 {'make': 'Lund', 'model': 'WC-14', 'length_ft': 16.0, 'max_hp': 40}]
+        catalog = BoatCatalog.from_records(boats)
+        self.assertEqual(len(catalog.dedupe()), 2)
+        self.assertEqual(len(catalog.dedupe(length_tolerance=0.1)), 3)
+
+
+class TestMerge(unittest.TestCase):
+    """Test bulk merging"""
+
+    def test_merge_follows_merge_boat_data(self):
+        existing = [{'make': 'Boston Whaler', 'model': 'Super Sport', 'length_ft': 13.4, 'max_hp': 40,
+                     'dry_weight_lbs': None, 'beam_inches': 62},
+                    {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40,
+                     'dry_weight_lbs': 0, 'beam_inches': None}]
+        new = [{'make': 'boston whaler', 'model': '130 Super Sport', 'length_ft': 13.4, 'max_hp': 60,
+                'dry_weight_lbs': 920, 'beam_inches': 60},
+               {'make': 'Lund', 'model': 'WC-14', 'dry_weight_lbs': 280},
+               {'make': 'Gheenoe', 'model': 'Classic', 'length_ft': 13.3, 'max_hp': 25}]
+        merged = BoatCatalog.from_records(existing).merge(BoatCatalog.from_records(new)).to_records()
+
+        expected = [search_boats.merge_boat_data(old, update) for old, update in zip(existing, new)]
+        for record, want in zip(merged, expected):
+            for field in ('make', 'model', 'length_ft', 'max_hp', 'dry_weight_lbs', 'beam_inches'):
+                self.assertEqual(record[field], want[field], field)
+        self.assertEqual(len(merged), 3)
+        self.assertEqual(merged[2]['make'], 'Gheenoe')
+
+
+class TestFromDb(unittest.TestCase):
+    """Test loading from boats.db"""
+
+    def test_from_db(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repository = search_boats.BoatRepository(os.path.join(tmpdir, 'boats.db'))
+            repository.init_schema()
+            repository.upsert({'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40})
+            repository.upsert({'make': 'Lund', 'model': 'SSV-10', 'length_ft': 10.0, 'max_hp': 8})
+            repository.close()
+            catalog = BoatCatalog.from_db(os.path.join(tmpdir, 'boats.db'))
+        self.assertEqual(len(catalog), 2)
+        record = catalog.select().to_records()[0]
+        self.assertEqual((record['model'], record['max_hp'], record['beam_inches']), ('WC-14', 40, None))
+        self.assertIsInstance(record['id'], int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit tests for the crawl frontier
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from crawl_frontier import (PRIORITY_AGGREGATOR, PRIORITY_FORUM, PRIORITY_MANUFACTURER, PRIORITY_OTHER,
+                            CrawlFrontier, canonicalize_url, url_priority)
+
+
+class TestCanonicalizeUrl(unittest.TestCase):
+    """Test URL canonicalization"""
+
+    def test_strips_tracking_parameters(self):
+        self.assertEqual(
+            canonicalize_url("https://Example.com/boats/?utm_source=x&id=3&gclid=abc&fbclid=z#specs"),
+            "https://example.com/boats?id=3")
+
+    def test_keeps_meaningful_parameters_sorted(self):
+        self.assertEqual(canonicalize_url("https://example.com/p?b=2&a=1"),
+                         canonicalize_url("https://example.com/p?a=1&b=2&utm_medium=email"))
+
+
+class TestUrlPriority(unittest.TestCase):
+    """Test fetch scheduling priorities"""
+
+    def test_priorities(self):
+        self.assertEqual(url_priority("https://www.bostonwhaler.com/130", "Boston Whaler"), PRIORITY_MANUFACTURER)
+        self.assertEqual(url_priority("https://www.boattest.com/review/1", "Boston Whaler"), PRIORITY_AGGREGATOR)
+        self.assertEqual(url_priority("https://www.thehulltruth.com/t/1", "Boston Whaler"), PRIORITY_FORUM)
+        self.assertEqual(url_priority("https://example.com/forums/whaler", "Boston Whaler"), PRIORITY_FORUM)
+        self.assertEqual(url_priority("https://example.com/blog/whaler", "Boston Whaler"), PRIORITY_OTHER)
+
+
+class TestCrawlFrontier(unittest.TestCase):
+    """Test deduplication and draining"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'frontier.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dedupes_variants_within_run(self):
+        frontier = CrawlFrontier(self.path)
+
+        self.assertTrue(frontier.add("https://example.com/review?utm_source=a", "Alpha"))
+        self.assertFalse(frontier.add("https://example.com/review/", "Beta"))
+        self.assertEqual([entry.url for entry in frontier.drain()], ["https://example.com/review"])
+        self.assertEqual(frontier.duplicates, 1)
+        frontier.close()
+
+    def test_drains_in_priority_order(self):
+        frontier = CrawlFrontier(self.path)
+        frontier.add("https://thehulltruth.com/t/1", "Lund")
+        frontier.add("https://example.com/lund", "Lund")
+        frontier.add("https://boats.com/lund-wc14", "Lund")
+        frontier.add("https://www.lundboats.com/wc-14", "Lund")
+
+        self.assertEqual([entry.url for entry in frontier.drain()], [
+            "https://www.lundboats.com/wc-14", "https://boats.com/lund-wc14",
+            "https://example.com/lund", "https://thehulltruth.com/t/1"])
+        frontier.close()
+
+    def test_skips_pages_fetched_by_recent_run(self):
+        first = CrawlFrontier(self.path)
+        first.add("https://example.com/a", "Alpha")
+        first.add("https://example.com/b", "Alpha")
+        fetched, failed = list(first.drain())
+        first.mark_fetched(fetched.url)
+        first.mark_failed(failed.url, "timeout")
+        first.close()
+
+        second = CrawlFrontier(self.path)
+        self.assertFalse(second.add("https://example.com/a", "Alpha"))
+        self.assertTrue(second.add("https://example.com/b", "Alpha"))
+        self.assertEqual(second.skipped, 1)
+        second.close()
+
+        third = CrawlFrontier(self.path, revisit_seconds=0)
+        self.assertTrue(third.add("https://example.com/a", "Alpha"))
+        third.close()
+
+    def test_gives_up_after_max_attempts(self):
+        for _ in range(2):
+            frontier = CrawlFrontier(self.path, max_attempts=2)
+            frontier.add("https://example.com/broken", "Alpha")
+            for entry in frontier.drain():
+                frontier.mark_failed(entry.url)
+            frontier.close()
+
+        frontier = CrawlFrontier(self.path, max_attempts=2)
+        self.assertFalse(frontier.add("https://example.com/broken", "Alpha"))
+        frontier.close()
+
+    def test_successes_do_not_count_as_attempts(self):
+        for _ in range(3):
+            frontier = CrawlFrontier(self.path, max_attempts=2, revisit_seconds=0)
+            self.assertTrue(frontier.add("https://example.com/flaky", "Alpha"))
+            for entry in frontier.drain():
+                frontier.mark_fetched(entry.url)
+            frontier.close()
+
+        frontier = CrawlFrontier(self.path, max_attempts=2, revisit_seconds=0)
+        frontier.add("https://example.com/flaky", "Alpha")
+        for entry in frontier.drain():
+            frontier.mark_failed(entry.url, "timeout")
+        frontier.close()
+
+        # One failure after several successes is still retried
+        frontier = CrawlFrontier(self.path, max_attempts=2)
+        self.assertTrue(frontier.add("https://example.com/flaky", "Alpha"))
+        frontier.close()
+
+    def test_unfinished_claims_are_requeued(self):
+        frontier = CrawlFrontier(self.path)
+        frontier.add("https://example.com/a", "Alpha")
+        frontier.pop()
+        frontier.close()
+
+        reopened = CrawlFrontier(self.path)
+        row = reopened._conn.execute("SELECT status FROM frontier").fetchone()
+        self.assertEqual(row[0], 'pending')
+        reopened.close()
+
+
+class TestIterPages(unittest.TestCase):
+    """Test the search-then-fetch crawl loop"""
+
+    @patch('search_boats.fetch_webpage', side_effect=lambda url: f"page {url}")
+    @patch('search_boats.search_web', return_value=[
+        {'url': "https://forum.example.com/thread?utm_source=brave", 'title': "Forum"},
+        {'url': "https://boattest.com/review", 'title': "Review"}])
+    @patch('search_boats.generate_search_queries', side_effect=lambda make: [f"{make} specs"])
+    def test_shared_urls_fetched_once(self, mock_queries, mock_search, mock_fetch):
+        """Test that two manufacturers finding the same pages fetch each one once"""
+        pages = list(search_boats.iter_pages(["Alpha", "Beta"], CrawlFrontier()))
+
+        self.assertEqual(mock_search.call_count, 2)
+        self.assertEqual([page.url for page in pages],
+                         ["https://boattest.com/review", "https://forum.example.com/thread"])
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
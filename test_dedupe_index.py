@@ -0,0 +1,157 @@
+"""
+Unit tests for the indexed duplicate lookup
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+
+from dedupe_index import DuplicateIndex, normalize_model_name, substrings, trigrams
+from search_boats import BoatRepository, is_duplicate_boat
+
+MAKES = ["Boston Whaler", "boston whaler", "Carolina Skiff", "Lund"]
+WORDS = ["sport", "super", "jvx", "13", "dlx", "sc", "", "v", "classic"]
+
+
+def random_boat(rng):
+    words = rng.sample(WORDS, rng.randint(1, 3))
+    prefix = rng.choice(["", "130 ", "13"])
+    return {
+        'make': rng.choice(MAKES),
+        'model': prefix + " ".join(words),
+        'length_ft': rng.choice([13.0, 13.4, 13.5, 13.9, 14.5, 0]),
+        'max_hp': 40,
+    }
+
+
+def scan_find_duplicate(db_file, boat_data, length_tolerance=0.5):
+    """The original linear-scan lookup, kept as the reference behavior."""
+    conn = sqlite3.connect(db_file)
+    new_make = boat_data.get('make', '').lower()
+    new_model_norm = normalize_model_name(boat_data.get('model', ''))
+    new_length = float(boat_data.get('length_ft', 0))
+    rows = conn.execute('SELECT id, make, model, length_ft FROM boats WHERE LOWER(make) = ?',
+                        (new_make,)).fetchall()
+    conn.close()
+    for existing_id, existing_make, existing_model, existing_length in rows:
+        existing_model_norm = normalize_model_name(existing_model)
+        if existing_length and abs(new_length - existing_length) > length_tolerance:
+            continue
+        if (new_model_norm == existing_model_norm or
+                new_model_norm in existing_model_norm or
+                existing_model_norm in new_model_norm):
+            return existing_id
+    return None
+
+
+def scan_is_duplicate(new_boat, seen_boats, length_tolerance=0.5):
+    """The original linear-scan is_duplicate_boat, kept as the reference behavior."""
+    new_make = new_boat.get('make', '').lower()
+    new_model_norm = normalize_model_name(new_boat.get('model', ''))
+    new_length = float(new_boat.get('length_ft', 0))
+    for seen in seen_boats:
+        seen_model_norm = normalize_model_name(seen.get('model', ''))
+        if new_make != seen.get('make', '').lower():
+            continue
+        if abs(new_length - float(seen.get('length_ft', 0))) > length_tolerance:
+            continue
+        if (new_model_norm == seen_model_norm or
+                new_model_norm in seen_model_norm or
+                seen_model_norm in new_model_norm):
+            return True
+    return False
+
+
+class TestHelpers(unittest.TestCase):
+    """Test trigram and substring helpers"""
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams("jvx 13"), {"jvx", "vx ", "x 1", " 13"})
+        self.assertEqual(trigrams("sc"), set())
+
+    def test_substrings_include_empty_and_self(self):
+        subs = substrings("abc")
+        self.assertIn("", subs)
+        self.assertIn("abc", subs)
+        self.assertEqual(len(subs), 7)
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    """Test that is_duplicate_boat's in-memory index agrees with a linear scan"""
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        seen, index = [], DuplicateIndex()
+        for _ in range(400):
+            boat = random_boat(rng)
+            expected = scan_is_duplicate(boat, seen)
+            self.assertEqual(is_duplicate_boat(boat, index), expected, boat)
+            self.assertEqual(is_duplicate_boat(boat, seen), expected, boat)
+            if rng.random() < 0.5:
+                seen.append(boat)
+                index.add(boat)
+        self.assertEqual(len(index), len(seen))
+
+    def test_index_tolerance(self):
+        index = DuplicateIndex(length_tolerance=1.0, boats=[{'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.0}])
+        self.assertTrue(is_duplicate_boat({'make': 'lund', 'model': '14 WC-14 Deluxe', 'length_ft': 14.0}, index))
+        self.assertFalse(is_duplicate_boat({'make': 'Lund', 'model': 'WC-14', 'length_ft': 14.5}, index))
+
+
+class TestIndexedFindDuplicate(unittest.TestCase):
+    """Test that the indexed DB lookup agrees with the original scan"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmpdir.name, 'boats.db')
+        self.repo = BoatRepository(self.db_file)
+        self.repo.init_schema()
+
+    def tearDown(self):
+        self.repo.close()
+        self.tmpdir.cleanup()
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            boat = random_boat(rng)
+            found = self.repo.find_duplicate(boat)
+            self.assertEqual(found['id'] if found else None, scan_find_duplicate(self.db_file, boat), boat)
+            if rng.random() < 0.6:
+                self.repo.upsert(boat)
+
+    def test_length_window_edges(self):
+        """Test that the SQL length window keeps matches exactly at the tolerance"""
+        self.repo.upsert({'make': 'Lund', 'model': 'WC', 'length_ft': 13.25, 'max_hp': 40})
+        self.repo.upsert({'make': 'Lund', 'model': 'SSV', 'length_ft': 12.8, 'max_hp': 40})
+        self.repo.upsert({'make': 'Lund', 'model': 'Fury', 'length_ft': None, 'max_hp': 40})
+        for boat in ({'make': 'Lund', 'model': 'WC', 'length_ft': 13.75},
+                     {'make': 'Lund', 'model': 'SSV', 'length_ft': 13.3},
+                     {'make': 'Lund', 'model': 'SSV', 'length_ft': 12.3},
+                     {'make': 'Lund', 'model': 'Fury', 'length_ft': 20}):
+            found = self.repo.find_duplicate(boat)
+            self.assertEqual(found['id'] if found else None, scan_find_duplicate(self.db_file, boat), boat)
+
+    def test_renamed_boat_is_reindexed(self):
+        """Test that update_by_id keeps the index in sync with the new model name"""
+        self.repo.upsert({'make': 'Lund', 'model': 'WC', 'length_ft': 13.5, 'max_hp': 40})
+        boat_id = self.repo.find_duplicate({'make': 'Lund', 'model': 'WC', 'length_ft': 13.5})['id']
+        self.repo.update_by_id(boat_id, {'model': 'WC Deluxe Tiller'})
+
+        found = self.repo.find_duplicate({'make': 'Lund', 'model': 'Deluxe', 'length_ft': 13.5})
+        self.assertEqual(found['model'], 'WC Deluxe Tiller')
+
+    def test_rows_written_outside_repository_are_indexed(self):
+        """Test that rows inserted by other tools are picked up by the lookup"""
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("INSERT INTO boats (make, model, length_ft, max_hp) VALUES ('Gheenoe', 'Classic', 13.3, 40)")
+        conn.commit()
+        conn.close()
+
+        found = self.repo.find_duplicate({'make': 'Gheenoe', 'model': 'Classic 13', 'length_ft': 13.3})
+        self.assertEqual(found['model'], 'Classic')
+
+
+if __name__ == '__main__':
+    unittest.main()
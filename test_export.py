@@ -0,0 +1,138 @@
+"""Tests for export.py"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import search_boats
+from export import COLUMNS, export_boats, normalize_since, read_rows
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+BOATS = [
+    {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40, 'dry_weight_lbs': 300},
+    {'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.4, 'max_hp': 60},
+    {'make': 'Boston Whaler', 'model': '110 Sport', 'length_ft': 11.0, 'max_hp': 15},
+]
+
+
+def make_db(path, boats, updated_at=None):
+    repository = search_boats.BoatRepository(path)
+    repository.init_schema()
+    repository.upsert_many([dict(boat) for boat in boats])
+    for model, timestamp in (updated_at or {}).items():
+        repository.conn.execute('UPDATE boats SET updated_at = ? WHERE model = ?', (timestamp, model))
+    repository.conn.commit()
+    repository.close()
+
+
+class TestExport(unittest.TestCase):
+    """Test streaming exports"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmpdir.name, 'boats.db')
+        make_db(self.db_file, BOATS, {'WC-14': '2026-10-01 08:00:00', '130 Super Sport': '2026-10-02 09:30:00',
+                                      '110 Sport': '2026-09-15 12:00:00'})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_csv_columns_and_bounds(self):
+        result = export_boats(self.db_file, self.path('boats.csv'), columns=['make', 'model', 'max_hp'],
+                              min_length=13, chunk_size=1)
+        self.assertEqual((result.format, result.rows, result.chunks), ('csv', 2, 2))
+        with open(self.path('boats.csv'), newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [['make', 'model', 'max_hp'], ['Lund', 'WC-14', '40'],
+                                ['Boston Whaler', '130 Super Sport', '60']])
+        self.assertFalse(os.path.exists(self.path('boats.csv.tmp')))
+
+    def test_jsonl_round_trip(self):
+        result = export_boats(self.db_file, self.path('boats.jsonl'), make='boston whaler')
+        rows = list(read_rows(self.path('boats.jsonl')))
+        self.assertEqual(result.rows, 2)
+        self.assertEqual(list(rows[0]), COLUMNS)
+        self.assertEqual([row['model'] for row in rows], ['130 Super Sport', '110 Sport'])
+        self.assertIsNone(rows[0]['dry_weight_lbs'])
+
+    def test_since_and_watermark(self):
+        result = export_boats(self.db_file, self.path('changed.jsonl'), since='2026-10-01T08:00:00Z')
+        self.assertEqual([row['model'] for row in read_rows(self.path('changed.jsonl'))],
+                         ['WC-14', '130 Super Sport'])
+        self.assertEqual(result.watermark, '2026-10-02 09:30:00')
+        # Offsets are converted to UTC
+        self.assertEqual(normalize_since('2026-10-02T11:30:00+02:00'), '2026-10-02 09:30:00')
+        result = export_boats(self.db_file, self.path('none.csv'), since='2026-10-03')
+        self.assertEqual((result.rows, result.watermark), (0, None))
+
+    def test_invalid_request_leaves_no_file(self):
+        with self.assertRaises(ValueError):
+            export_boats(self.db_file, self.path('bad.csv'), columns=['make', 'colour'])
+        with self.assertRaises(ValueError):
+            export_boats(self.db_file, self.path('boats.xlsx'))
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ['boats.db'])
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_row_groups(self):
+        result = export_boats(self.db_file, self.path('boats.parquet'), chunk_size=2)
+        parquet = pq.ParquetFile(self.path('boats.parquet'))
+        self.assertEqual((parquet.metadata.num_rows, parquet.num_row_groups), (3, result.chunks))
+        self.assertEqual(parquet.schema_arrow.field('max_hp').type, 'int64')
+        self.assertEqual(parquet.metadata.row_group(0).column(0).compression, 'ZSTD')
+        self.assertEqual(next(read_rows(self.path('boats.parquet')))['length_ft'], 13.75)
+
+    def test_memory_stays_flat(self):
+        big_db = self.path('big.db')
+        make_db(big_db, [{'make': f'Make {i % 50}', 'model': f'Model {i}', 'length_ft': 10 + i % 80 / 10,
+                          'max_hp': 10 + i % 200, 'source_url': f'https://example.com/boats/{i}'}
+                         for i in range(8000)])
+
+        def peak(**kwargs):
+            tracemalloc.start()
+            try:
+                export_boats(big_db, self.path('big.jsonl'), chunk_size=200, **kwargs)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, full = peak(max_hp=20), peak()
+        self.assertLess(full, small * 3)
+
+    def test_export_command(self):
+        out = io.StringIO()
+        with redirect_stdout(out), patch('sys.stderr', io.StringIO()) as err, \
+                patch('search_boats.LOG_FILE', self.path('search.log')):
+            status = search_boats.main(['export', '-', '--db', self.db_file, '--format', 'jsonl',
+                                        '--columns', 'model,length_ft', '--max-length', '12'])
+        self.assertEqual(status, 0)
+        self.assertEqual([json.loads(line) for line in out.getvalue().splitlines()],
+                         [{'model': '110 Sport', 'length_ft': 11.0}])
+        self.assertIn('Exported 1 boats', err.getvalue())
+
+
+class TestSaveToCsv(unittest.TestCase):
+    """Test the in-memory CSV writer"""
+
+    def test_writes_boats(self):
+        with tempfile.TemporaryDirectory() as tmpdir, patch('builtins.print'):
+            path = search_boats.save_to_csv(BOATS, os.path.join(tmpdir, 'results.csv'))
+            with open(path, newline='') as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row['model'] for row in rows], [boat['model'] for boat in BOATS])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the extraction result cache
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from extraction_cache import ExtractionCache, configure_extraction_cache, default_cache_path, make_cache_key
+from search_boats import EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION, extract_specs
+
+BOATS = [{'make': 'Boston Whaler', 'model': '130 Sport', 'length_ft': 13.5, 'max_hp': 40}]
+
+
+def mock_response(text):
+    response = Mock()
+    response.content = [Mock(text=text)]
+    return response
+
+
+class TestExtractionCache(unittest.TestCase):
+    """Test the ExtractionCache store"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(os.path.join(self.tmpdir.name, 'extraction_cache.db'))
+
+    def tearDown(self):
+        configure_extraction_cache(None)
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_key_depends_on_version_model_and_text(self):
+        """Test that each key component changes the key"""
+        base = make_cache_key(1, 'model-a', 'text')
+        self.assertNotEqual(base, make_cache_key(2, 'model-a', 'text'))
+        self.assertNotEqual(base, make_cache_key(1, 'model-b', 'text'))
+        self.assertNotEqual(base, make_cache_key(1, 'model-a', 'other'))
+        self.assertEqual(base, make_cache_key(1, 'model-a', '  text \n'))
+
+    def test_hit_rate_and_invalidation(self):
+        """Test hits, misses and per-version invalidation"""
+        self.assertIsNone(self.cache.get(1, 'm', 'page'))
+        self.cache.put(1, 'm', 'page', BOATS)
+        self.assertEqual(self.cache.get(1, 'm', 'page'), BOATS)
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+        self.assertEqual(self.cache.invalidate(prompt_version=1), 1)
+        self.assertIsNone(self.cache.get(1, 'm', 'page'))
+
+    def test_prune_stale_keeps_current_version(self):
+        """Test that pruning drops only other prompt versions"""
+        self.cache.put(1, 'm', 'old', BOATS)
+        self.cache.put(2, 'm', 'new', BOATS)
+
+        self.assertEqual(self.cache.prune_stale(2, 'm'), 1)
+        self.assertIsNotNone(self.cache.get(2, 'm', 'new'))
+
+    def test_default_cache_path_next_to_db(self):
+        """Test the cache file sits beside boats.db"""
+        path = default_cache_path(os.path.join(self.tmpdir.name, 'boats.db'))
+        self.assertEqual(os.path.dirname(path), self.tmpdir.name)
+
+    @patch('search_boats.client')
+    def test_extract_specs_uses_cache(self, mock_client):
+        """Test that repeated text is answered without a second API call"""
+        mock_client.messages.create.return_value = mock_response(json.dumps(BOATS))
+        configure_extraction_cache(self.cache)
+
+        first = extract_specs("Boston Whaler 130 Sport, 13'6\", 40 HP")
+        second = extract_specs("Boston Whaler 130 Sport, 13'6\", 40 HP")
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_client.messages.create.call_count, 1)
+        self.assertEqual(self.cache.get(EXTRACTION_PROMPT_VERSION, EXTRACTION_MODEL,
+                                        "Boston Whaler 130 Sport, 13'6\", 40 HP"), BOATS)
+
+    @patch('search_boats.client')
+    def test_parse_errors_are_not_cached(self, mock_client):
+        """Test that unparseable replies are retried on the next call"""
+        mock_client.messages.create.return_value = mock_response("[not json")
+        configure_extraction_cache(self.cache)
+
+        extract_specs("flaky page")
+        extract_specs("flaky page")
+
+        self.assertEqual(mock_client.messages.create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
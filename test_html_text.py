@@ -0,0 +1,83 @@
+"""
+Unit tests for streaming HTML-to-text extraction
+"""
+import unittest
+
+from html_text import StreamingTextExtractor, html_to_text, stream_text
+
+PAGE = """
+<html><head><title>Whaler 130</title><style>p { color: red; }</style></head>
+<body>
+  <header><a href="/">Home</a></header>
+  <nav><ul><li>Boats</li></ul></nav>
+  <h1>130 Super Sport</h1>
+  <table><tr><td>LOA</td><td>13&#39; 5&quot;</td></tr><tr><td>Max HP</td><td>60</td></tr></table>
+  <script>var tracking = "ignore me";</script>
+  <footer>Copyright</footer>
+</body></html>
+"""
+
+
+class TestHtmlToText(unittest.TestCase):
+    """Test visible-text extraction"""
+
+    def test_skips_ignored_elements(self):
+        """Test that scripts, styles and page chrome are dropped"""
+        text = html_to_text(PAGE)
+
+        self.assertEqual(text, "Whaler 130 130 Super Sport LOA 13' 5\" Max HP 60")
+
+    def test_chunk_boundaries_do_not_matter(self):
+        """Test that splitting tags and entities across chunks gives the same text"""
+        for size in (1, 7, 64):
+            self.assertEqual(html_to_text(PAGE, chunk_size=size), html_to_text(PAGE))
+
+    def test_truncates_to_budget(self):
+        """Test the max_chars limit"""
+        self.assertEqual(html_to_text("<p>" + "word " * 100 + "</p>", max_chars=20), "word word word word ")
+
+
+class TestStreamText(unittest.TestCase):
+    """Test incremental parsing of a byte stream"""
+
+    def test_stops_reading_once_budget_is_full(self):
+        """Test that chunks after the text budget are never pulled"""
+        consumed = []
+
+        def chunks():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"<p>paragraph {i} with some spec text</p>".encode()
+
+        result = stream_text(chunks(), 'utf-8', max_chars=200)
+
+        self.assertEqual(len(result.text), 200)
+        self.assertFalse(result.complete)
+        self.assertLess(len(consumed), 20)
+
+    def test_byte_cap(self):
+        """Test that reading stops at max_bytes even without enough text"""
+        chunks = [b"<script>" + b"x" * 1000] * 50
+        result = stream_text(iter(chunks), 'utf-8', max_bytes=4000)
+
+        self.assertLessEqual(len(result.body), 5000)
+        self.assertEqual(result.text, "")
+
+    def test_multibyte_characters_split_across_chunks(self):
+        """Test that UTF-8 sequences split between chunks decode correctly"""
+        data = "<p>Café boats</p>".encode('utf-8')
+        chunks = [data[i:i + 1] for i in range(len(data))]
+
+        self.assertEqual(stream_text(iter(chunks), 'utf-8').text, "Café boats")
+
+    def test_nested_ignored_elements(self):
+        """Test that text resumes after nested ignored elements close"""
+        extractor = StreamingTextExtractor()
+        extractor.feed("<header><nav>menu</nav>brand</header><p>body</p>")
+        extractor.close()
+
+        self.assertEqual(extractor.text, "body")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the shared HTTP client
+"""
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import HttpClient, HttpClientConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    failures_left = 0
+
+    def do_GET(self):
+        if self.path.startswith("/flaky") and _Handler.failures_left > 0:
+            _Handler.failures_left -= 1
+            status, body = 503, b"busy"
+        elif self.path.startswith("/limited") and _Handler.failures_left > 0:
+            _Handler.failures_left -= 1
+            status, body = 429, b"slow down"
+        else:
+            status, body = 200, b"<html><body>ok</body></html>"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    """Test connection reuse, retries and timeouts"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_connections_are_reused(self):
+        """Test that repeated requests to one host share a connection"""
+        client = HttpClient()
+        for _ in range(5):
+            self.assertEqual(client.get(f"{self.base}/page").status_code, 200)
+
+        stats = client.stats.as_dict()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['reused'], 4)
+        client.close()
+
+    def test_retries_on_503(self):
+        """Test that 5xx responses are retried with backoff"""
+        _Handler.failures_left = 2
+        client = HttpClient(HttpClientConfig(backoff_factor=0))
+
+        response = client.get(f"{self.base}/flaky")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.stats.requests, 3)
+        client.close()
+
+    def test_retries_on_429_outside_the_session(self):
+        """Test that 429s are retried by get() rather than the session's adapter"""
+        _Handler.failures_left = 2
+        client = HttpClient(HttpClientConfig(backoff_factor=0))
+
+        self.assertEqual(client.session.get(f"{self.base}/limited").status_code, 429)
+        self.assertEqual(client.get(f"{self.base}/limited").status_code, 200)
+        self.assertEqual(client.stats.requests, 3)
+        client.close()
+
+    def test_default_timeout_applied(self):
+        """Test that the configured timeout is used when none is passed"""
+        config = HttpClientConfig(connect_timeout=1.5, read_timeout=4.0)
+        self.assertEqual(config.timeout, (1.5, 4.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for incremental source refreshes
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from incremental import refresh_sources
+
+BOAT = {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40}
+
+
+class TestIncrementalRefresh(unittest.TestCase):
+    """Test that only stale, changed sources are re-extracted"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_patch = patch('search_boats.DB_FILE', os.path.join(self.tmpdir.name, 'boats.db'))
+        self.db_patch.start()
+        search_boats.init_database()
+        self.repository = search_boats.get_repository()
+        for i in range(3):
+            page = search_boats.CrawlPage(f"https://example.com/{i}", f"page {i}", "Lund", f"Lund {i}")
+            search_boats.persist_boats([dict(BOAT)], page.url)
+            search_boats.finish_page(page, [BOAT])
+        # Pages 0 and 1 were last fetched two days ago
+        self.repository.conn.execute(
+            "UPDATE source_pages SET last_fetched_at = datetime('now', '-2 days') WHERE url != ?",
+            ("https://example.com/2",))
+
+    def tearDown(self):
+        self.db_patch.stop()
+        self.tmpdir.cleanup()
+
+    @patch('search_boats.extract_page_boats', return_value=[dict(BOAT, dry_weight_lbs=300)])
+    @patch('search_boats.fetch_webpage', side_effect=lambda url, **_: "page 0" if url.endswith("/0") else "new text")
+    def test_refresh_only_changed_pages(self, mock_fetch, mock_extract):
+        stats = refresh_sources(max_age_hours=24)
+
+        self.assertEqual([c.args[0] for c in mock_fetch.call_args_list],
+                         ["https://example.com/0", "https://example.com/1"])
+        self.assertTrue(all(c.kwargs == {'force_revalidate': True} for c in mock_fetch.call_args_list))
+        self.assertEqual((stats.checked, stats.unchanged, stats.changed), (2, 1, 1))
+        mock_extract.assert_called_once_with("new text", "Lund", "Lund 1", "https://example.com/1")
+        self.assertEqual(stats.updated_boats, 1)
+
+        # Both re-checked pages are fresh again
+        self.assertEqual(self.repository.stale_source_pages(24), [])
+
+    @patch('search_boats.extract_page_boats')
+    @patch('search_boats.fetch_webpage', return_value=None)
+    def test_failed_fetch_is_retried_later(self, mock_fetch, mock_extract):
+        stats = refresh_sources(max_age_hours=24)
+
+        self.assertEqual(stats.failed, 2)
+        mock_extract.assert_not_called()
+        self.assertEqual(len(self.repository.stale_source_pages(24)), 2)
+
+
+class TestSourcePagesMigration(unittest.TestCase):
+    """Test that existing databases are seeded from boats.source_url"""
+
+    def test_seeded_from_boats(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'boats.db')
+            conn = sqlite3.connect(path)
+            conn.execute('''CREATE TABLE boats (id INTEGER PRIMARY KEY AUTOINCREMENT, make TEXT NOT NULL,
+                model TEXT NOT NULL, length_ft REAL, max_hp INTEGER, dry_weight_lbs INTEGER, beam_inches INTEGER,
+                source_url TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(make, model))''')
+            conn.execute("INSERT INTO boats (make, model, source_url, updated_at) "
+                         "VALUES ('Lund', 'A', 'https://x.com/a', '2020-01-01 00:00:00')")
+            conn.execute("INSERT INTO boats (make, model, source_url, updated_at) "
+                         "VALUES ('Lund', 'B', 'https://x.com/a', '2020-01-02 00:00:00')")
+            conn.commit()
+            conn.close()
+
+            repository = search_boats.BoatRepository(path)
+            repository.init_schema()
+            sources = repository.stale_source_pages(24)
+            repository.close()
+
+        self.assertEqual([(s['url'], s['make'], s['content_hash'], s['last_fetched_at']) for s in sources],
+                         [('https://x.com/a', 'Lund', None, '2020-01-02 00:00:00')])
+
+
+if __name__ == '__main__':
+    unittest.main()
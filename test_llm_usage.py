@@ -0,0 +1,127 @@
+"""
+Unit tests for Claude token accounting and budgets
+"""
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import search_boats
+from llm_usage import (PURPOSE_EXTRACT, PURPOSE_QUERIES, BudgetExceededError, UsageTracker, call_cost,
+                       configure_usage_tracker, url_domain)
+
+MODEL = "claude-3-haiku-20240307"
+
+
+def reply(text="[]", input_tokens=1000, output_tokens=100):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)],
+                           usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+
+
+class TestUsageTracker(unittest.TestCase):
+    """Test cost calculation and budget decisions"""
+
+    def test_call_cost(self):
+        self.assertAlmostEqual(call_cost(MODEL, 1_000_000, 1_000_000), 1.50)
+        self.assertEqual(call_cost("unknown-model", 1000, 1000), 0.0)
+
+    def test_url_domain(self):
+        self.assertEqual(url_domain("https://www.Whaler.com/models/130"), "whaler.com")
+        self.assertEqual(url_domain("https://forum.example.com/t/1"), "forum.example.com")
+        self.assertEqual(url_domain(None), "")
+
+    def test_no_budget_never_refuses(self):
+        tracker = UsageTracker()
+        tracker.record_call(PURPOSE_EXTRACT, MODEL, 10_000_000, 0, url="https://a.com/1")
+        tracker.check(PURPOSE_EXTRACT, "https://a.com/2")
+        self.assertEqual(tracker.refused, 0)
+
+    def test_budget_exhausted(self):
+        tracker = UsageTracker(budget_usd=0.01)
+        tracker.check(PURPOSE_QUERIES)
+        tracker.record_call(PURPOSE_QUERIES, MODEL, 40_000, 0, make="Lund")
+        with self.assertRaises(BudgetExceededError):
+            tracker.check(PURPOSE_EXTRACT, "https://lund.com/1")
+        self.assertEqual(tracker.refused, 1)
+
+    def test_near_budget_skips_low_yield_domains(self):
+        tracker = UsageTracker(budget_usd=1.0, soft_fraction=0.5, min_pages=2)
+        for i in range(2):
+            tracker.record_call(PURPOSE_EXTRACT, MODEL, 100_000, 0, url=f"https://forum.com/{i}")
+            tracker.record_page(f"https://forum.com/{i}", 0)
+        tracker.record_call(PURPOSE_EXTRACT, MODEL, 100_000, 0, url="https://lund.com/1")
+        tracker.record_page("https://lund.com/1", 2)
+        self.assertTrue(tracker.is_low_yield("forum.com"))
+        self.assertFalse(tracker.is_low_yield("lund.com"))
+        # $0.075 spent: below the soft limit everything goes ahead
+        tracker.check(PURPOSE_EXTRACT, "https://forum.com/3")
+
+        tracker.record_call(PURPOSE_EXTRACT, MODEL, 2_000_000, 0, url="https://lund.com/2")
+        with self.assertRaises(BudgetExceededError):
+            tracker.check(PURPOSE_EXTRACT, "https://forum.com/3")
+        tracker.check(PURPOSE_EXTRACT, "https://lund.com/3")
+        self.assertEqual(list(tracker.wasted_domains()), ["forum.com"])
+
+    def test_seed_from_history(self):
+        tracker = UsageTracker(budget_usd=1.0, soft_fraction=0.0, min_pages=3)
+        tracker.seed([{'domain': 'forum.com', 'pages': 5, 'tokens': 9000, 'cost_usd': 0.01, 'boats': 0}])
+        with self.assertRaises(BudgetExceededError):
+            tracker.check(PURPOSE_EXTRACT, "https://www.forum.com/9")
+
+
+class TestUsagePersistence(unittest.TestCase):
+    """Test llm_usage rows written through create_message()"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_patch = patch('search_boats.DB_FILE', os.path.join(self.tmpdir.name, 'boats.db'))
+        self.db_patch.start()
+        search_boats.init_database()
+        self.repository = search_boats.get_repository()
+        self.tracker = configure_usage_tracker(UsageTracker(self.repository, run_id="run-1"))
+
+    def tearDown(self):
+        configure_usage_tracker(None)
+        self.repository.close()
+        self.db_patch.stop()
+        self.tmpdir.cleanup()
+
+    @patch('search_boats.client')
+    def test_usage_aggregated_per_make_and_domain(self, mock_client):
+        boat = '[{"make": "Lund", "model": "WC-14", "length_ft": 13.75, "max_hp": 40}]'
+        mock_client.messages.create.side_effect = [reply('["q1"]', 200, 20), reply(boat), reply()]
+        search_boats.generate_search_queries("Lund")
+        pages = [search_boats.CrawlPage("https://www.lund.com/wc14", "WC-14 page", "Lund", "WC-14"),
+                 search_boats.CrawlPage("https://forum.com/t/1", "chatter", "Lund", "Forum")]
+        for page in pages:
+            boats = search_boats.extract_page_boats(page.content, page.make, page.title, page.url)
+            new, updated = search_boats.persist_boats(boats, page.url)
+            search_boats.finish_page(page, boats, new, updated)
+
+        self.assertEqual(self.tracker.calls, 3)
+        self.assertEqual(self.tracker.input_tokens, 2200)
+        by_make = self.repository.llm_usage_summary('make', run_id="run-1")
+        self.assertEqual(len(by_make), 1)
+        self.assertEqual((by_make[0]['make'], by_make[0]['calls'], by_make[0]['boats_found']), ("Lund", 3, 1))
+        by_purpose = {row['purpose']: row for row in self.repository.llm_usage_summary('purpose')}
+        self.assertEqual(by_purpose['queries']['input_tokens'], 200)
+        self.assertAlmostEqual(by_purpose['extract']['cost_usd'], 2 * call_cost(MODEL, 1000, 100))
+        domains = {row['domain']: row for row in self.repository.domain_yield()}
+        self.assertEqual(domains['lund.com']['boats'], 1)
+        self.assertEqual(domains['forum.com']['boats'], 0)
+        self.assertEqual(domains['forum.com']['pages'], 1)
+        with self.assertRaises(ValueError):
+            self.repository.llm_usage_summary('url; DROP TABLE boats')
+
+    @patch('search_boats.client')
+    def test_exhausted_budget_skips_calls(self, mock_client):
+        self.tracker.budget_usd = 0.0
+        self.assertEqual(search_boats.extract_specs("page text", "Lund", "https://lund.com/1"), [])
+        self.assertEqual(search_boats.generate_search_queries("Lund"), search_boats.default_search_queries("Lund"))
+        mock_client.messages.create.assert_not_called()
+        self.assertEqual(self.tracker.refused, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for run metrics
+"""
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import search_boats
+from metrics import Histogram, Metrics, configure_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Test counters, histograms and exports"""
+
+    def test_counters_by_label(self):
+        metrics = Metrics()
+        metrics.inc('cache_hits_total', cache='page')
+        metrics.inc('cache_hits_total', 2, cache='page')
+        metrics.inc('cache_hits_total', cache='extraction')
+        self.assertEqual(metrics.counter('cache_hits_total', cache='page'), 3)
+        self.assertEqual(metrics.total('cache_hits_total'), 4)
+        self.assertEqual(metrics.counter('missing_total'), 0)
+
+    def test_histogram_quantiles(self):
+        hist = Histogram(buckets=(1, 2, 5))
+        for value in (0.5, 0.5, 1.5, 4, 10):
+            hist.observe(value)
+        self.assertEqual(hist.counts, [2, 3, 4])
+        self.assertEqual(hist.quantile(0.5), 2)
+        self.assertEqual(hist.quantile(0.95), float('inf'))
+        self.assertEqual(Histogram().quantile(0.5), 0.0)
+
+    def test_timer_records_on_error(self):
+        metrics = Metrics()
+        with self.assertRaises(ValueError):
+            with metrics.timer('fetch'):
+                raise ValueError("boom")
+        self.assertEqual(metrics.histogram('stage_seconds', stage='fetch').count, 1)
+        self.assertIn('fetch', metrics.stage_totals())
+
+    def test_exports(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.inc('pages_fetched_total', 3)
+        metrics.inc('llm_input_tokens_total', 120, model='haiku')
+        metrics.observe('stage_seconds', 0.5, stage='fetch')
+
+        text = metrics.prometheus_text()
+        self.assertIn('# TYPE powerboat_pages_fetched_total counter', text)
+        self.assertIn('powerboat_llm_input_tokens_total{model="haiku"} 120', text)
+        self.assertIn('powerboat_stage_seconds_bucket{stage="fetch",le="0.1"} 0', text)
+        self.assertIn('powerboat_stage_seconds_bucket{stage="fetch",le="+Inf"} 1', text)
+        self.assertIn('powerboat_stage_seconds_count{stage="fetch"} 1', text)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'metrics.jsonl')
+            metrics.write_jsonl(path, run_id='r1')
+            metrics.write_jsonl(path, run_id='r2')
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            prom_path = os.path.join(tmpdir, 'metrics.prom')
+            metrics.write_prometheus(prom_path)
+            self.assertEqual(sorted(os.listdir(tmpdir)), ['metrics.jsonl', 'metrics.prom'])
+        self.assertEqual(len(records), 6)
+        fetch = next(r for r in records if r['metric'] == 'stage_seconds')
+        self.assertEqual(fetch['labels'], {'stage': 'fetch'})
+        self.assertEqual(fetch['p50'], 1.0)
+        self.assertEqual({r['run_id'] for r in records}, {'r1', 'r2'})
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test that crawl functions report into the configured registry"""
+
+    def setUp(self):
+        self.metrics = configure_metrics()
+
+    def tearDown(self):
+        configure_metrics()
+
+    @patch('search_boats.client')
+    def test_create_message_counts_tokens(self, mock_client):
+        mock_client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text="[]")], usage=SimpleNamespace(input_tokens=100, output_tokens=7))
+        search_boats.create_message("prompt", "haiku")
+        self.assertEqual(self.metrics.counter('llm_requests_total', model='haiku'), 1)
+        self.assertEqual(self.metrics.counter('llm_input_tokens_total', model='haiku'), 100)
+        self.assertEqual(self.metrics.counter('llm_output_tokens_total', model='haiku'), 7)
+        self.assertEqual(self.metrics.histogram('stage_seconds', stage='llm').count, 1)
+
+    @patch('search_boats._fetch_webpage', side_effect=["text", None])
+    def test_fetch_webpage_counts_pages(self, mock_fetch):
+        search_boats.fetch_webpage("https://example.com/a")
+        search_boats.fetch_webpage("https://example.com/b")
+        self.assertEqual(self.metrics.counter('pages_fetched_total'), 1)
+        self.assertEqual(self.metrics.counter('pages_failed_total'), 1)
+        self.assertEqual(self.metrics.histogram('stage_seconds', stage='fetch').count, 2)
+
+    def test_persist_boats_counts_boats(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch('search_boats.DB_FILE', os.path.join(tmpdir, 'boats.db')):
+            search_boats.init_database()
+            boats = [{'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40},
+                     {'make': 'Lund', 'model': 'Tiny', 'length_ft': 10, 'max_hp': None}]
+            search_boats.persist_boats(boats, "https://example.com/lund")
+            search_boats.get_repository().close()
+        self.assertEqual(self.metrics.counter('boats_found_total'), 2)
+        self.assertEqual(self.metrics.counter('boats_new_total'), 1)
+        self.assertEqual(self.metrics.histogram('stage_seconds', stage='db_write').count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Unit tests for the on-disk page cache
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import search_boats
+from page_cache import PageCache, configure_page_cache, normalize_url
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        _ETagHandler.requests_seen.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body><p>Whaler 130 Sport 13'6\" 40 HP</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _LongPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        _LongPageHandler.requests_seen.append(dict(self.headers))
+        body = b"<html><body>" + b"".join(b"<p>Spec line %d: 13 ft, 40 HP</p>" % i for i in range(4000)) \
+            + b"</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"long"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestNormalizeUrl(unittest.TestCase):
+    """Test cache key normalization"""
+
+    def test_normalize_url_variants(self):
+        """Test that equivalent URLs share one key"""
+        self.assertEqual(normalize_url("HTTPS://Example.com:443/specs/?b=2&a=1#top"),
+                         normalize_url("https://example.com/specs?a=1&b=2"))
+        self.assertNotEqual(normalize_url("https://example.com/a"), normalize_url("https://example.com/b"))
+
+
+class TestPageCache(unittest.TestCase):
+    """Test storage, revalidation and eviction"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = PageCache(os.path.join(self.tmpdir.name, 'cache'))
+
+    def tearDown(self):
+        configure_page_cache(None)
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_put_and_get(self):
+        """Test round-tripping a body with its validators"""
+        self.cache.put("https://example.com/a", b"hello", encoding='utf-8', etag='"x"')
+        page = self.cache.get("https://EXAMPLE.com/a#frag")
+
+        self.assertEqual(page.text, "hello")
+        self.assertEqual(self.cache.conditional_headers(page), {'If-None-Match': '"x"'})
+
+    def test_identical_bodies_share_a_blob(self):
+        """Test content addressing stores duplicate bodies once"""
+        self.cache.put("https://a.example.com/", b"same body")
+        self.cache.put("https://b.example.com/", b"same body")
+
+        self.assertEqual(self.cache.total_bytes(), len(b"same body"))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used page is evicted first"""
+        cache = PageCache(os.path.join(self.tmpdir.name, 'small'), max_bytes=25)
+        cache.put("https://example.com/1", b"x" * 10)
+        time.sleep(0.01)
+        cache.put("https://example.com/2", b"y" * 10)
+        time.sleep(0.01)
+        cache.get("https://example.com/1")
+        time.sleep(0.01)
+        cache.put("https://example.com/3", b"z" * 10)
+
+        self.assertIsNotNone(cache.get("https://example.com/1"))
+        self.assertIsNone(cache.get("https://example.com/2"))
+        self.assertIsNotNone(cache.get("https://example.com/3"))
+        cache.close()
+
+    def test_fetch_revalidates_with_etag(self):
+        """Test that stale pages are revalidated and reused on 304"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/spec"
+        try:
+            configure_page_cache(self.cache)
+            first = search_boats.fetch_webpage(url)
+            self.cache.ttl_seconds = 0
+            second = search_boats.fetch_webpage(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertIn("40 HP", first)
+        self.assertEqual(first, second)
+        self.assertEqual(_ETagHandler.requests_seen[-1].get('If-None-Match'), '"v1"')
+        self.assertEqual(self.cache.revalidated, 1)
+
+    def test_force_revalidate_ignores_ttl(self):
+        """Test that force_revalidate checks a fresh page without changing the cache TTL"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/forced"
+        try:
+            configure_page_cache(self.cache)
+            first = search_boats.fetch_webpage(url)
+            seen = len(_ETagHandler.requests_seen)
+            second = search_boats.fetch_webpage(url, force_revalidate=True)
+            third = search_boats.fetch_webpage(url)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(second, third)
+        self.assertEqual(len(_ETagHandler.requests_seen), seen + 1)
+        self.assertEqual(_ETagHandler.requests_seen[-1].get('If-None-Match'), '"v1"')
+        self.assertEqual((self.cache.revalidated, self.cache.hits), (1, 1))
+
+    def test_partial_bodies_are_not_reused_for_longer_reads(self):
+        """Test that a prefix cached for a short read is refetched by a longer one"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _LongPageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/long"
+        try:
+            configure_page_cache(self.cache)
+            search_boats.fetch_page_text(url, max_chars=500, max_bytes=10 ** 6)
+            partial = self.cache.get(url)
+            blocks = search_boats.fetch_page_blocks(url, max_chars=20000, max_bytes=10 ** 6)
+            # The longer read's prefix now serves shorter reads too
+            short = search_boats.fetch_page_text(url, max_chars=500, max_bytes=10 ** 6)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual((partial.partial_chars, partial.etag), (500, None))
+        self.assertGreater(sum(len(block.text) for block in blocks), 15000)
+        self.assertEqual(len(_LongPageHandler.requests_seen), 2)
+        self.assertNotIn('If-None-Match', _LongPageHandler.requests_seen[1])
+        self.assertEqual(self.cache.get(url).partial_chars, 20000)
+        self.assertEqual(len(short), 500)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_fresh_pages_skip_network(self):
+        """Test that pages within the TTL are served from disk"""
+        self.cache.put("http://127.0.0.1:9/never", b"<p>cached</p>", encoding='utf-8')
+        configure_page_cache(self.cache)
+
+        self.assertEqual(search_boats.fetch_webpage("http://127.0.0.1:9/never"), "cached")
+        self.assertEqual(self.cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit tests for process-pool HTML parsing
+"""
+import os
+import tempfile
+import time
+import unittest
+
+import search_boats
+from html_text import html_to_text
+from page_cache import PageCache, configure_page_cache
+from parse_pool import ParsePool, configure_parse_pool, parse_text
+
+PAGE = """<html><head><title>Lund WC-14 Specs</title></head><body>
+<p>About our dealership and financing options.</p>
+<table><tr><td>LOA</td><td>14' 0"</td></tr><tr><td>Max HP</td><td>25</td></tr></table>
+</body></html>"""
+
+
+class TestParsePool(unittest.TestCase):
+    """Test parsing on worker processes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ParsePool(workers=2, max_pending=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_matches_in_thread_parsing(self):
+        """Test that worker results equal parsing in the calling thread"""
+        pages = [PAGE.replace("WC-14", f"WC-{i}") for i in range(10)]
+        futures = [self.pool.submit(parse_text, page, 8000) for page in pages]
+
+        self.assertEqual([future.result() for future in futures], [html_to_text(page) for page in pages])
+
+    def test_pending_work_is_bounded(self):
+        """Test that submit() waits for a free slot once max_pending jobs are queued"""
+        pool = ParsePool(workers=2, max_pending=1)
+        try:
+            pool.submit(time.sleep, 0.3)
+            start = time.monotonic()
+            pool.submit(time.sleep, 0).result()
+            self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        finally:
+            pool.close()
+
+
+class TestFetchWithParsePool(unittest.TestCase):
+    """Test that fetch_webpage() gives the same text with and without the pool"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = configure_page_cache(PageCache(os.path.join(self.tmpdir.name, 'cache')))
+        self.url = "http://127.0.0.1:9/lund"
+        self.cache.put(self.url, PAGE.encode('utf-8'), encoding='utf-8')
+
+    def tearDown(self):
+        configure_parse_pool(None)
+        configure_page_cache(None)
+        self.tmpdir.cleanup()
+
+    def test_cached_page_parsed_on_pool(self):
+        in_thread = [search_boats.fetch_webpage(self.url, select_specs=flag) for flag in (True, False)]
+        pool = configure_parse_pool(ParsePool(workers=1))
+
+        self.assertEqual([search_boats.fetch_webpage(self.url, select_specs=flag) for flag in (True, False)],
+                         in_thread)
+        self.assertEqual(pool.submitted, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
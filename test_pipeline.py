@@ -0,0 +1,147 @@
+"""
+Unit tests for the concurrent crawl pipeline
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from pipeline import PipelineConfig, run_pipeline
+
+
+def fake_queries(make):
+    return [f"{make} query"]
+
+
+def fake_search(query):
+    make = query.replace(" query", "")
+    return [{'url': f"https://example.com/{make}/{i}", 'title': f"{make} {i}"} for i in range(3)]
+
+
+def fake_fetch(url):
+    time.sleep(0.1)
+    return f"page {url}"
+
+
+def fake_extract(content, make=None, url=None):
+    make, index = content.split("/")[-2:]
+    return [{'make': make, 'model': f"Model {index}", 'length_ft': 13.5, 'max_hp': 40}]
+
+
+class TestPipeline(unittest.TestCase):
+    """Test the asyncio crawl pipeline"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_patch = patch('search_boats.DB_FILE', os.path.join(self.tmpdir.name, 'boats.db'))
+        self.db_patch.start()
+        search_boats.init_database()
+
+    def tearDown(self):
+        self.db_patch.stop()
+        self.tmpdir.cleanup()
+
+    @patch('search_boats.extract_specs', side_effect=fake_extract)
+    @patch('search_boats.fetch_webpage', side_effect=fake_fetch)
+    @patch('search_boats.search_web', side_effect=fake_search)
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_persists_all_boats(self, *mocks):
+        """Test that every extracted boat reaches the database"""
+        stats = run_pipeline(["Alpha", "Beta"], PipelineConfig(fetch_workers=6))
+
+        self.assertEqual(stats.pages_fetched, 6)
+        self.assertEqual(stats.new_boats, 6)
+        conn = sqlite3.connect(search_boats.DB_FILE)
+        count = conn.execute('SELECT COUNT(*) FROM boats').fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 6)
+
+    @patch('search_boats.extract_specs', side_effect=fake_extract)
+    @patch('search_boats.search_web', side_effect=fake_search)
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_fetches_concurrently(self, *mocks):
+        """Test that fetches overlap instead of running back to back"""
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def fetch(url):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return fake_fetch(url)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        with patch('search_boats.fetch_webpage', side_effect=fetch):
+            run_pipeline(["Alpha", "Beta"], PipelineConfig(fetch_workers=6))
+
+        self.assertGreater(peak[0], 1)
+
+    @patch('search_boats.extract_specs', side_effect=fake_extract)
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_fetches_while_searching(self, *mocks):
+        """Test that pages are fetched before every search has finished"""
+        fetch_started = threading.Event()
+        overlapped = []
+
+        def search(query):
+            # Beta's search waits for a page from Alpha's results to be fetched
+            if query.startswith("Beta"):
+                overlapped.append(fetch_started.wait(2))
+            return fake_search(query)
+
+        def fetch(url):
+            fetch_started.set()
+            return fake_fetch(url)
+
+        with patch('search_boats.search_web', side_effect=search), \
+                patch('search_boats.fetch_webpage', side_effect=fetch):
+            stats = run_pipeline(["Alpha", "Beta"], PipelineConfig(search_workers=2))
+
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(stats.pages_fetched, 6)
+
+    @patch('search_boats.extract_specs', side_effect=fake_extract)
+    @patch('search_boats.fetch_webpage', return_value=None)
+    @patch('search_boats.search_web', side_effect=fake_search)
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_falls_back_to_search_snippet(self, mock_queries, mock_search, mock_fetch, mock_extract):
+        """Test that failed fetches still extract from the title/description"""
+        stats = run_pipeline(["Alpha"])
+
+        self.assertEqual(stats.pages_failed, 3)
+        self.assertTrue(all(c.args[0].startswith("Title:") for c in mock_extract.call_args_list))
+
+    @patch('search_boats.extract_specs', return_value=[
+        {'make': 'Alpha', 'model': 'Same', 'length_ft': 13.5, 'max_hp': 40}])
+    @patch('search_boats.fetch_webpage', side_effect=fake_fetch)
+    @patch('search_boats.search_web', side_effect=fake_search)
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_keeps_duplicate_semantics(self, *mocks):
+        """Test that the same boat found on several pages is inserted once"""
+        stats = run_pipeline(["Alpha"])
+
+        self.assertEqual(stats.new_boats, 1)
+        self.assertEqual(stats.updated_boats, 2)
+
+    @patch('search_boats.extract_specs', side_effect=fake_extract)
+    @patch('search_boats.fetch_webpage', side_effect=fake_fetch)
+    @patch('search_boats.search_web', side_effect=lambda query: [
+        {'url': f"https://example.com/shared/{i}?utm_source={query[0]}", 'title': str(i)} for i in range(3)])
+    @patch('search_boats.generate_search_queries', side_effect=fake_queries)
+    def test_pipeline_fetches_shared_urls_once(self, mock_queries, mock_search, mock_fetch, mock_extract):
+        """Test that URLs returned for several manufacturers are fetched once per run"""
+        stats = run_pipeline(["Alpha", "Beta"])
+
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertEqual(stats.duplicate_urls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Unit tests for the search query cache
+"""
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from query_cache import QueryCache, configure_query_cache
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test storage, expiry and ranking"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'query_cache.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ttl_and_version(self):
+        cache = QueryCache(self.path, 1, "model-a", ttl_seconds=60)
+        self.assertTrue(cache.needs_generation("Lund"))
+        cache.put("Lund", ["q1", "q2"])
+        self.assertFalse(cache.needs_generation("Lund"))
+        cache.close()
+
+        self.assertTrue(QueryCache(self.path, 2, "model-a").needs_generation("Lund"))
+        self.assertTrue(QueryCache(self.path, 1, "model-b").needs_generation("Lund"))
+        with patch('query_cache.time.time', return_value=time.time() + 120):
+            self.assertTrue(QueryCache(self.path, 1, "model-a", ttl_seconds=60).needs_generation("Lund"))
+
+    def test_ranked_by_yield(self):
+        cache = QueryCache(self.path, 1, "m")
+        cache.put("Lund", ["dud", "untried", "good"])
+        cache.record_search("Lund", "dud")
+        cache.record_search("Lund", "good")
+        cache.record_yield("Lund", "good", 3)
+
+        self.assertEqual(cache.ranked("Lund"), ["good", "untried", "dud"])
+
+    def test_regeneration_keeps_stats(self):
+        cache = QueryCache(self.path, 1, "m")
+        cache.put("Lund", ["a", "b"])
+        cache.record_search("Lund", "b")
+        cache.record_yield("Lund", "b", 2)
+        cache.put("Lund", ["c", "b"])
+
+        self.assertEqual(cache.ranked("Lund"), ["b", "c"])
+
+    def test_lazy_mode_waits_for_exhaustion(self):
+        cache = QueryCache(self.path, 1, "m", ttl_seconds=0, lazy=True)
+        cache.put("Lund", ["a", "b"])
+        self.assertFalse(cache.needs_generation("Lund"))
+
+        for query in ("a", "b"):
+            cache.record_search("Lund", query)
+        cache.record_yield("Lund", "a", 1)
+        self.assertFalse(cache.needs_generation("Lund"))
+
+        cache.record_search("Lund", "a")  # latest run of "a" found nothing
+        self.assertTrue(cache.needs_generation("Lund"))
+
+    def test_lazy_mode_retries_regenerated_queries(self):
+        cache = QueryCache(self.path, 1, "m", lazy=True)
+        cache.put("Lund", ["a", "b"])
+        for query in ("a", "b"):
+            cache.record_search("Lund", query)
+        self.assertTrue(cache.needs_generation("Lund"))
+
+        # Claude returns the exhausted queries again
+        cache.put("Lund", ["b", "a"])
+        self.assertFalse(cache.needs_generation("Lund"))
+        self.assertEqual(cache.ranked("Lund"), ["b", "a"])
+
+        for query in ("b", "a"):
+            cache.record_search("Lund", query)
+        self.assertTrue(cache.needs_generation("Lund"))
+
+
+class TestManufacturerQueries(unittest.TestCase):
+    """Test that cached queries avoid Claude calls"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'query_cache.db')
+
+    def tearDown(self):
+        configure_query_cache(None)
+        self.tmpdir.cleanup()
+
+    @patch('search_boats.generate_search_queries', return_value=["Lund WC-14 specs", "Lund 14 ft boats"])
+    def test_queries_generated_once(self, mock_generate):
+        configure_query_cache(QueryCache(self.path, 1, "m"))
+
+        first = search_boats.manufacturer_queries("Lund")
+        second = search_boats.manufacturer_queries("Lund")
+
+        self.assertEqual(first, second)
+        mock_generate.assert_called_once_with("Lund", fallback=False)
+
+    @patch('search_boats.generate_search_queries', return_value=None)
+    def test_fallback_queries_are_not_cached(self, mock_generate):
+        """Test that templated queries used after a failed generation are not cached as Claude's"""
+        cache = configure_query_cache(QueryCache(self.path, 1, "m"))
+
+        first = search_boats.manufacturer_queries("Lund")
+        search_boats.manufacturer_queries("Lund")
+
+        self.assertEqual(first, search_boats.default_search_queries("Lund"))
+        self.assertFalse(cache.has_queries("Lund"))
+        self.assertEqual(mock_generate.call_count, 2)
+
+    @patch('search_boats.generate_search_queries')
+    def test_lazy_mode_starts_from_templates(self, mock_generate):
+        configure_query_cache(QueryCache(self.path, 1, "m", lazy=True))
+
+        queries = search_boats.manufacturer_queries("Lund")
+
+        self.assertEqual(queries, search_boats.default_search_queries("Lund"))
+        mock_generate.assert_not_called()
+
+    @patch('search_boats.fetch_webpage', side_effect=lambda url: f"page {url}")
+    @patch('search_boats.search_web', side_effect=lambda query: [{'url': f"https://example.com/{query}"}])
+    @patch('search_boats.generate_search_queries', return_value=["first", "second"])
+    def test_page_yield_reorders_queries(self, mock_generate, mock_search, mock_fetch):
+        cache = configure_query_cache(QueryCache(self.path, 1, "m"))
+        cache.put("Lund", ["first", "second"])
+        cache.record_search("Lund", "first")  # tried before, found nothing
+
+        pages = list(search_boats.iter_pages(["Lund"], search_boats.CrawlFrontier()))
+        self.assertEqual([page.query for page in pages], ["second"])
+        search_boats.finish_page(pages[0], new_boats=2)
+
+        self.assertEqual(cache.ranked("Lund"), ["second", "first"])
+
+
+if __name__ == '__main__':
+    unittest.main()
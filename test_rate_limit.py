@@ -0,0 +1,136 @@
+"""
+Unit tests for token-bucket rate limiting
+"""
+import unittest
+from unittest.mock import Mock
+
+from http_client import HttpClient, HttpClientConfig
+from rate_limit import BRAVE, RateLimitConfig, RateLimiter, TokenBucket, configure_rate_limiter, parse_retry_after
+
+
+class FakeClock:
+    """Manual clock whose sleep() advances time instead of blocking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test bucket refill, waits and backoff"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def bucket(self, rate=2.0, capacity=2):
+        return TokenBucket(rate, capacity, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_then_steady_rate(self):
+        bucket = self.bucket()
+        waits = [bucket.acquire() for _ in range(5)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertEqual(waits[2:], [0.5, 0.5, 0.5])
+
+    def test_idle_time_refills(self):
+        bucket = self.bucket()
+        bucket.acquire(2)
+        self.assertEqual(bucket.wait_time(), 0.5)
+        self.clock.now += 10
+
+        self.assertEqual(bucket.wait_time(2), 0.0)
+
+    def test_throttled_pauses_and_halves_rate(self):
+        bucket = self.bucket()
+        bucket.on_throttled(retry_after=3)
+
+        self.assertEqual(bucket.rate, 1.0)
+        self.assertEqual(bucket.wait_time(), 3)
+        self.assertEqual(bucket.acquire(), 3)
+
+    def test_success_recovers_rate(self):
+        bucket = self.bucket()
+        bucket.on_throttled()
+        for _ in range(20):
+            bucket.on_success()
+
+        self.assertEqual(bucket.rate, 2.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test service and host buckets"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(RateLimitConfig(host_per_second=1.0, host_burst=1),
+                                   clock=self.clock, sleep=self.clock.sleep)
+
+    def test_hosts_are_limited_independently(self):
+        self.limiter.acquire("a.example.com")
+        self.limiter.acquire("b.example.com")
+        self.assertEqual(self.clock.slept, [])
+
+        self.limiter.acquire("a.example.com")
+        self.assertEqual(self.clock.slept, [1.0])
+
+    def test_retry_after_is_honored(self):
+        self.limiter.acquire(BRAVE)
+        self.limiter.record_response(BRAVE, 429, "7")
+
+        self.assertEqual(self.limiter.wait_times()[BRAVE], 7)
+        self.limiter.acquire(BRAVE)
+        self.assertEqual(self.limiter.total_waited(), {BRAVE: 7})
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0), 10.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class TestHttpClientThrottling(unittest.TestCase):
+    """Test that HttpClient requests wait on and report to the limiter"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = configure_rate_limiter(RateLimiter(clock=self.clock, sleep=self.clock.sleep))
+        self.client = HttpClient(HttpClientConfig(max_retries=0))
+        self.client.session = Mock()
+        self.client.session.get.return_value = Mock(status_code=429, headers={'Retry-After': '5'})
+
+    def tearDown(self):
+        configure_rate_limiter(None)
+
+    def test_429_pauses_host_bucket(self):
+        self.client.get("https://example.com/a")
+
+        self.assertEqual(self.limiter.wait_times()["example.com"], 5)
+
+    def test_429_retries_take_a_token(self):
+        self.client.config.max_retries = 1
+        self.client.session.get.side_effect = [Mock(status_code=429, headers={'Retry-After': '5'}),
+                                               Mock(status_code=200, headers={})]
+
+        response = self.client.get("https://example.com/a")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.session.get.call_count, 2)
+        # The retry waited out the bucket's Retry-After pause instead of going straight out
+        self.assertGreaterEqual(sum(self.clock.slept), 5)
+
+    def test_rate_key_selects_service_bucket(self):
+        self.client.get("https://api.search.brave.com/res/v1/web/search", rate_key=BRAVE)
+
+        self.assertEqual(self.limiter.wait_times()[BRAVE], 5)
+        self.assertNotIn("api.search.brave.com", self.limiter.buckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for resumable crawl runs
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from crawl_frontier import CrawlFrontier
+from run_journal import (STAGE_PAGE, STAGE_QUERIES, STATUS_DONE, STATUS_FAILED, RunJournal, configure_run_journal)
+
+
+def fake_search(query):
+    make = query.split()[0]
+    return [{'url': f"https://example.com/{make}/{i}", 'title': f"{make} {i}"} for i in range(3)]
+
+
+class TestRunJournal(unittest.TestCase):
+    """Test journal bookkeeping"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'run_journal.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_resume_continues_unfinished_run(self):
+        journal = RunJournal(self.path)
+        run_id = journal.start_run()
+        journal.record(STAGE_QUERIES, "Alpha", STATUS_DONE, ["Alpha specs"], make="Alpha")
+        journal.close()
+
+        resumed = RunJournal(self.path)
+        self.assertEqual(resumed.start_run(resume=True), run_id)
+        self.assertTrue(resumed.resumed)
+        self.assertEqual(resumed.get(STAGE_QUERIES, "Alpha").payload, ["Alpha specs"])
+        resumed.finish_run()
+        resumed.close()
+
+        fresh = RunJournal(self.path)
+        self.assertNotEqual(fresh.start_run(resume=True), run_id)
+        self.assertFalse(fresh.resumed)
+        self.assertIsNone(fresh.get(STAGE_QUERIES, "Alpha"))
+        fresh.close()
+
+
+class TestResumedCrawl(unittest.TestCase):
+    """Test that a resumed crawl only redoes unfinished work"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmpdir.name, 'run_journal.db')
+        self.frontier_path = os.path.join(self.tmpdir.name, 'frontier.db')
+
+    def tearDown(self):
+        configure_run_journal(None)
+        self.tmpdir.cleanup()
+
+    def crawl(self, resume, fail_on=None):
+        """Runs iter_pages with a journal and persistent frontier; raises at fail_on to simulate a crash."""
+        journal = configure_run_journal(RunJournal(self.journal_path))
+        run_id = journal.start_run(resume=resume)
+        frontier = CrawlFrontier(self.frontier_path, run_id=run_id)
+        seen = []
+        try:
+            for page in search_boats.iter_pages(["Alpha", "Beta"], frontier):
+                if page.url == fail_on:
+                    raise RuntimeError("crash")
+                seen.append(page.url)
+                search_boats.finish_page(page)
+            journal.finish_run()
+        finally:
+            frontier.close()
+        return seen
+
+    @patch('search_boats.fetch_webpage', side_effect=lambda url: None if url.endswith("Beta/2") else f"page {url}")
+    @patch('search_boats.search_web', side_effect=fake_search)
+    @patch('search_boats.generate_search_queries', side_effect=lambda make: [f"{make} specs"])
+    def test_resume_skips_finished_work(self, mock_queries, mock_search, mock_fetch):
+        with self.assertRaises(RuntimeError):
+            self.crawl(resume=False, fail_on="https://example.com/Beta/0")
+        self.assertEqual(mock_queries.call_count, 2)
+        self.assertEqual(mock_search.call_count, 2)
+
+        seen = self.crawl(resume=True)
+
+        # Queries and searches come from the journal; Alpha's pages were already persisted
+        self.assertEqual(mock_queries.call_count, 2)
+        self.assertEqual(mock_search.call_count, 2)
+        self.assertEqual(seen, ["https://example.com/Beta/0", "https://example.com/Beta/1",
+                                "https://example.com/Beta/2"])
+        counts = search_boats.get_run_journal().counts()
+        self.assertEqual(counts[(STAGE_PAGE, STATUS_DONE)], 5)
+        self.assertEqual(counts[(STAGE_PAGE, STATUS_FAILED)], 1)
+
+        # The run is finished, so this starts a new one: only the failed page is fetched again
+        self.assertEqual(self.crawl(resume=True), ["https://example.com/Beta/2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
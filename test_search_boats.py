@@ -1,10 +1,13 @@
 """
 Unit tests for search_boats.py functions
 """
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 import json
-from search_boats import filter_boats, extract_specs, generate_search_queries
+import search_boats
+from search_boats import BoatRepository, filter_boats, extract_specs, generate_search_queries
 
 
 class TestFilterBoats(unittest.TestCase):
@@ -104,6 +107,18 @@ class TestGenerateSearchQueries(unittest.TestCase):
 
         self.assertEqual(len(result), 2)
 
+    @patch('search_boats.search_criteria', return_value=search_boats.SearchCriteria(12.0, 12.5, 25))
+    @patch('search_boats.client')
+    def test_prompt_uses_configured_window(self, mock_client, mock_criteria):
+        """Test that the query prompt asks for the configured target window"""
+        mock_client.messages.create.return_value = Mock(content=[Mock(text='["query1"]')])
+
+        generate_search_queries("Lund")
+
+        prompt = mock_client.messages.create.call_args.kwargs['messages'][0]['content']
+        self.assertIn("between 12 feet (12') and 12.5 feet (12'6\") in length", ' '.join(prompt.split()))
+        self.assertIn("at least 25 HP", prompt)
+
 
 class TestExtractSpecs(unittest.TestCase):
     """Test the extract_specs function"""
@@ -145,5 +160,125 @@ class TestExtractSpecs(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestBoatRepository(unittest.TestCase):
+    """Test the shared-connection BoatRepository"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = BoatRepository(os.path.join(self.tmpdir.name, 'boats.db'))
+        self.repo.init_schema()
+
+    def tearDown(self):
+        self.repo.close()
+        self.tmpdir.cleanup()
+
+    def test_uses_wal_journal(self):
+        """Test that the connection runs in WAL mode"""
+        mode = self.repo.conn.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_upsert_insert_then_update(self):
+        """Test that upsert reports new vs existing boats"""
+        boat = {'make': 'Boston Whaler', 'model': '130 Sport', 'length_ft': 13.5, 'max_hp': 40}
+        self.assertTrue(self.repo.upsert(boat))
+        self.assertFalse(self.repo.upsert(dict(boat, dry_weight_lbs=475)))
+        self.assertEqual(self.repo.count(), 1)
+
+    def test_transaction_rolls_back_on_error(self):
+        """Test that a failed transaction leaves no partial writes"""
+        with self.assertRaises(RuntimeError):
+            with self.repo.transaction():
+                self.repo.upsert({'make': 'A', 'model': 'One', 'length_ft': 13.5, 'max_hp': 40})
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.repo.count(), 0)
+
+    def test_upsert_many_merges_existing_rows(self):
+        """Test bulk upsert inserts new rows and COALESCE-merges existing ones"""
+        self.repo.upsert({'make': 'A', 'model': 'One', 'length_ft': 13.5, 'max_hp': 40, 'dry_weight_lbs': 400})
+
+        inserted = self.repo.upsert_many([
+            {'make': 'A', 'model': 'One', 'length_ft': 13.6, 'max_hp': None, 'beam_inches': 60},
+            {'make': 'B', 'model': 'Two', 'length_ft': 13.8, 'max_hp': 50},
+        ])
+
+        self.assertEqual(inserted, 1)
+        row = self.repo.conn.execute(
+            "SELECT length_ft, max_hp, dry_weight_lbs, beam_inches FROM boats WHERE model = 'One'").fetchone()
+        self.assertEqual(row, (13.6, 40, 400, 60))
+
+    def test_query_boats_ranges(self):
+        """Test arbitrary range queries, with missing values failing their bound"""
+        self.repo.upsert_many([
+            {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40, 'dry_weight_lbs': 300},
+            {'make': 'Lund', 'model': 'SSV-16', 'length_ft': 16.0, 'max_hp': 60},
+            {'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.5, 'max_hp': 40},
+        ])
+        models = lambda **bounds: [boat['model'] for boat in self.repo.query_boats(**bounds)]
+        self.assertEqual(models(min_length=13.5, max_length=13.92, min_hp=40), ['130 Super Sport', 'WC-14'])
+        self.assertEqual(models(make='LUND', min_length=14), ['SSV-16'])
+        self.assertEqual(models(max_weight=350), ['WC-14'])
+        self.assertEqual(models(min_hp=41, max_hp=60), ['SSV-16'])
+        self.assertEqual(self.repo.count_matching('lund', 13.0, 14.0, 40), 1)
+
+    def test_range_queries_use_indexes(self):
+        """Test that length, HP and make+length bounds are answered from an index"""
+        def plan(sql, params):
+            return ' '.join(row[-1] for row in self.repo.conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+
+        self.assertIn('idx_boats_length', plan('SELECT * FROM boats WHERE length_ft >= ? AND length_ft <= ?',
+                                               (13.5, 13.92)))
+        self.assertIn('idx_boats_max_hp', plan('SELECT * FROM boats WHERE max_hp >= ?', (200,)))
+        self.assertIn('idx_boats_make_length',
+                      plan('SELECT * FROM boats WHERE make = ? COLLATE NOCASE AND length_ft >= ?', ('lund', 13)))
+
+    def test_process_extracted_boat_stores_every_size(self):
+        """Test that the crawler keeps boats outside the target window and skips ones without specs"""
+        with patch('search_boats.get_repository', return_value=self.repo), patch('builtins.print'):
+            self.assertEqual(search_boats.process_extracted_boat(
+                {'make': 'Lund', 'model': 'SSV-10', 'length_ft': '10', 'max_hp': 8}, 'https://lund.com'), 'new')
+            self.assertIsNone(search_boats.process_extracted_boat(
+                {'make': 'Lund', 'model': 'Mystery', 'length_ft': None, 'max_hp': 8}, 'https://lund.com'))
+        self.assertEqual(self.repo.query_boats(max_length=12)[0]['length_ft'], 10.0)
+        self.assertEqual(self.repo.count(), 1)
+
+    def test_persist_boats_matches_one_at_a_time(self):
+        """Test that persist_boats' single upsert_many gives the same rows as writing each boat"""
+        page = [
+            {'make': 'Lund', 'model': 'WC', 'length_ft': 13.5, 'max_hp': 40},
+            {'make': 'Lund', 'model': 'WC-14 Deluxe', 'length_ft': 13.75, 'max_hp': 40, 'beam_inches': 60},
+            {'make': 'Lund', 'model': 'SSV', 'length_ft': 10, 'max_hp': 8},
+            {'make': 'Lund', 'model': 'SSV', 'length_ft': 12, 'max_hp': 15, 'dry_weight_lbs': 200},
+            {'make': 'Lund', 'model': 'Fury', 'length_ft': 16, 'max_hp': 60},
+            {'make': 'Lund', 'model': 'Fury XL', 'length_ft': 16.2, 'max_hp': 75},
+            {'make': 'Gheenoe', 'model': 'Classic', 'length_ft': 13.33, 'max_hp': 15},
+            {'make': 'Lund', 'model': 'Tiny', 'length_ft': None, 'max_hp': 5},
+        ]
+        stored = {'make': 'Lund', 'model': 'Fury', 'length_ft': 15.8, 'max_hp': 50}
+
+        def rows(repo):
+            return repo.conn.execute('SELECT make, model, length_ft, max_hp, dry_weight_lbs, beam_inches, source_url '
+                                     'FROM boats ORDER BY make, model').fetchall()
+
+        self.repo.upsert(dict(stored))
+        one_by_one = BoatRepository(os.path.join(self.tmpdir.name, 'one_by_one.db'))
+        one_by_one.init_schema()
+        one_by_one.upsert(dict(stored))
+        with patch('builtins.print'):
+            with patch('search_boats.get_repository', return_value=one_by_one):
+                outcomes = [search_boats.process_extracted_boat(dict(boat), 'https://lund.com') for boat in page]
+            with patch('search_boats.get_repository', return_value=self.repo), \
+                    patch.object(self.repo, 'upsert_many', wraps=self.repo.upsert_many) as upsert_many:
+                counts = search_boats.persist_boats([dict(boat) for boat in page], 'https://lund.com')
+
+        self.assertEqual(counts, (outcomes.count('new'), outcomes.count('updated')))
+        self.assertEqual(counts, (3, 4))
+        upsert_many.assert_called_once()
+        self.assertEqual(rows(self.repo), rows(one_by_one))
+        found = self.repo.find_duplicate({'make': 'Lund', 'model': 'Deluxe', 'length_ft': 13.7})
+        self.assertEqual(found['model'], 'WC-14 Deluxe')
+        one_by_one.close()
+
+
 if __name__ == '__main__':
     unittest.main()
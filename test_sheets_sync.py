@@ -0,0 +1,151 @@
+"""Tests for sheets_sync.py"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import search_boats
+from metrics import configure_metrics
+from sheets_sync import (SHEET_COLUMNS, FakeSheetBackend, GspreadBackend, SheetSync, a1_range, column_letter,
+                         parse_a1_range)
+
+BOATS = [
+    {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40},
+    {'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.5, 'max_hp': 60},
+    {'make': 'Gheenoe', 'model': 'Classic', 'length_ft': 13.33, 'max_hp': 15},
+]
+
+
+class TestA1(unittest.TestCase):
+    """Test A1 range helpers"""
+
+    def test_columns_and_ranges(self):
+        self.assertEqual([column_letter(n) for n in (1, 9, 26, 27, 52)], ['A', 'I', 'Z', 'AA', 'AZ'])
+        self.assertEqual(a1_range(2, 5, 9), 'A2:I5')
+        self.assertEqual(parse_a1_range("'Boats'!B3:AA7"), (3, 2, 7, 27))
+
+
+class TestSheetSync(unittest.TestCase):
+    """Test incremental sync against the fake backend"""
+
+    def setUp(self):
+        self.metrics = configure_metrics()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo = search_boats.BoatRepository(os.path.join(self.tmpdir.name, 'boats.db'))
+        self.repo.init_schema()
+        self.repo.upsert_many([dict(boat) for boat in BOATS])
+        self.backend = FakeSheetBackend()
+        self.sync = SheetSync(self.repo, self.backend, bounds={'min_length': 13.5, 'max_length': 13.92,
+                                                               'min_hp': 40})
+
+    def tearDown(self):
+        self.repo.close()
+        self.tmpdir.cleanup()
+        configure_metrics()
+
+    def models(self):
+        return [row[2] for row in self.backend.rows()[1:]]
+
+    def test_first_sync_writes_header_and_rows(self):
+        result = self.sync.sync()
+        rows = self.backend.rows()
+        self.assertEqual(rows[0], [header for _, header in SHEET_COLUMNS])
+        self.assertEqual(self.models(), ['130 Super Sport', 'WC-14'])
+        self.assertEqual((result.written, result.api_calls), (2, 2))
+        self.assertEqual(self.backend.calls, [('clear', 0), ('batch_update', 1)])
+        self.assertEqual(self.metrics.counter('sheet_api_calls_total'), 2)
+
+    def test_unchanged_sync_makes_no_calls(self):
+        self.sync.sync()
+        self.backend.calls.clear()
+        result = self.sync.sync()
+        self.assertEqual((result.written, result.unchanged, result.api_calls), (0, 2, 0))
+        self.assertEqual(self.backend.calls, [])
+
+    def test_changes_are_batched(self):
+        self.sync.sync()
+        self.backend.calls.clear()
+        self.repo.upsert({'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.5, 'max_hp': 60,
+                          'beam_inches': 66})
+        self.repo.upsert_many([{'make': 'Tracker', 'model': f'Guide {n}', 'length_ft': 13.6, 'max_hp': 50}
+                               for n in range(30)])
+        result = self.sync.sync()
+        # 31 rows in two ranges (the changed row 2, new rows 4-33) in one call
+        self.assertEqual((result.written, result.api_calls), (31, 1))
+        self.assertEqual(self.backend.calls, [('batch_update', 2)])
+        self.assertEqual(self.backend.rows()[1][6], 66)
+        self.assertEqual(len(self.backend.rows()), 33)
+
+    def test_removed_rows_are_blanked_and_reused(self):
+        self.sync.sync()
+        # Shrinking below the window removes WC-14 (row 3)
+        self.repo.conn.execute("UPDATE boats SET length_ft = 12 WHERE model = 'WC-14'")
+        self.repo.conn.commit()
+        result = self.sync.sync()
+        self.assertEqual((result.written, result.removed), (0, 1))
+        self.assertEqual(self.models(), ['130 Super Sport'])
+
+        self.repo.upsert({'make': 'Lund', 'model': 'Fury', 'length_ft': 13.8, 'max_hp': 40})
+        self.sync.sync()
+        self.assertEqual(self.models(), ['130 Super Sport', 'Fury'])
+        _, state = self.repo.sheet_state(self.backend.sheet_id)
+        self.assertEqual(sorted(row for row, _ in state.values()), [2, 3])
+
+    def test_max_rows_per_call(self):
+        self.repo.upsert_many([{'make': 'Tracker', 'model': f'Guide {n}', 'length_ft': 13.6, 'max_hp': 50}
+                               for n in range(9)])
+        self.sync.max_rows_per_call = 4
+        result = self.sync.sync()
+        # header + 11 boats = 12 rows in 3 calls, after the clear
+        self.assertEqual(result.api_calls, 4)
+        self.assertEqual(len(self.backend.rows()), 12)
+
+    def test_failed_call_resumes(self):
+        self.sync.max_rows_per_call = 2
+        self.repo.upsert({'make': 'Tracker', 'model': 'Guide', 'length_ft': 13.6, 'max_hp': 50})
+        original = self.backend.batch_update
+        self.backend.batch_update = Mock(side_effect=[None, RuntimeError("quota")])
+        with self.assertRaises(RuntimeError):
+            self.sync.sync()
+        self.backend.batch_update = original
+        self.backend.calls.clear()
+        result = self.sync.sync()
+        # Only the rows the failed call would have written go out again
+        self.assertEqual(result.written, 2)
+        self.assertEqual(self.backend.calls, [('batch_update', 1)])
+
+    def test_full_rewrites(self):
+        self.sync.sync()
+        result = self.sync.sync(full=True)
+        self.assertEqual((result.written, result.api_calls), (2, 2))
+
+
+class TestGspreadBackend(unittest.TestCase):
+    """Test the gspread adapter with a stand-in worksheet"""
+
+    def test_grows_grid_and_batches(self):
+        worksheet = Mock(id=7, row_count=10)
+        worksheet.spreadsheet.id = 'abc'
+        backend = GspreadBackend(worksheet)
+        self.assertEqual(backend.sheet_id, 'abc:7')
+        backend.batch_update([{'range': 'A2:I3', 'values': [[1], [2]]}, {'range': 'A12:I14', 'values': [[3]]}])
+        worksheet.add_rows.assert_called_once_with(4)
+        worksheet.batch_update.assert_called_once()
+        self.assertEqual(worksheet.batch_update.call_args.kwargs, {'value_input_option': 'RAW'})
+
+
+class TestSheetSyncCommand(unittest.TestCase):
+    """Test the sheet-sync subcommand"""
+
+    def test_requires_sheet(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch('search_boats.LOG_FILE', os.path.join(tmpdir, 'search.log')), \
+                patch('search_boats.load_environment'), patch('sheets_sync.sheet_url_setting', return_value=None), \
+                patch('sys.stderr') as stderr:
+            self.assertEqual(search_boats.main(['sheet-sync']), 1)
+        self.assertIn('GOOGLE_SHEET_URL', ''.join(call.args[0] for call in stderr.write.call_args_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
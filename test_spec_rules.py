@@ -0,0 +1,79 @@
+"""
+Unit tests for the rule-based spec extractor
+"""
+import unittest
+from unittest.mock import patch
+
+from search_boats import extract_page_boats
+from spec_rules import (extract_specs_fast, guess_model, parse_beam_inches, parse_dry_weight_lbs,
+                        parse_length_ft, parse_max_hp)
+
+SPEC_SHEET = """Boston Whaler 130 Super Sport Specs | BoatTest
+LOA 13' 4" Beam 5' 2" Max HP 60 Dry Weight 1,020 lbs Fuel Capacity 6 gal"""
+
+
+class TestUnitParsing(unittest.TestCase):
+    """Test labelled value parsing and unit conversion"""
+
+    def test_length_forms(self):
+        self.assertEqual(parse_length_ft("LOA 13'6\""), {13.5})
+        self.assertEqual(parse_length_ft("Length: 13 ft 6 in"), {13.5})
+        self.assertEqual(parse_length_ft("Length overall 13.5 ft"), {13.5})
+        self.assertEqual(parse_length_ft("Overall length: 162 in"), {13.5})
+        self.assertEqual(parse_length_ft("Length overall: 4.11 m"), {13.48})
+
+    def test_beam_in_inches(self):
+        self.assertEqual(parse_beam_inches("Beam 5' 2\""), {62})
+        self.assertEqual(parse_beam_inches("Beam: 62 in"), {62})
+
+    def test_max_hp_labels(self):
+        self.assertEqual(parse_max_hp("Max HP 60"), {60})
+        self.assertEqual(parse_max_hp("Maximum horsepower: 40 hp"), {40})
+        self.assertEqual(parse_max_hp("HP rating 50"), {50})
+        self.assertEqual(parse_max_hp("Shown with a 40 HP outboard"), set())
+
+    def test_weight_units(self):
+        self.assertEqual(parse_dry_weight_lbs("Dry Weight 1,020 lbs"), {1020})
+        self.assertEqual(parse_dry_weight_lbs("Weight: 210 kg"), {463})
+
+
+class TestGuessModel(unittest.TestCase):
+    """Test model names read from page titles"""
+
+    def test_guess_model(self):
+        self.assertEqual(guess_model("2019 Carolina Skiff JVX 13 Review - boats.com", "Carolina Skiff"), "JVX 13")
+        self.assertEqual(guess_model("Lund WC-14 | Specs", "Lund"), "WC-14")
+        self.assertIsNone(guess_model("Best small boats of 2024", "Lund"))
+
+
+class TestExtractSpecsFast(unittest.TestCase):
+    """Test the fast path's confidence rules"""
+
+    def test_confident_spec_sheet(self):
+        boats = extract_specs_fast(SPEC_SHEET, make="Boston Whaler")
+
+        self.assertEqual(boats, [{'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.33,
+                                  'max_hp': 60, 'dry_weight_lbs': 1020, 'beam_inches': 62}])
+
+    def test_multiple_models_fall_through(self):
+        """Test that comparison pages with several lengths are left to Claude"""
+        text = "Lund WC-12 Length 12' 0\" Max HP 15. Lund WC-14 Length 14' 0\" Max HP 25."
+        self.assertIsNone(extract_specs_fast(text, make="Lund", title="Lund WC Series"))
+
+    def test_missing_hp_falls_through(self):
+        self.assertIsNone(extract_specs_fast("Lund WC-14\nLength 14' 0\"", make="Lund"))
+
+    def test_unknown_model_falls_through(self):
+        self.assertIsNone(extract_specs_fast("LOA 13'6\" Max HP 40", make="Lund", title="Forum thread"))
+
+    @patch('search_boats.client')
+    def test_fast_path_skips_claude(self, mock_client):
+        """Test that extract_page_boats does not call the API for a clean spec sheet"""
+        boats = extract_page_boats(SPEC_SHEET, make="Boston Whaler")
+
+        self.assertEqual(boats[0]['max_hp'], 60)
+        mock_client.messages.create.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
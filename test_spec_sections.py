@@ -0,0 +1,69 @@
+"""
+Unit tests for spec-dense section selection
+"""
+import unittest
+
+from html_text import TextBlock, html_to_blocks
+from spec_sections import score_block, select_spec_blocks
+
+FILLER = "Our dealership has served anglers for decades with friendly service and great prices. " * 3
+
+
+class TestScoreBlock(unittest.TestCase):
+    """Test spec density scoring"""
+
+    def test_spec_table_outscores_prose(self):
+        table = TextBlock('table', "LOA 13'6\" Beam 62 in Max HP 40 HP Dry Weight 475 lbs")
+        prose = TextBlock('p', FILLER)
+
+        self.assertGreater(score_block(table), score_block(prose))
+        self.assertEqual(score_block(prose), 0.0)
+
+
+class TestSelectSpecBlocks(unittest.TestCase):
+    """Test block selection within a budget"""
+
+    def test_spec_table_past_cutoff_is_selected(self):
+        """Test that a spec table deep in a long page is found"""
+        html = ("<title>Whaler 130 Super Sport</title>" + "<p>%s</p>" % FILLER * 40 +
+                "<table><tr><td>LOA</td><td>13' 4\"</td></tr><tr><td>Max HP</td><td>60 HP</td></tr></table>")
+        blocks = html_to_blocks(html, max_chars=40000)
+
+        selection = select_spec_blocks(blocks, token_budget=100)
+
+        self.assertIn("Max HP 60 HP", selection.text)
+        self.assertIn("Whaler 130 Super Sport", selection.text)
+        self.assertEqual(selection.chosen, [0, len(blocks) - 1])
+        self.assertLessEqual(len(selection.text), 400)
+
+    def test_blocks_kept_in_document_order(self):
+        """Test that chosen blocks are joined in page order, not score order"""
+        blocks = [TextBlock('p', "13 ft hull"), TextBlock('p', FILLER),
+                  TextBlock('table', "LOA 13'6\" 40 HP 50 HP beam")]
+
+        selection = select_spec_blocks(blocks)
+
+        self.assertEqual(selection.chosen, [0, 2])
+        self.assertTrue(selection.text.startswith("13 ft hull"))
+
+    def test_fallback_to_page_start(self):
+        """Test that pages without spec-like text send their leading text"""
+        blocks = [TextBlock('p', FILLER), TextBlock('p', FILLER)]
+
+        selection = select_spec_blocks(blocks, token_budget=10)
+
+        self.assertTrue(selection.fallback)
+        self.assertEqual(selection.text, (FILLER + " " + FILLER)[:40])
+
+    def test_oversized_block_is_truncated(self):
+        """Test that a single spec block larger than the budget is cut to fit"""
+        blocks = [TextBlock('table', "LOA 13'6\" Max HP 40 HP " * 200)]
+
+        selection = select_spec_blocks(blocks, token_budget=50)
+
+        self.assertEqual(selection.chosen, [0])
+        self.assertLessEqual(len(selection.text), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
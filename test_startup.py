@@ -0,0 +1,111 @@
+"""
+Unit tests for lazy initialization and the local query commands
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import Mock, patch
+
+import search_boats
+
+BOATS = [
+    {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.75, 'max_hp': 40},
+    {'make': 'Boston Whaler', 'model': '130 Super Sport', 'length_ft': 13.4, 'max_hp': 60},
+    {'make': 'Boston Whaler', 'model': '110 Sport', 'length_ft': 11.0, 'max_hp': 15},
+]
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test that importing search_boats stays light"""
+
+    def test_import_does_not_load_network_libraries(self):
+        code = ("import sys, logging, search_boats; "
+                "print([m for m in ('anthropic', 'requests', 'dotenv') if m in sys.modules]); "
+                "print(len(logging.getLogger().handlers))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(search_boats.__file__))).stdout.split()
+        self.assertEqual(output, ['[]', '0'])
+
+    def test_get_client_without_key(self):
+        with patch('search_boats.client', search_boats._UNINITIALIZED), \
+                patch('search_boats.ANTHROPIC_API_KEY', None):
+            self.assertIsNone(search_boats.get_client())
+            self.assertIsNone(search_boats.client)
+
+    def test_assigned_client_is_used(self):
+        fake = Mock()
+        with patch('search_boats.client', fake):
+            self.assertIs(search_boats.get_client(), fake)
+
+
+class TestLocalCommands(unittest.TestCase):
+    """Test the query and stats subcommands"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmpdir.name, 'boats.db')
+        repository = search_boats.BoatRepository(self.db_file)
+        repository.init_schema()
+        for boat in BOATS:
+            repository.upsert(dict(boat))
+        repository.record_llm_usage("run-1", "extract", "claude-3-haiku-20240307", 1000, 100, 0.0004,
+                                    make="Lund", url="https://lund.com/wc14", domain="lund.com")
+        repository.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with redirect_stdout(out), patch('search_boats.LOG_FILE', os.path.join(self.tmpdir.name, 'search.log')):
+            status = search_boats.main(list(argv))
+        return status, out.getvalue()
+
+    def test_query_filters(self):
+        status, out = self.run_main('query', '--db', self.db_file, '--min-length', '13', '--min-hp', '40',
+                                    '--format', 'json')
+        self.assertEqual(status, 0)
+        self.assertEqual([boat['model'] for boat in json.loads(out)], ['130 Super Sport', 'WC-14'])
+
+        status, out = self.run_main('query', '--db', self.db_file, '--make', 'boston whaler', '--format', 'csv')
+        lines = out.strip().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['make', 'model'])
+        self.assertEqual(len(lines), 3)
+
+    def test_query_target_window(self):
+        with patch('search_boats.search_criteria', return_value=search_boats.SearchCriteria(13.5, 13.92, 40)):
+            status, out = self.run_main('query', '--db', self.db_file, '--target', '--format', 'json')
+            self.assertEqual([boat['model'] for boat in json.loads(out)], ['WC-14'])
+            # Explicit bounds override the configured window
+            status, out = self.run_main('query', '--db', self.db_file, '--target', '--min-length', '13',
+                                        '--max-hp', '50', '--format', 'json')
+            self.assertEqual([boat['model'] for boat in json.loads(out)], ['WC-14'])
+        status, out = self.run_main('query', '--db', self.db_file, '--max-hp', '15', '--format', 'json')
+        self.assertEqual([boat['model'] for boat in json.loads(out)], ['110 Sport'])
+
+    def test_query_table(self):
+        status, out = self.run_main('query', '--db', self.db_file, '--limit', '1')
+        self.assertIn('Boston Whaler', out)
+        self.assertTrue(out.strip().endswith('1 boats'))
+
+    def test_stats(self):
+        status, out = self.run_main('stats', '--db', self.db_file)
+        self.assertEqual(status, 0)
+        self.assertIn('Boats: 3', out)
+        self.assertIn('Boston Whaler', out)
+        self.assertIn('run-1: 1 calls, 1,100 tokens', out)
+
+    def test_missing_database(self):
+        with patch('sys.stderr', io.StringIO()):
+            status, _ = self.run_main('stats', '--db', os.path.join(self.tmpdir.name, 'missing.db'))
+        self.assertEqual(status, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, 'missing.db')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Unit tests for the work-queue crawl
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import search_boats
+from work_queue import (KIND_PAGE, KIND_SEARCH, STATUS_DONE, STATUS_FAILED, STATUS_PENDING, Heartbeat, WorkQueue,
+                        run_worker)
+
+
+def square_handlers(queue, crawl_id):
+    """A search task fans out into page tasks; a page task squares its number."""
+    def search(task):
+        return {'pages': queue.add_many(crawl_id, KIND_PAGE,
+                                        [(str(n), {'n': n}, 0) for n in range(task.payload['count'])])}
+
+    def page(task):
+        return {'square': task.payload['n'] ** 2, 'worker_pid': os.getpid()}
+
+    return {KIND_SEARCH: search, KIND_PAGE: page}
+
+
+def worker_process(db_path, crawl_id):
+    queue = WorkQueue(db_path)
+    run_worker(queue, crawl_id, square_handlers(queue, crawl_id), poll_interval=0.05)
+    queue.close()
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Test leases, heartbeats and reclaiming"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'work_queue.db')
+        self.queue = WorkQueue(self.path, max_attempts=2)
+        self.crawl_id = self.queue.start_crawl()
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmpdir.cleanup()
+
+    def test_claims_by_priority_without_duplicates(self):
+        self.assertEqual(self.queue.add_many(self.crawl_id, KIND_PAGE, [('a', {}, 2), ('b', {}, 0), ('a', {}, 0)]), 2)
+        self.assertFalse(self.queue.add(self.crawl_id, KIND_PAGE, 'b'))
+        first = self.queue.claim(self.crawl_id, 'w1')
+        second = self.queue.claim(self.crawl_id, 'w2')
+        self.assertEqual((first.key, second.key), ('b', 'a'))
+        self.assertIsNone(self.queue.claim(self.crawl_id, 'w3'))
+        self.assertFalse(self.queue.is_finished(self.crawl_id))
+        self.queue.complete(first, 'w1', {'ok': 1})
+        self.queue.complete(second, 'w2')
+        self.assertTrue(self.queue.is_finished(self.crawl_id))
+        self.assertEqual(self.queue.results(self.crawl_id, KIND_PAGE), [None, {'ok': 1}])
+
+    def test_expired_lease_is_reclaimed_and_fenced(self):
+        self.queue.add(self.crawl_id, KIND_PAGE, 'a')
+        stale = self.queue.claim(self.crawl_id, 'w1', lease_seconds=10, now=100)
+        self.assertIsNone(self.queue.claim(self.crawl_id, 'w2', lease_seconds=10, now=105))
+        fresh = self.queue.claim(self.crawl_id, 'w2', lease_seconds=10, now=111)
+        self.assertEqual((fresh.key, fresh.attempts), ('a', 2))
+        # The first worker can no longer touch the task
+        self.assertFalse(self.queue.heartbeat(stale, 'w1'))
+        self.assertFalse(self.queue.complete(stale, 'w1', 'late'))
+        self.assertTrue(self.queue.complete(fresh, 'w2', 'ok'))
+        self.assertEqual(self.queue.results(self.crawl_id, KIND_PAGE), ['ok'])
+
+    def test_max_attempts(self):
+        self.queue.add(self.crawl_id, KIND_PAGE, 'a')
+        self.queue.claim(self.crawl_id, 'w1', lease_seconds=10, now=100)
+        self.queue.claim(self.crawl_id, 'w1', lease_seconds=10, now=111)
+        self.assertEqual(self.queue.reclaim_expired(now=200), 1)
+        self.assertEqual(self.queue.counts(self.crawl_id), {STATUS_FAILED: 1})
+
+        self.queue.add(self.crawl_id, KIND_PAGE, 'b')
+        task = self.queue.claim(self.crawl_id, 'w1')
+        self.assertEqual(self.queue.fail(task, 'w1', 'boom'), STATUS_PENDING)
+        task = self.queue.claim(self.crawl_id, 'w1')
+        self.assertEqual(self.queue.fail(task, 'w1', 'boom'), STATUS_FAILED)
+        self.assertTrue(self.queue.is_finished(self.crawl_id))
+
+    def test_heartbeat_keeps_lease(self):
+        self.queue.add(self.crawl_id, KIND_PAGE, 'a')
+        task = self.queue.claim(self.crawl_id, 'w1', lease_seconds=0.3)
+        with Heartbeat(self.queue, task, 'w1', lease_seconds=0.3) as heartbeat:
+            time.sleep(0.6)
+            self.assertIsNone(self.queue.claim(self.crawl_id, 'w2', lease_seconds=0.3))
+        self.assertFalse(heartbeat.lost)
+        self.assertTrue(self.queue.complete(task, 'w1'))
+
+    def test_worker_retries_failing_handler(self):
+        self.queue.add(self.crawl_id, KIND_PAGE, 'a')
+        calls = []
+
+        def flaky(task):
+            calls.append(task.attempts)
+            if len(calls) == 1:
+                raise RuntimeError("timeout")
+            return {'boats': 2}
+
+        stats = run_worker(self.queue, self.crawl_id, {KIND_PAGE: flaky}, worker='w1', poll_interval=0.01)
+        self.assertEqual((stats.done, stats.failed, stats.totals), (1, 1, {'boats': 2}))
+        self.assertEqual(calls, [1, 2])
+
+    def test_threads_share_the_queue(self):
+        self.queue.add(self.crawl_id, KIND_SEARCH, 'numbers', {'count': 40})
+        stats = []
+
+        def work(name):
+            queue = WorkQueue(self.path)
+            stats.append(run_worker(queue, self.crawl_id, square_handlers(queue, self.crawl_id), worker=name,
+                                    poll_interval=0.01))
+            queue.close()
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(s.done for s in stats), 41)
+        self.assertEqual(sorted(r['square'] for r in self.queue.results(self.crawl_id, KIND_PAGE)),
+                         [n * n for n in range(40)])
+
+    def test_worker_processes(self):
+        self.queue.add(self.crawl_id, KIND_SEARCH, 'numbers', {'count': 30})
+        processes = [multiprocessing.Process(target=worker_process, args=(self.path, self.crawl_id))
+                     for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+        self.assertEqual([process.exitcode for process in processes], [0, 0, 0])
+        results = self.queue.results(self.crawl_id, KIND_PAGE)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(self.queue.counts(self.crawl_id), {STATUS_DONE: 31})
+
+
+class TestWorkQueueCrawl(unittest.TestCase):
+    """Test the crawl's search and page tasks"""
+
+    def test_seed_and_work(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch('search_boats.DB_FILE', os.path.join(tmpdir, 'boats.db')), \
+                patch('search_boats.manufacturer_queries', side_effect=lambda make: [f"{make} specs", "unused"]), \
+                patch('search_boats.search_web', return_value=[
+                    {'url': 'https://specs.example.com/skiff?utm_source=x', 'title': 'Skiff', 'description': ''},
+                    {'url': 'https://specs.example.com/skiff', 'title': 'Skiff', 'description': ''}]), \
+                patch('search_boats.fetch_webpage', return_value="Length 13.5 ft, 40 HP"), \
+                patch('search_boats.extract_page_boats', return_value=[
+                    {'make': 'Lund', 'model': 'WC-14', 'length_ft': 13.5, 'max_hp': 40}]), \
+                patch('builtins.print'):
+            search_boats.init_database()
+            queue = WorkQueue(os.path.join(tmpdir, 'work_queue.db'))
+            crawl_id = queue.start_crawl()
+            self.assertEqual(search_boats.seed_work_queue(queue, crawl_id, ["Lund", "Tracker"]), 2)
+            stats = run_worker(queue, crawl_id, search_boats.work_queue_handlers(queue, crawl_id), worker='w1')
+            # Both searches found the same canonical URL, so it was fetched once
+            self.assertEqual((stats.done, stats.totals['pages'], stats.totals['new_boats']), (3, 1, 1))
+            self.assertEqual(search_boats.count_boats(), 1)
+            queue.close()
+            search_boats.get_repository().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
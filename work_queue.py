@@ -0,0 +1,337 @@
+"""
+SQLite work queue for crawls spread over several worker processes.
+
+A single crawl process runs every search and page itself. With the work
+queue, a coordinator seeds one task per (manufacturer, query) into
+work_queue.db (next to boats.db), and any number of worker processes, on
+this machine or others sharing the files, claim tasks and write their
+results back:
+
+    search  runs one query and adds a page task per result URL (the
+            canonical URL is the key, so a page found by several queries
+            or manufacturers is crawled once)
+    page    fetches, extracts and persists one page
+
+A claimed task is leased to its worker for lease_seconds. Workers renew
+the lease with heartbeats while the task runs; a lease that expires (the
+worker died or hung) is reclaimed and the task goes back to pending, until
+it has been attempted max_attempts times and is marked failed. Each claim
+increments the task's attempt count, which acts as a fencing token: a
+worker whose lease was reclaimed can no longer heartbeat, complete or fail
+the task. Results are persisted with idempotent upserts, so a page that
+runs twice gives the same boats.
+
+Claims take SQLite's write lock (BEGIN IMMEDIATE) so two workers never
+lease the same task. A crawl is finished once none of its tasks are pending
+or leased.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILENAME = "work_queue.db"
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Task kinds
+KIND_SEARCH = 'search'
+KIND_PAGE = 'page'
+
+# Statuses
+STATUS_PENDING = 'pending'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def default_queue_path(db_file: str) -> str:
+    """Returns the work queue path that sits next to the given boats database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_file)), QUEUE_FILENAME)
+
+
+def worker_name() -> str:
+    """A name for this process that is unique across machines sharing the queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Task:
+    """A leased unit of work. attempts identifies the lease (see WorkQueue.complete)."""
+    id: int
+    crawl_id: str
+    kind: str
+    key: str
+    payload: Any
+    attempts: int
+
+
+class WorkQueue:
+    """
+    Durable task queue shared by the coordinator and workers of a crawl.
+    Safe to share between threads; each call takes the connection lock.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = DEFAULT_MAX_ATTEMPTS, busy_timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=busy_timeout)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                crawl_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                task_key TEXT NOT NULL,
+                payload_json TEXT,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_expires_at REAL,
+                result_json TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (crawl_id, kind, task_key)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(crawl_id, status, priority, id)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks(status, lease_expires_at)')
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """One write transaction, holding SQLite's write lock from the start."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def start_crawl(self) -> str:
+        """Registers a new crawl and returns its id."""
+        crawl_id = f"{time.time():.6f}"
+        with self._write() as conn:
+            conn.execute('INSERT INTO crawls (crawl_id, started_at) VALUES (?, ?)', (crawl_id, time.time()))
+        return crawl_id
+
+    def latest_crawl(self) -> Optional[str]:
+        """The most recently started crawl that is not finished, or None."""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT crawl_id FROM crawls WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1
+            ''').fetchone()
+        return row[0] if row else None
+
+    def finish_crawl(self, crawl_id: str):
+        with self._write() as conn:
+            conn.execute('UPDATE crawls SET finished_at = ? WHERE crawl_id = ?', (time.time(), crawl_id))
+
+    def add(self, crawl_id: str, kind: str, key: str, payload: Any = None, priority: int = 0) -> bool:
+        """Adds a task unless the crawl already has one of this kind and key. True if it was added."""
+        return self.add_many(crawl_id, kind, [(key, payload, priority)]) == 1
+
+    def add_many(self, crawl_id: str, kind: str, tasks: Iterable[Tuple[str, Any, int]]) -> int:
+        """Adds (key, payload, priority) tasks in one transaction. Returns how many were new."""
+        now = time.time()
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO tasks (crawl_id, kind, task_key, payload_json, priority, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(crawl_id, kind, key, json.dumps(payload), priority, now) for key, payload, priority in tasks])
+            return conn.total_changes - before
+
+    def _reclaim(self, conn: sqlite3.Connection, now: float, crawl_id: Optional[str] = None) -> int:
+        crawl_filter, params = ('AND crawl_id = ?', [crawl_id]) if crawl_id else ('', [])
+        cursor = conn.execute(f'''
+            UPDATE tasks SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END,
+                worker = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE status = 'leased' AND lease_expires_at < ? {crawl_filter}
+        ''', [self.max_attempts, self.max_attempts, now, now, *params])
+        if cursor.rowcount:
+            logger.warning(f"⏰ Reclaimed {cursor.rowcount} tasks with expired leases")
+            get_metrics().inc('queue_leases_expired_total', cursor.rowcount)
+        return cursor.rowcount
+
+    def reclaim_expired(self, crawl_id: Optional[str] = None, now: Optional[float] = None) -> int:
+        """Returns tasks whose lease has expired to pending (or failed, after max_attempts)."""
+        with self._write() as conn:
+            return self._reclaim(conn, time.time() if now is None else now, crawl_id)
+
+    def claim(self, crawl_id: str, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              now: Optional[float] = None) -> Optional[Task]:
+        """Leases the next pending task (lowest priority, then oldest), or returns None if there is none."""
+        now = time.time() if now is None else now
+        with self._write() as conn:
+            self._reclaim(conn, now, crawl_id)
+            row = conn.execute('''
+                SELECT id, kind, task_key, payload_json, attempts FROM tasks
+                WHERE crawl_id = ? AND status = 'pending'
+                ORDER BY priority, id LIMIT 1
+            ''', (crawl_id,)).fetchone()
+            if row is None:
+                return None
+            task_id, kind, key, payload_json, attempts = row
+            conn.execute('''
+                UPDATE tasks SET status = 'leased', worker = ?, attempts = ?, lease_expires_at = ?, updated_at = ?
+                WHERE id = ?
+            ''', (worker, attempts + 1, now + lease_seconds, now, task_id))
+        return Task(task_id, crawl_id, kind, key, json.loads(payload_json), attempts + 1)
+
+    def _update_lease(self, conn: sqlite3.Connection, task: Task, worker: str, assignments: str,
+                      params: List) -> bool:
+        cursor = conn.execute(f'''
+            UPDATE tasks SET {assignments}, updated_at = ?
+            WHERE id = ? AND status = 'leased' AND worker = ? AND attempts = ?
+        ''', [*params, time.time(), task.id, worker, task.attempts])
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task: Task, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extends the lease. False if it has been lost (expired and reclaimed)."""
+        with self._write() as conn:
+            return self._update_lease(conn, task, worker, 'lease_expires_at = ?', [time.time() + lease_seconds])
+
+    def complete(self, task: Task, worker: str, result: Any = None) -> bool:
+        """Marks the task done with its result. False if the lease was lost and the result discarded."""
+        with self._write() as conn:
+            return self._update_lease(conn, task, worker, "status = 'done', lease_expires_at = NULL, result_json = ?",
+                                      [json.dumps(result)])
+
+    def fail(self, task: Task, worker: str, error: str) -> Optional[str]:
+        """
+        Releases a task that raised: pending again, or failed once it has had max_attempts.
+        Returns the new status, or None if the lease was lost.
+        """
+        status = STATUS_FAILED if task.attempts >= self.max_attempts else STATUS_PENDING
+        with self._write() as conn:
+            released = self._update_lease(conn, task, worker,
+                                          'status = ?, worker = NULL, lease_expires_at = NULL, error = ?',
+                                          [status, error])
+        return status if released else None
+
+    def counts(self, crawl_id: str) -> Dict[str, int]:
+        """Number of the crawl's tasks per status."""
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM tasks WHERE crawl_id = ? GROUP BY status',
+                                      (crawl_id,)).fetchall()
+        return dict(rows)
+
+    def is_finished(self, crawl_id: str) -> bool:
+        """True once no task of the crawl is pending or leased."""
+        counts = self.counts(crawl_id)
+        return not (counts.get(STATUS_PENDING) or counts.get(STATUS_LEASED))
+
+    def results(self, crawl_id: str, kind: str) -> List[Any]:
+        """Results of the crawl's finished tasks of one kind."""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT result_json FROM tasks WHERE crawl_id = ? AND kind = ? AND status = 'done' ORDER BY id
+            ''', (crawl_id, kind)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Heartbeat:
+    """Renews a task's lease from a background thread, every third of the lease, while the block runs."""
+
+    def __init__(self, queue: WorkQueue, task: Task, worker: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.queue = queue
+        self.task = task
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{task.id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(self.task, self.worker, self.lease_seconds):
+                    self.lost = True
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Heartbeat for task {self.task.id} failed: {e}")
+
+    def __enter__(self) -> 'Heartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+@dataclass
+class WorkerStats:
+    """Tasks one worker processed, and the sum of each numeric field of their results."""
+    done: int = 0
+    failed: int = 0
+    lost: int = 0
+    totals: Dict[str, int] = field(default_factory=dict)
+
+
+def run_worker(queue: WorkQueue, crawl_id: str, handlers: Dict[str, Callable[[Task], Any]],
+               worker: Optional[str] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+               poll_interval: float = 1.0, max_tasks: Optional[int] = None) -> WorkerStats:
+    """
+    Claims and runs the crawl's tasks with handlers[task.kind] until the crawl is finished
+    (or max_tasks have run). While other workers hold leases, waits poll_interval between claims.
+    """
+    worker = worker or worker_name()
+    stats = WorkerStats()
+    metrics = get_metrics()
+    while max_tasks is None or stats.done + stats.failed + stats.lost < max_tasks:
+        task = queue.claim(crawl_id, worker, lease_seconds)
+        if task is None:
+            if queue.is_finished(crawl_id):
+                break
+            time.sleep(poll_interval)
+            continue
+        with Heartbeat(queue, task, worker, lease_seconds):
+            try:
+                result = handlers[task.kind](task)
+            except Exception as e:
+                status = queue.fail(task, worker, f"{type(e).__name__}: {e}")
+                logger.warning(f"⚠️ {task.kind} task {task.key} failed (attempt {task.attempts}): {e}")
+                stats.failed += 1
+                metrics.inc('queue_tasks_total', kind=task.kind, outcome=status or 'lost')
+                continue
+        if queue.complete(task, worker, result):
+            stats.done += 1
+            metrics.inc('queue_tasks_total', kind=task.kind, outcome=STATUS_DONE)
+            for name, value in (result or {}).items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    stats.totals[name] = stats.totals.get(name, 0) + value
+        else:
+            # The lease expired and the task went to another worker; its result wins
+            logger.warning(f"⚠️ Lease on {task.kind} task {task.key} was lost; result discarded")
+            stats.lost += 1
+            metrics.inc('queue_tasks_total', kind=task.kind, outcome='lost')
+    return stats